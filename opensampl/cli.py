@@ -18,6 +18,7 @@ from loguru import logger
 
 from opensampl.config.base import BaseConfig as CLIConfig
 from opensampl.db.orm import get_table_names
+from opensampl.load.outbox import Outbox
 from opensampl.load_data import create_new_tables, write_to_table
 from opensampl.mixins.collect import CollectMixin
 from opensampl.mixins.random_data import RandomDataMixin
@@ -267,6 +268,72 @@ def table_load(filepath: dict | list, table_name: str, if_exists: Literal["updat
         raise click.Abort()  # noqa: RSE102,B904
 
 
+@cli.group()
+def outbox():
+    """Inspect and send uploads held in the local outbox"""
+
+
+def _open_outbox(conf: CLIConfig) -> Outbox | None:
+    """Open the configured outbox file, or return None if nothing has ever been stored in it."""
+    path = Path(conf.OUTBOX_PATH).expanduser()
+    if not path.exists():
+        click.echo(f"Outbox {path} is empty")
+        return None
+    return Outbox(path, max_batch_rows=conf.OUTBOX_MAX_BATCH_ROWS)
+
+
+@outbox.command("status")
+@click.pass_context
+def outbox_status(ctx: click.Context):
+    """Show uploads waiting in, or rejected from, the outbox"""
+    from datetime import datetime, timezone
+
+    from tabulate import tabulate
+
+    conf = ctx.obj["conf"]
+    box = _open_outbox(conf)
+    if box is None:
+        return
+    data = []
+    for row in box.status():
+        oldest = datetime.fromtimestamp(row["oldest"], tz=timezone.utc).astimezone()
+        data.append(row | {"oldest": oldest.isoformat(sep=" ", timespec="seconds")})
+    click.echo(f"Outbox: {box.path} (OUTBOX_MODE={conf.OUTBOX_MODE})")
+    if not data:
+        click.echo("No uploads waiting")
+        return
+    click.echo(tabulate(data, headers="keys", tablefmt="simple"))
+    if errors := box.errors():
+        click.echo("\nMost recent failures:")
+        click.echo(tabulate(errors, headers="keys", tablefmt="simple", maxcolwidths=[None, None, None, None, 60]))
+
+
+@outbox.command("flush")
+@click.option("--retry-failed", is_flag=True, help="Also resend uploads the backend previously rejected")
+@click.pass_context
+def outbox_flush(ctx: click.Context, retry_failed: bool):
+    """Send every upload waiting in the outbox to the backend"""
+    from functools import partial
+
+    from opensampl.load.routing import send_to_backend
+
+    conf = ctx.obj["conf"]
+    if not conf.ROUTE_TO_BACKEND or not conf.BACKEND_URL:
+        raise click.UsageError("ROUTE_TO_BACKEND and BACKEND_URL must be set to flush the outbox")
+    box = _open_outbox(conf)
+    if box is None:
+        return
+    if retry_failed:
+        click.echo(f"Requeued {box.retry_failed()} failed uploads")
+    result = box.flush(partial(send_to_backend, conf))
+    click.echo(
+        f"Sent {result.sent} entries in {result.uploads} uploads; {result.failed} failed, {result.remaining} remaining"
+    )
+    if result.unavailable:
+        click.echo("Backend unavailable; remaining uploads were left in the outbox", err=True)
+        ctx.exit(1)
+
+
 @cli.command(name="create")
 @click.argument("config_path", type=click.Path(exists=True, path_type=Path))
 @click.option(
@@ -30,6 +30,15 @@ else:
 warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
 
+def tai_to_utc(tai_seconds: pd.Series, utc_offset: pd.Series) -> pd.Series:
+    """Convert TAI seconds since the epoch, with the TAI-UTC offset of each reading in seconds, to UTC timestamps."""
+    return pd.to_datetime(
+        pd.to_numeric(tai_seconds).to_numpy(dtype="int64") - pd.to_numeric(utc_offset).to_numpy(dtype="int64"),
+        unit="s",
+        utc=True,
+    ).to_series(index=tai_seconds.index)
+
+
 class TP4100Collector:
     """
     Collector class for Microchip TimeProvider 4100 device data.
@@ -210,10 +219,6 @@ class TP4100Collector:
             Exception: If data collection or file writing fails.
 
         """
-
-        def format_utc_second(tai_sec: str, utc_offset: str) -> datetime:
-            return datetime.fromtimestamp(int(tai_sec) - int(utc_offset), UTC)
-
         mon_ch, ch_id, metr = request_key
         ch_name = mon_ch.channel_name
 
@@ -240,7 +245,7 @@ class TP4100Collector:
 
         df = pd.DataFrame(data["chartData"])
         if len(df) > 0:
-            df["timestamp"] = df.apply(lambda r: format_utc_second(r["X"], r["OFFSET"]), axis=1)
+            df["timestamp"] = tai_to_utc(df["X"], df["OFFSET"])
             df = df[["timestamp", "Y"]].rename(columns={"Y": "value"})
             data_start = df["timestamp"].min().isoformat()
         else:
@@ -6,7 +6,7 @@ configuration validation, and settings management.
 """
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from dotenv import set_key
 from loguru import logger
@@ -37,21 +37,107 @@ class BaseConfig(BaseSettings):
         description="Default path that files are moved to after they have been processed",
         alias="ARCHIVE_PATH",
     )
+    REJECT_PATH: Path = Field(
+        Path("rejects"),
+        description="Directory that time data rows failing validation are written to, one csv file per load",
+        alias="REJECT_PATH",
+    )
     LOG_LEVEL: str = Field("INFO", description="Log level for opensampl cli", alias="LOG_LEVEL")
     API_KEY: str | None = Field(None, description="Access key for interacting with the backend", alias="API_KEY")
     INSECURE_REQUESTS: bool = Field(
         False, description="Allow insecure requests to be made to the backend", alias="INSECURE_REQUESTS"
     )
 
+    BACKEND_MAX_IN_FLIGHT: int = Field(
+        4,
+        description="Maximum number of requests sent to the backend at once; further requests wait for a free slot",
+        alias="BACKEND_MAX_IN_FLIGHT",
+    )
+    BACKEND_RETRIES: int = Field(
+        3,
+        description="Times a backend request is retried after a connection error or a 429/503 response",
+        alias="BACKEND_RETRIES",
+    )
+    BACKEND_BACKOFF: float = Field(
+        0.5,
+        description="Base delay in seconds of the jittered exponential backoff between retries",
+        alias="BACKEND_BACKOFF",
+    )
+    BACKEND_TIMEOUT: float = Field(
+        300, description="Seconds to wait for the backend to respond to a request", alias="BACKEND_TIMEOUT"
+    )
+    DB_POOL_SIZE: int = Field(
+        5, description="Number of database connections kept open in the process-wide pool", alias="DB_POOL_SIZE"
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        10,
+        description="Connections allowed beyond DB_POOL_SIZE when the pool is exhausted",
+        alias="DB_MAX_OVERFLOW",
+    )
+    DB_POOL_PRE_PING: bool = Field(
+        True, description="Test pooled connections for liveness before using them", alias="DB_POOL_PRE_PING"
+    )
+    DB_POOL_RECYCLE: int = Field(
+        1800,
+        description="Seconds after which pooled connections are replaced; -1 to never recycle",
+        alias="DB_POOL_RECYCLE",
+    )
+
+    SERIES_CACHE_SIZE: int = Field(
+        4096,
+        description="Maximum number of resolved probe/metric/reference series kept in the process cache",
+        alias="SERIES_CACHE_SIZE",
+    )
+    SERIES_CACHE_TTL: float = Field(
+        900.0,
+        description="Seconds a cached series resolution is trusted before it is looked up again",
+        alias="SERIES_CACHE_TTL",
+    )
+
+    WIRE_FORMAT: Literal["csv", "arrow", "parquet"] = Field(
+        "arrow",
+        description="Format used for time data uploads to the backend, if the backend supports it",
+        alias="WIRE_FORMAT",
+    )
+    WIRE_COMPRESSION: Literal["none", "gzip", "zstd"] = Field(
+        "zstd",
+        description="Compression applied to time data uploads where the wire format supports it",
+        alias="WIRE_COMPRESSION",
+    )
+
+    OUTBOX_MODE: Literal["off", "fallback", "always"] = Field(
+        "off",
+        description=(
+            "When to hold time data and probe metadata uploads in the local outbox: 'fallback' when the backend is "
+            "unreachable or busy, 'always' to send every upload from the outbox in the background"
+        ),
+        alias="OUTBOX_MODE",
+    )
+    OUTBOX_PATH: Path = Field(
+        Path.home() / ".opensampl" / "outbox.sqlite3",
+        description="SQLite file holding uploads waiting to be sent to the backend",
+        alias="OUTBOX_PATH",
+    )
+    OUTBOX_MAX_BATCH_ROWS: int = Field(
+        500_000,
+        description="Most time data rows the outbox merges into a single upload",
+        alias="OUTBOX_MAX_BATCH_ROWS",
+    )
+    OUTBOX_MAX_BACKOFF: float = Field(
+        300.0,
+        description="Longest delay in seconds between attempts to flush the outbox while the backend is unavailable",
+        alias="OUTBOX_MAX_BACKOFF",
+    )
+
     ENABLE_GEOLOCATE: bool = Field(
         False,
         description="Enable geolocate features which extract a location from ip addresses",
         alias="ENABLE_GEOLOCATE",
     )
 
-    @field_serializer("ARCHIVE_PATH")
+    @field_serializer("ARCHIVE_PATH", "REJECT_PATH")
     def convert_to_str(self, v: Path) -> str:
-        """Convert archive path to a string for serialization"""
+        """Convert archive and reject paths to strings for serialization"""
         return str(v.resolve())
 
     @property
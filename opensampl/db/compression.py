@@ -0,0 +1,110 @@
+"""Helpers for the TimescaleDB native compression of the series_data hypertable."""
+
+from datetime import datetime
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from opensampl.db.orm import SeriesData
+
+# SQLSTATE raised by TimescaleDB versions that cannot run a statement against compressed chunks
+FEATURE_NOT_SUPPORTED = "0A000"
+
+
+def hypertable() -> str:
+    """Return the schema qualified name of the compressed hypertable."""
+    return f"{SeriesData.__table__.schema}.{SeriesData.__tablename__}"
+
+
+def chunk_compression_stats(session: Session) -> list[dict[str, Any]]:
+    """
+    Report the size of every series_data chunk before and after compression.
+
+    Args:
+        session: SQLAlchemy session connected to the TimescaleDB database.
+
+    Returns:
+        One dict per chunk, oldest first, with the chunk name, its time range, whether it is compressed, its size
+        before and after compression in bytes and the compression ratio. Sizes and ratio are None for uncompressed
+        chunks.
+
+    """
+    rows = session.execute(
+        text("""
+        SELECT
+            format('%I.%I', c.chunk_schema, c.chunk_name) AS chunk,
+            c.range_start,
+            c.range_end,
+            c.is_compressed,
+            s.before_compression_total_bytes AS before_bytes,
+            s.after_compression_total_bytes AS after_bytes
+        FROM timescaledb_information.chunks c
+        LEFT JOIN chunk_compression_stats(CAST(:hypertable AS regclass)) s
+            ON s.chunk_schema = c.chunk_schema AND s.chunk_name = c.chunk_name
+        WHERE format('%I.%I', c.hypertable_schema, c.hypertable_name) = :hypertable
+        ORDER BY c.range_start
+        """),
+        {"hypertable": hypertable()},
+    ).mappings()
+    return [
+        dict(row) | {"ratio": row["before_bytes"] / row["after_bytes"] if row["after_bytes"] else None} for row in rows
+    ]
+
+
+def set_compression_policy(session: Session, compress_after: str) -> None:
+    """
+    Replace the policy that compresses series_data chunks once all of their data is older than compress_after.
+
+    Args:
+        session: SQLAlchemy session connected to the TimescaleDB database. Committing is left to the caller.
+        compress_after: Postgres interval, such as "7 days".
+
+    """
+    session.execute(
+        text("SELECT remove_compression_policy(:hypertable, if_exists => true)"), {"hypertable": hypertable()}
+    )
+    session.execute(
+        text("SELECT add_compression_policy(:hypertable, compress_after => CAST(:compress_after AS INTERVAL))"),
+        {"hypertable": hypertable(), "compress_after": compress_after},
+    )
+    logger.info(f"Chunks of {hypertable()} will be compressed once older than {compress_after}")
+
+
+def is_compressed_chunk_error(error: DBAPIError) -> bool:
+    """Return whether the database rejected a statement because it touched compressed chunks."""
+    return getattr(error.orig, "pgcode", None) == FEATURE_NOT_SUPPORTED and "compressed" in str(error.orig).lower()
+
+
+def decompress_chunks(session: Session, start: datetime, end: datetime) -> int:
+    """
+    Decompress every compressed series_data chunk overlapping the time range [start, end].
+
+    The compression policy compresses them again once they are old enough.
+
+    Args:
+        session: SQLAlchemy session connected to the TimescaleDB database.
+        start: Earliest time being written, as naive UTC like the hypertable's timestamp without time zone.
+        end: Latest time being written, as naive UTC.
+
+    Returns:
+        Number of chunks decompressed.
+
+    """
+    chunks = (
+        session.execute(
+            text("""
+            SELECT decompress_chunk(format('%I.%I', c.chunk_schema, c.chunk_name)::regclass, if_compressed => true)
+            FROM timescaledb_information.chunks c
+            WHERE format('%I.%I', c.hypertable_schema, c.hypertable_name) = :hypertable
+              AND c.is_compressed AND c.range_start <= :end AND c.range_end > :start
+            """),
+            {"hypertable": hypertable(), "start": start, "end": end},
+        )
+        .scalars()
+        .all()
+    )
+    logger.info(f"Decompressed {len(chunks)} chunks of {hypertable()} between {start} and {end}")
+    return len(chunks)
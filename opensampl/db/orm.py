@@ -7,8 +7,23 @@ from typing import Any
 from geoalchemy2 import Geometry, WKTElement
 from geoalchemy2.shape import to_shape
 from loguru import logger
-from sqlalchemy import TIMESTAMP, Boolean, Column, Float, ForeignKey, Integer, String, Text, UniqueConstraint, text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import (
+    TIMESTAMP,
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    PrimaryKeyConstraint,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, JSONB
+from sqlalchemy.engine import Engine
 from sqlalchemy.event import listens_for
 from sqlalchemy.orm import Session, declarative_base, relationship
 from sqlalchemy.schema import MetaData
@@ -252,14 +267,74 @@ class ProbeMetadata(Base):
             delattr(self, "_test_name")
 
 
-class ProbeData(Base):
+class Series(Base):
+    """
+    One row per probe/reference/metric combination that has time data.
+
+    Readings in series_data refer to their series by its integer series_id rather than carrying the three uuids.
+    """
+
+    __tablename__ = "series"
+
+    series_id = Column(Integer, Identity(), primary_key=True, comment="Auto generated integer key of the series")
+    probe_uuid = Column(
+        String(36),
+        ForeignKey("probe_metadata.uuid"),
+        nullable=False,
+        comment="Foreign key to the probe that collected the data",
+    )
+    reference_uuid = Column(
+        String(36),
+        ForeignKey("reference.uuid"),
+        nullable=False,
+        comment="Foreign key to the reference point for the readings",
+    )
+    metric_type_uuid = Column(
+        String(36),
+        ForeignKey("metric_type.uuid"),
+        nullable=False,
+        comment="Foreign key to the metric type being measured",
+    )
+    __table_args__ = (
+        UniqueConstraint("probe_uuid", "reference_uuid", "metric_type_uuid", name="uq_series_identity"),
+        # Together with the (series_id, time) primary key of series_data, serves probe/metric lookups over a time range
+        Index("ix_series_probe_metric", "probe_uuid", "metric_type_uuid"),
+    )
+
+
+class SeriesData(Base):
     """
     Table for storing actual time data from the probes.
 
-    Each entry has a reference to the probe's uuid, timestamp for the measurement, and value for the measurement.
+    Each entry has the series it belongs to, timestamp for the measurement, and value for the measurement.
+    Readings of metrics with a float or int value_type are stored in value_num; value holds the readings of every
+    other metric as JSON.
+    """
+
+    __tablename__ = "series_data"
+
+    time = Column(TIMESTAMP, nullable=False, comment="Timestamp of the measurement")
+    series_id = Column(
+        Integer,
+        ForeignKey("series.series_id"),
+        nullable=False,
+        comment="Foreign key to the probe/reference/metric series of the reading",
+    )
+    value = Column(JSONB, comment="Measurement value stored as JSON, for metrics whose value type is not numeric")
+    value_num = Column(DOUBLE_PRECISION, comment="Measurement value for metrics with a float or int value type")
+    __table_args__ = (PrimaryKeyConstraint("series_id", "time", name="series_data_pkey"),)
+
+
+class ProbeData(Base):
+    """
+    View of series_data with the probe, reference and metric uuids of each reading's series.
+
+    Kept so that queries written against the original probe_data table keep working. Rows inserted into it are
+    written to series_data, creating the series if needed. New data is written to series_data directly.
     """
 
     __tablename__ = "probe_data"
+    __table_args__ = {"info": {"is_view": True}}  # noqa: RUF012
 
     time = Column(TIMESTAMP, primary_key=True, comment="Timestamp of the measurement")
     probe_uuid = Column(
@@ -280,7 +355,90 @@ class ProbeData(Base):
         primary_key=True,
         comment="Foreign key to the metric type being measured",
     )
-    value = Column(JSONB, comment="Measurement value stored as JSON; value's expected type defined via metric")
+    value = Column(JSONB, comment="Measurement value stored as JSON, for metrics whose value type is not numeric")
+    value_num = Column(DOUBLE_PRECISION, comment="Measurement value for metrics with a float or int value type")
+
+
+PROBE_DATA_VIEW_SQL = f"""
+CREATE OR REPLACE VIEW {SCHEMA_NAME}.probe_data AS
+SELECT sd.time, s.probe_uuid, s.reference_uuid, s.metric_type_uuid, sd.value, sd.value_num
+FROM {SCHEMA_NAME}.series_data sd
+JOIN {SCHEMA_NAME}.series s ON s.series_id = sd.series_id
+"""  # noqa: S608
+
+# Data access functions: name -> (identifying parameters, series filter)
+DATA_FUNCTIONS = {
+    "get_probe_data_by_probe": ("probe_uuid_param TEXT", "s.probe_uuid = probe_uuid_param"),
+    "get_probe_data_by_metric": ("metric_type_uuid_param TEXT", "s.metric_type_uuid = metric_type_uuid_param"),
+    "get_probe_data_by_probe_and_metric": (
+        "probe_uuid_param TEXT, metric_type_uuid_param TEXT",
+        "s.probe_uuid = probe_uuid_param AND s.metric_type_uuid = metric_type_uuid_param",
+    ),
+}
+
+
+def data_function_sql(name: str, params: str, where: str) -> str:
+    """
+    Build one of the time ranged data access functions.
+
+    The functions are plain STABLE SQL so the planner inlines them into the calling query, which lets it use the
+    series_data primary key and exclude chunks outside the requested range. Rows are ordered by (time, series_id);
+    passing the last row's time and series_id as after_time and after_series_id returns the next page. With
+    bucket_width, numeric readings are averaged per series into buckets aligned with time_bucket.
+
+    Args:
+        name: Function name.
+        params: Parameters identifying the series to return.
+        where: Condition on the series table, aliased s, selecting those series.
+
+    Returns:
+        SQL creating the function.
+
+    """
+    return f"""
+CREATE OR REPLACE FUNCTION {name}(
+    {params},
+    start_time TIMESTAMP DEFAULT NULL,
+    end_time TIMESTAMP DEFAULT NULL,
+    max_rows INTEGER DEFAULT NULL,
+    after_time TIMESTAMP DEFAULT NULL,
+    after_series_id INTEGER DEFAULT NULL,
+    bucket_width INTERVAL DEFAULT NULL
+)
+RETURNS TABLE(
+    "time" TIMESTAMP,
+    probe_uuid VARCHAR(36),
+    reference_uuid VARCHAR(36),
+    metric_type_uuid VARCHAR(36),
+    value JSONB,
+    value_num DOUBLE PRECISION,
+    series_id INTEGER
+)
+LANGUAGE sql STABLE PARALLEL SAFE
+AS $$
+SELECT r.* FROM (
+    SELECT sd.time AS "time", s.probe_uuid, s.reference_uuid, s.metric_type_uuid,
+        COALESCE(sd.value, to_jsonb(sd.value_num)) AS value, sd.value_num, s.series_id
+    FROM {SCHEMA_NAME}.series s
+    JOIN {SCHEMA_NAME}.series_data sd ON sd.series_id = s.series_id
+    WHERE bucket_width IS NULL AND {where}
+      AND sd.time >= COALESCE(GREATEST(start_time, after_time), '-infinity')
+      AND sd.time < COALESCE(end_time, 'infinity')
+    UNION ALL
+    SELECT date_bin(bucket_width, sd.time, TIMESTAMP '2000-01-03'), s.probe_uuid, s.reference_uuid,
+        s.metric_type_uuid, to_jsonb(avg(sd.value_num)), avg(sd.value_num), s.series_id
+    FROM {SCHEMA_NAME}.series s
+    JOIN {SCHEMA_NAME}.series_data sd ON sd.series_id = s.series_id
+    WHERE bucket_width IS NOT NULL AND {where} AND sd.value_num IS NOT NULL
+      AND sd.time >= COALESCE(GREATEST(start_time, after_time), '-infinity')
+      AND sd.time < COALESCE(end_time, 'infinity')
+    GROUP BY 1, s.series_id, s.probe_uuid, s.reference_uuid, s.metric_type_uuid
+) r
+WHERE after_time IS NULL OR (r.time, r.series_id) > (after_time, COALESCE(after_series_id, 2147483647))
+ORDER BY r.time, r.series_id
+LIMIT max_rows
+$$;
+"""  # noqa: S608
 
 
 class MetricType(Base):
@@ -521,3 +679,20 @@ def get_table_names():
 
     """
     return [table.name for table in Base.metadata.sorted_tables]
+
+
+def create_tables(engine: Engine) -> None:
+    """
+    Create every ORM table that does not exist yet, then the views and data access functions built on them.
+
+    Args:
+        engine: Engine for the database to create the tables in.
+
+    """
+    tables = [table for table in Base.metadata.sorted_tables if not table.info.get("is_view")]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:
+        conn.execute(text(PROBE_DATA_VIEW_SQL))
+        for name, (params, where) in DATA_FUNCTIONS.items():
+            conn.execute(text(f"DROP FUNCTION IF EXISTS {name}"))
+            conn.execute(text(data_function_sql(name, params, where)))
@@ -0,0 +1,192 @@
+"""Bulk writers for moving prepared time data frames into the series_data table."""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from opensampl.db.compression import decompress_chunks, is_compressed_chunk_error
+from opensampl.db.orm import SeriesData
+
+SERIES_DATA_COLUMNS = ["time", "series_id", "value", "value_num"]
+SERIES_DATA_KEY = ["series_id", "time"]
+STAGE_TABLE = "_series_data_stage"
+
+
+def series_data_table() -> str:
+    """Return the schema qualified name of the series_data table."""
+    return f"{SeriesData.__table__.schema}.{SeriesData.__tablename__}"
+
+
+def supports_copy(session: Session) -> bool:
+    """
+    Determine whether the session is bound to a database that accepts COPY ... FROM STDIN.
+
+    Args:
+        session: SQLAlchemy session the data will be written through.
+
+    Returns:
+        True if the session is bound to postgres through psycopg2, False otherwise.
+
+    """
+    bind = session.get_bind()
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2"
+
+
+def encode_json_values(values: pd.Series) -> pd.Series:
+    """
+    Encode a value column as JSON text for the JSONB value column.
+
+    Numeric columns are converted in one vectorized pass, only object columns fall back to json.dumps per row. Missing
+    values, such as those of numeric metrics which are stored in value_num instead, stay missing.
+
+    Args:
+        values: The value column of a time data frame.
+
+    Returns:
+        Series of JSON encoded strings, or None where there is no value.
+
+    """
+    present = values.notna()
+    if not present.any():
+        return pd.Series([None] * len(values), index=values.index, dtype=object)
+    if pd.api.types.is_bool_dtype(values):
+        return values.map({True: "true", False: "false"})
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(str).where(present, None)
+    return values.apply(json.dumps).where(present, None)
+
+
+def _with_value_num(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the frame with a value_num column, left empty if the frame was prepared without one."""
+    if "value_num" in df.columns:
+        return df
+    return df.assign(value_num=np.nan)
+
+
+def to_copy_buffer(df: pd.DataFrame) -> io.StringIO:
+    """
+    Render a prepared probe data frame as CSV suitable for COPY ... FROM STDIN.
+
+    Args:
+        df: DataFrame with time (tz-aware), series_id, value and optionally value_num columns.
+
+    Returns:
+        StringIO buffer positioned at the start of the CSV content.
+
+    """
+    out = _with_value_num(df)[SERIES_DATA_COLUMNS].copy()
+    # series_data.time is timestamp without time zone, so send naive UTC rather than relying on the session timezone
+    out["time"] = out["time"].dt.tz_convert("UTC").dt.tz_localize(None)
+    out["value"] = encode_json_values(out["value"])
+    buffer = io.StringIO()
+    out.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+    buffer.seek(0)
+    return buffer
+
+
+def copy_probe_data(session: Session, df: pd.DataFrame) -> int:
+    """
+    Stream the frame into a temporary staging table with COPY, then merge it into series_data in one statement.
+
+    Runs inside the session's current transaction; committing or rolling back is left to the caller.
+
+    Args:
+        session: SQLAlchemy session bound to postgres through psycopg2.
+        df: DataFrame with time (tz-aware), series_id, value and optionally value_num columns.
+
+    Returns:
+        Number of rows inserted into series_data. Rows that conflict with existing entries are not counted.
+
+    """
+    columns = ", ".join(SERIES_DATA_COLUMNS)
+    session.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} "
+            f"(LIKE {series_data_table()} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+    )
+    session.execute(text(f"TRUNCATE {STAGE_TABLE}"))
+
+    buffer = to_copy_buffer(df)
+    dbapi_connection = session.connection().connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {STAGE_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        logger.debug(f"Staged {cursor.rowcount} rows through COPY")
+
+    result = session.execute(
+        text(f"""
+        INSERT INTO {series_data_table()} ({columns})
+        SELECT {columns} FROM {STAGE_TABLE}
+        ON CONFLICT ({", ".join(SERIES_DATA_KEY)})
+        DO NOTHING
+        """)  # noqa: S608
+    )
+    return result.rowcount  # ty: ignore[unresolved-attribute]
+
+
+def insert_probe_data(session: Session, df: pd.DataFrame) -> int:
+    """
+    Insert the frame into series_data through an executemany INSERT.
+
+    Used for databases which cannot accept COPY, and kept as the baseline for the ingest benchmarks.
+
+    Args:
+        session: SQLAlchemy session.
+        df: DataFrame with time (tz-aware), series_id, value and optionally value_num columns.
+
+    Returns:
+        Number of rows inserted into series_data. Rows that conflict with existing entries are not counted.
+
+    """
+    df = _with_value_num(df)
+    value_num = df["value_num"].astype(object).where(df["value_num"].notna(), None)
+    records = (
+        df[SERIES_DATA_COLUMNS]
+        .assign(value=encode_json_values(df["value"]), value_num=value_num)
+        .to_dict(orient="records")
+    )
+    insert_stmt = text(f"""
+    INSERT INTO {series_data_table()}
+    (time, series_id, value, value_num)
+    VALUES (:time, :series_id, :value, :value_num)
+    ON CONFLICT ({", ".join(SERIES_DATA_KEY)})
+    DO NOTHING
+    """)  # noqa: S608
+    result = session.execute(insert_stmt, records)
+    return result.rowcount  # ty: ignore[unresolved-attribute]
+
+
+def write_probe_data(session: Session, df: pd.DataFrame) -> int:
+    """
+    Write the frame into series_data using COPY where the database supports it.
+
+    The write runs in a savepoint. If the database rejects it because some of the rows fall in compressed chunks, as
+    TimescaleDB releases before 2.11 do for late arriving backfills, those chunks are decompressed and the write is
+    retried. The compression policy compresses them again later.
+
+    Args:
+        session: SQLAlchemy session.
+        df: DataFrame with time (tz-aware), series_id, value and optionally value_num columns.
+
+    Returns:
+        Number of rows inserted into series_data.
+
+    """
+    writer = copy_probe_data if supports_copy(session) else insert_probe_data
+    try:
+        with session.begin_nested():
+            return writer(session, df)
+    except DBAPIError as e:
+        if not is_compressed_chunk_error(e):
+            raise
+    logger.info("Time data falls in compressed chunks, decompressing them before writing")
+    # Chunk ranges are timestamp without time zone, so compare naive UTC as to_copy_buffer writes it
+    times = df["time"].dt.tz_convert("UTC").dt.tz_localize(None)
+    decompress_chunks(session, times.min().to_pydatetime(), times.max().to_pydatetime())
+    return writer(session, df)
@@ -0,0 +1,210 @@
+"""Process-level cache of resolved probe/metric/reference identities used when loading time data."""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from opensampl.db.orm import MetricType as DBMetricType
+from opensampl.db.orm import ReferenceType as DBReferenceType
+from opensampl.metrics import MetricType
+from opensampl.references import REF_TYPES, CompoundReferenceType, ReferenceType
+from opensampl.vendors.constants import ProbeKey
+
+# Tables whose rows make up a series identity. Writing to any of them invalidates cached identities.
+IDENTITY_TABLES = {"probe_metadata", "metric_type", "reference_type", "reference", "series"}
+
+
+class SeriesIdentity(BaseModel):
+    """The database identifiers for one probe/metric/reference series"""
+
+    model_config = ConfigDict(frozen=True)
+
+    series_id: int
+    probe_uuid: str
+    metric_type_uuid: str
+    reference_uuid: str
+    probe_readable: str
+    metric_type: MetricType = Field(exclude=True)
+    cache_key: tuple = Field(exclude=True)
+
+
+class SeriesCache:
+    """
+    Bounded LRU cache, with a time to live, mapping series definitions to their resolved database identifiers.
+
+    Also keeps a name -> uuid lookup for metric and reference types, preloaded in a single query per table and
+    reloaded once it is older than the same time to live. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 900.0):
+        """
+        Initialize an empty series cache.
+
+        Args:
+            maxsize: Maximum number of series identities kept before the least recently used is evicted.
+            ttl: Seconds a resolved identity, or the preloaded type lookup, is trusted before it is read from the
+                database again.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[float, SeriesIdentity]] = OrderedDict()
+        self._type_uuids: dict[tuple[str, str], str] = {}
+        self._preloaded_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        """Update the size and time to live limits, evicting entries if the cache is now over size."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._evict()
+
+    @staticmethod
+    def make_key(
+        probe_key: ProbeKey,
+        metric_type: MetricType,
+        reference_type: ReferenceType,
+        compound_key: dict[str, Any] | None,
+        strict: bool,
+    ) -> tuple:
+        """Build the hashable cache key for a series definition."""
+        return (
+            repr(probe_key),
+            metric_type.model_dump_json(),
+            reference_type.model_dump_json(),
+            json.dumps(compound_key, sort_keys=True, default=str),
+            strict,
+        )
+
+    def get(self, key: tuple) -> SeriesIdentity | None:
+        """Return the cached identity for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, identity = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return identity
+
+    def put(self, identity: SeriesIdentity) -> None:
+        """
+        Store a resolved identity.
+
+        Should only be called once the transaction that resolved the identity has committed, so that rows which were
+        created and then rolled back never end up in the cache. Entries that are already cached keep their timestamp.
+        """
+        with self._lock:
+            if identity.cache_key in self._entries:
+                self._entries.move_to_end(identity.cache_key)
+                return
+            self._entries[identity.cache_key] = (time.monotonic(), identity)
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, probe_key: ProbeKey) -> int:
+        """
+        Drop every cached identity for the given probe.
+
+        Returns:
+            Number of entries removed.
+
+        """
+        probe_repr = repr(probe_key)
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == probe_repr]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached series for {probe_repr}")
+        return len(stale)
+
+    def invalidate_table(self, table: str) -> None:
+        """Clear the cache if table holds rows that make up a series identity."""
+        compound_tables = {
+            ref.reference_table for ref in REF_TYPES.__dict__.values() if isinstance(ref, CompoundReferenceType)
+        }
+        if table in IDENTITY_TABLES | compound_tables:
+            logger.debug(f"Write to {table} invalidated the series cache")
+            self.clear()
+
+    def clear(self) -> None:
+        """Drop all cached identities and type lookups."""
+        with self._lock:
+            self._entries.clear()
+            self._type_uuids.clear()
+            self._preloaded_at = None
+
+    def _types_expired(self) -> bool:
+        """Drop the type lookups if they were never loaded or are older than the ttl. Call with the lock held."""
+        if self._preloaded_at is not None and time.monotonic() - self._preloaded_at <= self.ttl:
+            return False
+        self._type_uuids.clear()
+        self._preloaded_at = None
+        return True
+
+    @property
+    def preloaded(self) -> bool:
+        """Whether the type lookups are loaded and within their time to live."""
+        with self._lock:
+            return not self._types_expired()
+
+    def type_uuid(self, table: str, name: str) -> str | None:
+        """Return the preloaded uuid of the metric_type or reference_type row with the given name, if still fresh."""
+        with self._lock:
+            if self._types_expired():
+                return None
+            return self._type_uuids.get((table, name))
+
+    def preload(self, session: Session) -> None:
+        """
+        Load every metric type and reference type uuid, which covers METRICS and REF_TYPES, in one query per table.
+
+        Does nothing while the lookups are loaded and younger than the ttl, until the cache is cleared.
+        """
+        if self.preloaded:
+            return
+        type_uuids = {}
+        for model in (DBMetricType, DBReferenceType):
+            for name, uuid in session.execute(select(model.name, model.uuid)).all():
+                type_uuids[(model.__tablename__, name)] = uuid
+        with self._lock:
+            self._type_uuids = type_uuids
+            self._preloaded_at = time.monotonic()
+        logger.debug(f"Preloaded {len(type_uuids)} metric and reference types")
+
+    def stats(self) -> dict[str, int | float]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+series_cache = SeriesCache()
@@ -0,0 +1,166 @@
+"""Process-wide HTTP client used to route operations through the backend."""
+
+import inspect
+import os
+import threading
+import time
+from typing import Any
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from opensampl.config.base import BaseConfig
+
+# Uploads are safe to repeat: time data conflicts are skipped and metadata/table writes are upserts
+RETRY_METHODS = frozenset({"GET", "POST", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 503})
+# Retry only takes backoff_jitter from urllib3 2.0; older versions back off without jitter
+RETRY_JITTER = "backoff_jitter" in inspect.signature(Retry).parameters
+
+
+class BackendClient:
+    """
+    Keep-alive HTTP client for the backend, shared by every thread in the process.
+
+    Connections are pooled, at most max_in_flight requests are sent at once (further callers block until a slot is
+    free), and requests are retried with jittered exponential backoff on connection errors and 429/503 responses.
+    Latency of every request is recorded per endpoint.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_in_flight: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 300,
+        verify: bool = True,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: URL of the backend service.
+            max_in_flight: Maximum number of concurrent requests, and connections kept alive.
+            retries: Number of times a failed request is retried.
+            backoff: Base delay in seconds for the exponential backoff between retries.
+            timeout: Seconds to wait for the backend to respond.
+            verify: Whether to verify the backend's TLS certificate.
+
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._stats_lock = threading.Lock()
+        self._latency: dict[str, dict[str, float]] = {}
+
+        jitter = {"backoff_jitter": backoff} if RETRY_JITTER else {}
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            **jitter,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight, max_retries=retry, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.verify = verify
+
+    def request(self, method: str, endpoint: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request to an endpoint of the backend, waiting for a free slot if max_in_flight are already running.
+
+        Args:
+            method: HTTP method.
+            endpoint: Path of the endpoint, relative to the backend url.
+            **kwargs: Passed on to requests.Session.request.
+
+        Returns:
+            The response, after any retries.
+
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                return self.session.request(method=method, url=url, **kwargs)
+            finally:
+                self._record(endpoint, time.perf_counter() - start)
+
+    def _record(self, endpoint: str, elapsed: float) -> None:
+        with self._stats_lock:
+            stats = self._latency.setdefault(endpoint, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            stats["count"] += 1
+            stats["total_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+        logger.debug(f"{endpoint} took {elapsed:.3f}s")
+
+    def latency_stats(self) -> dict[str, dict[str, float]]:
+        """Return request count, mean and max latency in seconds per endpoint."""
+        with self._stats_lock:
+            return {
+                endpoint: {**stats, "mean_s": stats["total_s"] / stats["count"]}
+                for endpoint, stats in self._latency.items()
+            }
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+
+
+_client_lock = threading.Lock()
+_client: BackendClient | None = None
+_client_key: tuple | None = None
+
+
+def _client_options(config: BaseConfig) -> dict[str, Any]:
+    return {
+        "base_url": config.BACKEND_URL,
+        "max_in_flight": config.BACKEND_MAX_IN_FLIGHT,
+        "retries": config.BACKEND_RETRIES,
+        "backoff": config.BACKEND_BACKOFF,
+        "timeout": config.BACKEND_TIMEOUT,
+        "verify": not config.INSECURE_REQUESTS,
+    }
+
+
+def get_client(config: BaseConfig) -> BackendClient:
+    """
+    Get the process-wide backend client, creating it on first use.
+
+    Like the database engine, the client is rebuilt if its settings change or the process has been forked.
+    """
+    global _client, _client_key  # noqa: PLW0603
+    options = _client_options(config)
+    key = (os.getpid(), tuple(sorted(options.items())))
+
+    with _client_lock:
+        if _client is not None and _client_key == key:
+            return _client
+        if _client is not None and _client_key[0] == os.getpid():
+            _client.close()
+
+        logger.debug(f"Creating backend client with options {options}")
+        _client = BackendClient(**options)
+        _client_key = key
+        return _client
+
+
+def client_stats() -> dict[str, dict[str, float]]:
+    """Return per endpoint latency statistics of the process-wide client, or an empty dict if none exists."""
+    with _client_lock:
+        client = _client
+    if client is None:
+        return {}
+    return client.latency_stats()
@@ -3,6 +3,8 @@
 from typing import Any
 
 from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import Session
 
@@ -11,6 +13,8 @@ from opensampl.db.orm import MetricType as DBMetricType
 from opensampl.db.orm import ProbeMetadata as DBProbe
 from opensampl.db.orm import Reference as DBReference
 from opensampl.db.orm import ReferenceType as DBReferenceType
+from opensampl.db.orm import Series as DBSeries
+from opensampl.load.cache import SeriesIdentity, series_cache
 from opensampl.load.table_factory import TableFactory
 from opensampl.metrics import METRICS, MetricType
 from opensampl.references import REF_TYPES, CompoundReferenceType, ReferenceType
@@ -22,7 +26,8 @@ class DataFactory:
     Data factory for defining the unique probe/metric/reference combination for Data readings
 
     Will take the references and attempt to resolve them into a probe, metric type, and reference object. The reference
-    object will also have the database object for any compound references filled as well.
+    object will also have the database object for any compound references filled as well. The series for the
+    combination, which time data is written against, is created if it does not exist yet.
     """
 
     probe: DBProbe | None = None
@@ -30,6 +35,7 @@ class DataFactory:
     db_ref_type: DBReferenceType | None = None
     reference: DBReference | None = None
     db_compound_reference: Base | None = None
+    series: DBSeries | None = None
 
     def __init__(
         self,
@@ -60,6 +66,63 @@ class DataFactory:
         self.strict = strict
         self.fill_db_values()
 
+    @classmethod
+    def resolve(
+        cls,
+        probe_key: ProbeKey,
+        metric_type: MetricType,
+        reference_type: ReferenceType,
+        session: Session,
+        compound_key: dict[str, Any] | None = None,
+        strict: bool = True,
+    ) -> SeriesIdentity:
+        """
+        Resolve the database identifiers for a series, using the process-level series cache where possible.
+
+        Identities resolved from the database are not added to the cache here; call series_cache.put once the
+        transaction has been committed.
+
+        Returns:
+            SeriesIdentity with the series_id and the probe, metric type and reference uuids, and the metric type
+            resolved, which is UNKNOWN if metric_type could not be found or created and strict is False.
+
+        """
+        key = series_cache.make_key(probe_key, metric_type, reference_type, compound_key, strict)
+        identity = series_cache.get(key)
+        if identity is not None:
+            return identity
+
+        series_cache.preload(session)
+        factory = cls(
+            probe_key=probe_key,
+            metric_type=metric_type,
+            reference_type=reference_type,
+            compound_key=compound_key,
+            strict=strict,
+            session=session,
+        )
+        return factory.identity(cache_key=key)
+
+    def identity(self, cache_key: tuple) -> SeriesIdentity:
+        """
+        Get the resolved identifiers for this series.
+
+        Raises:
+            RuntimeError: If the probe, metric, reference, or series could not be resolved.
+
+        """
+        if any(x is None for x in [self.probe, self.metric, self.reference, self.series]):
+            raise RuntimeError(f"Not all required definition fields filled: {self.dump_factory()}")
+        return SeriesIdentity(
+            series_id=self.series.series_id,
+            probe_uuid=self.probe.uuid,
+            metric_type_uuid=self.metric.uuid,
+            reference_uuid=self.reference.uuid,
+            probe_readable=self.probe.name or f"{self.probe.ip_address} ({self.probe.probe_id})",
+            metric_type=self.metric_type,
+            cache_key=cache_key,
+        )
+
     def dump_factory(self):
         """
         Dump a dict version of the data factory
@@ -74,6 +137,7 @@ class DataFactory:
             "db_ref_type": self.db_ref_type.to_dict() if self.db_ref_type else None,
             "db_reference": self.reference.to_dict() if self.reference else None,
             "db_compound_reference": self.db_compound_reference.to_dict() if self.db_compound_reference else None,
+            "db_series": self.series.to_dict() if self.series else None,
             "probe_key": self.probe_key.model_dump(),
             "metric_type": self.metric_type.model_dump_json(),
             "reference_type": self.reference_type.model_dump(),
@@ -82,7 +146,7 @@ class DataFactory:
 
     def fill_db_values(self):
         """
-        Fill in the probe, metric, reference, and compound reference from the database.
+        Fill in the probe, metric, reference, compound reference, and series from the database.
 
         Returns:
             Self for method chaining.
@@ -102,6 +166,9 @@ class DataFactory:
         self.get_reference()  # put the reference type and what is being referenced together to get the Reference
         self.session.flush()
 
+        self.get_series()  # the probe, metric and reference together make up the series the data is written to
+        self.session.flush()
+
         return self
 
     def not_found(self, msg: str, unstrict_msg: str = "Filling value with UNKNOWN") -> None:
@@ -138,6 +205,12 @@ class DataFactory:
         If the metric type doesn't exist, attempts to create it. If creation fails,
         falls back to UNKNOWN metric type.
         """
+        cached_uuid = series_cache.type_uuid("metric_type", self.metric_type.name)
+        if cached_uuid is not None:
+            self.metric = self.session.get(DBMetricType, cached_uuid)
+            if self.metric is not None:
+                return
+
         metric_factory = TableFactory("metric_type", session=self.session)
         self.metric = metric_factory.find_existing(data=self.metric_type.model_dump())
 
@@ -164,6 +237,12 @@ class DataFactory:
         Handles both simple and compound reference types. For compound types,
         attempts to find existing types or creates unknown compound types.
         """
+        cached_uuid = series_cache.type_uuid("reference_type", self.reference_type.name)
+        if cached_uuid is not None:
+            self.db_ref_type = self.session.get(DBReferenceType, cached_uuid)
+            if self.db_ref_type is not None:
+                return
+
         ref_type_factory = TableFactory("reference_type", session=self.session)
         self.db_ref_type = ref_type_factory.find_existing(data=self.reference_type.model_dump())
 
@@ -290,3 +369,28 @@ class DataFactory:
         logger.debug(f"{reference_data=}")
         # Write with if_exists='ignore' will return a found existing object matching the fields.
         self.reference = reference_factory.write(data=reference_data, if_exists="ignore")
+
+    def get_series(self):
+        """
+        Get the series object for the data.
+
+        Creates the series for the probe, metric type, and reference if there is none yet. The series is inserted with
+        ON CONFLICT DO NOTHING and then selected, as the probe_data insert trigger does, so that loaders creating the
+        same new series at once all end up with the one row instead of the later ones failing on uq_series_identity.
+        """
+        if any(x is None for x in [self.probe, self.metric, self.reference]):
+            return
+        model = TableFactory("series", session=self.session).model
+        series_data = {
+            "probe_uuid": self.probe.uuid,
+            "reference_uuid": self.reference.uuid,
+            "metric_type_uuid": self.metric.uuid,
+        }
+        if self.session.get_bind().dialect.name == "sqlite":
+            insert = sqlite.insert(model).values(series_data).on_conflict_do_nothing(index_elements=list(series_data))
+        else:
+            insert = (
+                postgresql.insert(model).values(series_data).on_conflict_do_nothing(constraint="uq_series_identity")
+            )
+        self.session.execute(insert)
+        self.series = self.session.scalars(select(model).filter_by(**series_data)).one()
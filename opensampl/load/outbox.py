@@ -0,0 +1,425 @@
+"""Durable local outbox for uploads the backend could not take yet, flushed back to it in the background."""
+
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import requests
+import requests.exceptions
+from loguru import logger
+from pydantic import BaseModel
+
+from opensampl.config.base import BaseConfig
+from opensampl.load.series import SeriesBatch, merge_series, series_frame, series_from_frame
+from opensampl.load.wire import available_formats, decode_frame, encode_frame
+
+TIME_DATA_ENDPOINTS = frozenset({"load_time_data", "load_time_data_batch"})
+OUTBOX_ENDPOINTS = TIME_DATA_ENDPOINTS | {"load_probe_metadata"}
+# Responses meaning the backend is down or overloaded, rather than that the upload is bad
+TRANSIENT_STATUSES = frozenset({429, 502, 503, 504})
+
+# Called as send(endpoint, payload, send_file=...) and raises requests.exceptions.RequestException on failure
+Sender = Callable[..., requests.Response]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    endpoint TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    frame BLOB,
+    content_type TEXT,
+    filename TEXT,
+    rows INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    lease_until REAL NOT NULL DEFAULT 0
+)
+"""
+
+
+def is_transient(error: requests.exceptions.RequestException) -> bool:
+    """Return True if the request failed because the backend was unreachable or busy, so it is worth retrying."""
+    if isinstance(
+        error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.RetryError)
+    ):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in TRANSIENT_STATUSES
+
+
+class FlushResult(BaseModel):
+    """Outcome of one pass over the outbox"""
+
+    sent: int = 0
+    uploads: int = 0
+    failed: int = 0
+    remaining: int = 0
+    unavailable: bool = False
+
+
+class Outbox:
+    """
+    Queue of routed uploads kept in a local SQLite file until the backend accepts them.
+
+    Time data and probe metadata uploads are stored in the order they were made. Flushing sends them in that order,
+    merging runs of adjacent time data uploads into a single load_time_data_batch upload of at most max_batch_rows
+    rows, with the data for each series combined. An upload the backend rejects outright is retried on its own and,
+    if still rejected, marked failed and kept for inspection; when the backend is unreachable or busy flushing stops
+    and the uploads are left pending.
+
+    Several threads and processes may share the file. Entries being sent are leased so that only one flusher sends
+    them; a lease left by a process that died expires after lease_seconds.
+    """
+
+    def __init__(self, path: Path, max_batch_rows: int = 500_000, lease_seconds: float = 900):
+        """
+        Initialize the outbox, creating its file if needed.
+
+        Args:
+            path: SQLite file the uploads are kept in.
+            max_batch_rows: Most time data rows merged into one upload.
+            lease_seconds: Seconds an entry being sent is hidden from other flushers.
+
+        """
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_batch_rows = max_batch_rows
+        self.lease_seconds = lease_seconds
+        self.wire_format = "arrow" if "arrow" in available_formats() else "csv"
+        self._flush_lock = threading.Lock()
+        self._flusher_lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._stop = threading.Event()
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            # Lets status and put proceed while a flusher is reading
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+    @contextmanager
+    def _connect(self, write: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Open a connection, committing on success and rolling back on error.
+
+        Writes take the database's write lock up front. Reads use a deferred transaction, which under WAL never waits
+        for a writer, so checking the outbox on every routed upload does not contend with flushers and other loaders.
+        """
+        with closing(sqlite3.connect(self.path, timeout=30, isolation_level=None)) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN DEFERRED")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def put(self, endpoint: str, payload: dict[str, Any]) -> int:
+        """
+        Store a routed upload to be sent later.
+
+        Args:
+            endpoint: Backend endpoint the upload was routed to; one of OUTBOX_ENDPOINTS.
+            payload: The routed function's payload. Time data uploads are stored as load_time_data_batch uploads.
+
+        Returns:
+            The id of the stored entry.
+
+        """
+        if endpoint not in OUTBOX_ENDPOINTS:
+            raise ValueError(f"{endpoint} uploads cannot be held in the outbox")
+
+        frame = content_type = filename = None
+        rows = 0
+        if endpoint in TIME_DATA_ENDPOINTS:
+            identities, strict, data = _time_data_parts(endpoint, payload)
+            rows = len(data)
+            filename, frame, content_type = encode_frame(data, "outbox", self.wire_format)
+            endpoint = "load_time_data_batch"
+            payload = {"series": identities, "strict": strict}
+
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO outbox (endpoint, payload, frame, content_type, filename, rows, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (endpoint, json.dumps(payload), frame, content_type, filename, rows, time.time()),
+            )
+            return cursor.lastrowid
+
+    def pending(self) -> int:
+        """Return the number of uploads waiting to be sent."""
+        with self._connect(write=False) as conn:
+            return conn.execute("SELECT COUNT(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def status(self) -> list[dict[str, Any]]:
+        """Return the number of uploads, rows, oldest upload time and most attempts per endpoint and status."""
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                "SELECT endpoint, status, COUNT(*) AS uploads, SUM(rows) AS rows, MIN(created_at) AS oldest, "
+                "MAX(attempts) AS attempts FROM outbox GROUP BY endpoint, status ORDER BY endpoint, status"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def errors(self, limit: int = 10) -> list[dict[str, Any]]:
+        """Return the most recent failed uploads and why they failed."""
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                "SELECT id, endpoint, rows, attempts, last_error FROM outbox WHERE status = 'failed' "
+                "ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def retry_failed(self) -> int:
+        """Return failed uploads to the queue; returns how many were requeued."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'failed'").rowcount
+
+    def _claim(self) -> list[sqlite3.Row]:
+        """Lease the next upload, plus the time data uploads that directly follow it if it is time data."""
+        now = time.time()
+        with self._connect() as conn:
+            candidates = conn.execute(
+                "SELECT id, endpoint, payload, rows, lease_until FROM outbox WHERE status = 'pending' "
+                "ORDER BY id LIMIT 1000"
+            ).fetchall()
+            # Another flusher is sending the oldest upload; leave the rest to it so uploads stay in order
+            if not candidates or candidates[0]["lease_until"] > now:
+                return []
+
+            group = [candidates[0]]
+            if group[0]["endpoint"] in TIME_DATA_ENDPOINTS:
+                strict = json.loads(group[0]["payload"])["strict"]
+                rows = group[0]["rows"]
+                for entry in candidates[1:]:
+                    if (
+                        entry["endpoint"] not in TIME_DATA_ENDPOINTS
+                        or entry["lease_until"] > now
+                        or json.loads(entry["payload"])["strict"] != strict
+                        or rows + entry["rows"] > self.max_batch_rows
+                    ):
+                        break
+                    group.append(entry)
+                    rows += entry["rows"]
+
+            ids = [entry["id"] for entry in group]
+            conn.execute(
+                f"UPDATE outbox SET lease_until = ? WHERE id IN ({','.join('?' * len(ids))})",  # noqa: S608
+                (now + self.lease_seconds, *ids),
+            )
+        return group
+
+    def _request(self, group: list[sqlite3.Row]) -> tuple[str, dict[str, Any], bool]:
+        """Build the endpoint and payload sending the group as one upload."""
+        first = group[0]
+        if first["endpoint"] not in TIME_DATA_ENDPOINTS:
+            return first["endpoint"], json.loads(first["payload"]), False
+
+        series: list[SeriesBatch] = []
+        with self._connect(write=False) as conn:
+            for entry in group:
+                stored = conn.execute(
+                    "SELECT frame, content_type, filename FROM outbox WHERE id = ?", (entry["id"],)
+                ).fetchone()
+                frame = decode_frame(stored["frame"], stored["content_type"], stored["filename"])
+                series.extend(series_from_frame(json.loads(entry["payload"])["series"], frame))
+        series = merge_series(series)
+        strict = json.loads(first["payload"])["strict"]
+        payload = {
+            "data": {
+                "series_str": json.dumps([batch.identity_payload() for batch in series]),
+                "strict": json.dumps(strict),
+            },
+            "frame": series_frame(series),
+            "name": "time_data_batch",
+        }
+        return "load_time_data_batch", payload, True
+
+    def _finish(self, group: list[sqlite3.Row], status: str | None, error: str | None = None) -> None:
+        """Delete sent uploads (status None), or release their lease recording the attempt if there was an error."""
+        ids = [entry["id"] for entry in group]
+        if not ids:
+            return
+        placeholders = ",".join("?" * len(ids))
+        with self._connect() as conn:
+            if status is None:
+                conn.execute(f"DELETE FROM outbox WHERE id IN ({placeholders})", ids)  # noqa: S608
+            elif error is None:
+                conn.execute(f"UPDATE outbox SET lease_until = 0 WHERE id IN ({placeholders})", ids)  # noqa: S608
+            else:
+                record = "status = ?, attempts = attempts + 1, last_error = ?, lease_until = 0"
+                conn.execute(
+                    f"UPDATE outbox SET {record} WHERE id IN ({placeholders})",  # noqa: S608
+                    (status, error, *ids),
+                )
+
+    def _send_individually(self, group: list[sqlite3.Row], send: Sender, result: FlushResult) -> bool:
+        for index, entry in enumerate(group):
+            if not self._send([entry], send, result):
+                self._finish(group[index + 1 :], "pending")
+                return False
+        return True
+
+    def _send(self, group: list[sqlite3.Row], send: Sender, result: FlushResult) -> bool:
+        """
+        Send the group as one upload, splitting it up if the backend rejects it.
+
+        Returns:
+            False if the backend was unavailable, in which case the group is left pending.
+
+        """
+        try:
+            endpoint, payload, send_file = self._request(group)
+        except Exception as e:
+            if len(group) > 1:
+                return self._send_individually(group, send, result)
+            logger.error(f"Outbox entry {group[0]['id']} could not be read, marking failed: {e}")
+            self._finish(group, "failed", str(e))
+            result.failed += 1
+            return True
+
+        try:
+            send(endpoint, payload, send_file=send_file)
+        except requests.exceptions.RequestException as e:
+            if is_transient(e):
+                self._finish(group, "pending", str(e))
+                return False
+            response = getattr(e, "response", None)
+            if response is not None and response.status_code == 409:
+                logger.warning(f"Outbox upload of {len(group)} entries already loaded, dropping it: {e}")
+            elif len(group) > 1:
+                logger.warning(f"Merged outbox upload of {len(group)} entries rejected, sending individually: {e}")
+                return self._send_individually(group, send, result)
+            else:
+                logger.error(f"Outbox entry {group[0]['id']} rejected by backend, marking failed: {e}")
+                self._finish(group, "failed", str(e))
+                result.failed += 1
+                return True
+
+        self._finish(group, None)
+        result.sent += len(group)
+        result.uploads += 1
+        return True
+
+    def flush(self, send: Sender) -> FlushResult:
+        """
+        Send pending uploads, oldest first, until none are left or the backend is unavailable.
+
+        Args:
+            send: Called as send(endpoint, payload, send_file=...) for each upload; raises
+                requests.exceptions.RequestException if the backend does not accept it.
+
+        Returns:
+            FlushResult with the number of entries sent and failed, the uploads made, and what remains.
+
+        """
+        result = FlushResult()
+        with self._flush_lock:
+            while group := self._claim():
+                if not self._send(group, send, result):
+                    result.unavailable = True
+                    break
+        result.remaining = self.pending()
+        if result.sent or result.failed:
+            logger.info(
+                f"Flushed outbox: sent {result.sent} entries in {result.uploads} uploads, {result.failed} failed, "
+                f"{result.remaining} remaining"
+            )
+        return result
+
+    def start_flusher(self, send: Sender, backoff: float = 0.5, max_backoff: float = 300.0) -> None:
+        """
+        Flush in a background thread until the outbox is empty, backing off while the backend is unavailable.
+
+        Does nothing if this outbox's flusher is already running. When the process exits the flusher finishes the
+        upload it is sending and one last flush is attempted; uploads still pending after that stay in the outbox for
+        the next run or for `opensampl outbox flush`.
+        """
+        with self._flusher_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            if self._flusher is None:
+                atexit.register(self._flush_at_exit, send)
+            self._stop.clear()
+            self._flusher = threading.Thread(
+                target=self._flush_loop, args=(send, backoff, max_backoff), name="outbox-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self, send: Sender, backoff: float, max_backoff: float) -> None:
+        delay = backoff
+        while not self._stop.is_set():
+            try:
+                result = self.flush(send)
+            except Exception as e:
+                logger.exception(f"Outbox flush failed: {e}")
+                result = FlushResult(unavailable=True, remaining=1)
+            if not result.remaining:
+                return
+            if result.unavailable:
+                wait = random.uniform(0, delay)  # noqa: S311
+                logger.debug(f"Backend unavailable, {result.remaining} outbox entries pending; retrying in {wait:.1f}s")
+                self._stop.wait(wait)
+                delay = min(delay * 2, max_backoff)
+            else:
+                # Entries leased by another flusher; check back once its lease may have run out
+                self._stop.wait(max_backoff)
+                delay = backoff
+
+    def _flush_at_exit(self, send: Sender) -> None:
+        self.stop()
+        if self.pending():
+            self.flush(send)
+
+    def stop(self) -> None:
+        """Stop the background flusher once its current upload finishes."""
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+
+def _time_data_parts(endpoint: str, payload: dict[str, Any]) -> tuple[list[dict[str, Any]], bool, pd.DataFrame]:
+    """Return the series identities, strictness and combined frame of a routed time data payload."""
+    fields = payload["data"]
+    if endpoint == "load_time_data_batch":
+        return json.loads(fields["series_str"]), json.loads(fields["strict"]), payload["frame"]
+    identity = {
+        "probe_key": json.loads(fields["probe_key_str"]),
+        "metric_type": json.loads(fields["metric_type_str"]),
+        "reference_type": json.loads(fields["reference_type_str"]),
+        "compound_key": json.loads(fields["compound_key_str"]),
+    }
+    return [identity], True, payload["frame"][["time", "value"]].assign(series=0)
+
+
+_outbox_lock = threading.Lock()
+_outbox: Outbox | None = None
+_outbox_key: tuple | None = None
+
+
+def get_outbox(config: BaseConfig) -> Outbox | None:
+    """
+    Get the process-wide outbox for the configured path, or None if OUTBOX_MODE is off.
+
+    Rebuilt if the path or batch size change, or if the process has been forked since it was created.
+    """
+    global _outbox, _outbox_key  # noqa: PLW0603
+    if config.OUTBOX_MODE == "off":
+        return None
+    key = (os.getpid(), Path(config.OUTBOX_PATH).expanduser(), config.OUTBOX_MAX_BATCH_ROWS)
+    with _outbox_lock:
+        if _outbox is None or _outbox_key != key:
+            _outbox = Outbox(config.OUTBOX_PATH, max_batch_rows=config.OUTBOX_MAX_BATCH_ROWS)
+            _outbox_key = key
+        return _outbox
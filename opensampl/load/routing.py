@@ -1,23 +1,290 @@
 """Decorator which ensures we are routing our db operations through a backend if configured, or directly if not."""
 
 import json
+import os
+import threading
 from collections.abc import Callable
-from functools import wraps
-from typing import Literal
+from functools import partial, wraps
+from pathlib import Path
+from typing import Any, Literal
 
 import requests
 import requests.exceptions
 import urllib3
 from loguru import logger
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, make_url
 from sqlalchemy.orm import sessionmaker
 
 from opensampl.config.base import BaseConfig
+from opensampl.load.client import get_client
+from opensampl.load.outbox import OUTBOX_ENDPOINTS, FlushResult, Outbox, get_outbox, is_transient
+from opensampl.load.wire import available_formats, encode_frame
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 request_methods = Literal["POST", "GET", "PUT", "DELETE"]
 
+_config_lock = threading.Lock()
+_config_snapshot: tuple[type, Path | None, float | None, BaseConfig] | None = None
+
+_engine_lock = threading.Lock()
+_engine: Engine | None = None
+_engine_key: tuple | None = None
+_session_factory: sessionmaker | None = None
+
+_wire_lock = threading.Lock()
+_backend_wire_formats: dict[str, list[str]] = {}
+
+
+def _env_file_mtime(env_file: Path | None) -> float | None:
+    """Return the modification time of the env file, or None if it does not exist."""
+    if env_file is None:
+        return None
+    try:
+        return Path(env_file).stat().st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+def get_config() -> BaseConfig:
+    """
+    Get the cached configuration snapshot, reloading it if the env file has changed since it was read.
+
+    Changes made to the process environment itself are not detected; use reset_config to force a reload.
+
+    Returns:
+        BaseConfig shared by every routed call in the process.
+
+    """
+    global _config_snapshot  # noqa: PLW0603
+    with _config_lock:
+        if _config_snapshot is not None:
+            config_cls, env_file, mtime, config = _config_snapshot
+            if config_cls is BaseConfig and _env_file_mtime(env_file) == mtime:
+                return config
+
+        config = BaseConfig()
+        env_file = getattr(config, "env_file", None)
+        _config_snapshot = (BaseConfig, env_file, _env_file_mtime(env_file), config)
+        logger.debug(f"Loaded configuration from {env_file}")
+        return config
+
+
+def reset_config() -> None:
+    """Drop the cached configuration snapshot so the next routed call reads it fresh."""
+    global _config_snapshot  # noqa: PLW0603
+    with _config_lock:
+        _config_snapshot = None
+    with _wire_lock:
+        _backend_wire_formats.clear()
+
+
+def _engine_options(config: BaseConfig) -> dict[str, Any]:
+    """Build the create_engine pool options for the configured database."""
+    if make_url(config.DATABASE_URL).get_backend_name() == "sqlite":
+        # sqlite uses singleton/static pools which do not take sizing options
+        return {}
+    return {
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+
+
+def get_engine(config: BaseConfig | None = None) -> Engine:
+    """
+    Get the process-wide engine, creating it on first use.
+
+    The engine is shared across threads. It is rebuilt if the database url or pool settings change, or if the
+    process has been forked since it was created, so children never reuse their parent's connections.
+
+    Args:
+        config: Configuration to build the engine from. Defaults to the cached configuration snapshot.
+
+    Returns:
+        SQLAlchemy engine with a connection pool sized according to the configuration.
+
+    """
+    global _engine, _engine_key, _session_factory  # noqa: PLW0603
+    config = config or get_config()
+    options = _engine_options(config)
+    key = (os.getpid(), config.DATABASE_URL, tuple(sorted(options.items())))
+
+    with _engine_lock:
+        if _engine is not None and _engine_key == key:
+            return _engine
+
+        if _engine is not None:
+            # Only close connections this process opened; ones inherited through fork belong to the parent
+            _engine.dispose(close=_engine_key[0] == os.getpid())
+
+        logger.debug(f"Creating database engine with pool options {options}")
+        _engine = create_engine(config.DATABASE_URL, **options)
+        _engine_key = key
+        _session_factory = sessionmaker(bind=_engine)
+        return _engine
+
+
+def get_sessionmaker(config: BaseConfig | None = None) -> sessionmaker:
+    """
+    Get the sessionmaker bound to the process-wide engine.
+
+    Args:
+        config: Configuration to build the engine from. Defaults to the cached configuration snapshot.
+
+    Returns:
+        sessionmaker whose sessions check connections out of the shared pool.
+
+    """
+    get_engine(config)
+    return _session_factory
+
+
+def pool_status() -> dict[str, Any]:
+    """
+    Report the state of the process-wide connection pool, for sizing DB_POOL_SIZE and DB_MAX_OVERFLOW.
+
+    Returns:
+        Dictionary with pool size, checked in/out connections and current overflow. Empty if no engine exists yet.
+
+    """
+    if _engine is None:
+        return {}
+    pool = _engine.pool
+    status = {"pool": type(pool).__name__, "status": pool.status()}
+    for name, attr in (("size", "size"), ("checked_in", "checkedin"), ("checked_out", "checkedout")):
+        if hasattr(pool, attr):
+            status[name] = getattr(pool, attr)()
+    if hasattr(pool, "overflow"):
+        status["overflow"] = pool.overflow()
+    return status
+
+
+def backend_wire_formats(config: BaseConfig, headers: dict[str, Any]) -> list[str]:
+    """
+    Ask the backend which upload formats it accepts, once per backend url.
+
+    Backends that predate the wire_formats endpoint, or cannot be reached, are treated as accepting csv only.
+    """
+    with _wire_lock:
+        cached = _backend_wire_formats.get(config.BACKEND_URL)
+    if cached is not None:
+        return cached
+
+    try:
+        response = get_client(config).request("GET", "wire_formats", headers=headers, timeout=10)
+        response.raise_for_status()
+        formats = list(response.json().get("formats", ["csv"]))
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.debug(f"Could not negotiate wire format with backend, using csv: {e}")
+        formats = ["csv"]
+
+    with _wire_lock:
+        _backend_wire_formats[config.BACKEND_URL] = formats
+    logger.debug(f"Backend accepts wire formats: {formats}")
+    return formats
+
+
+def negotiate_wire_format(config: BaseConfig, headers: dict[str, Any]) -> str:
+    """Return the configured wire format if both this process and the backend support it, otherwise csv."""
+    if config.WIRE_FORMAT == "csv" or config.WIRE_FORMAT not in available_formats():
+        return "csv"
+    if config.WIRE_FORMAT in backend_wire_formats(config, headers):
+        return config.WIRE_FORMAT
+    return "csv"
+
+
+def _file_request_params(pyld: dict[str, Any], wire_format: str, config: BaseConfig) -> dict[str, Any]:
+    """Encode the frame of a send_file payload into the data/files parameters of the request."""
+    upload = encode_frame(pyld["frame"], pyld.get("name", "file"), wire_format, config.WIRE_COMPRESSION)
+    return {"data": pyld.get("data", {}), "files": {"file": upload}}
+
+
+def send_to_backend(
+    config: BaseConfig,
+    route_endpoint: str,
+    pyld: dict[str, Any],
+    method: request_methods = "POST",
+    send_file: bool = False,
+) -> requests.Response:
+    """
+    Send a routed function's payload to the backend.
+
+    Args:
+        config: Configuration with the backend url and access key.
+        route_endpoint: The backend endpoint to send to.
+        pyld: What the routed function returned when ROUTE_TO_BACKEND is True.
+        method: The request method. Default: POST.
+        send_file: If True, pyld is a file upload (see route). Otherwise, it is sent as json.
+
+    Returns:
+        The backend's response.
+
+    Raises:
+        requests.exceptions.RequestException: If the backend cannot be reached or does not accept the request.
+
+    """
+    headers = {
+        "access-key": config.API_KEY,
+    }
+    wire_format = None
+    if send_file:
+        wire_format = negotiate_wire_format(config, headers)
+        request_params = _file_request_params(pyld, wire_format, config)
+        logger.debug(f"data={pyld.get('data')}")
+        logger.debug(f"{wire_format} filesize in bytes={len(request_params['files']['file'][1])}")
+    else:
+        request_params = {
+            "json": pyld,
+        }
+        headers.update({"Content-Type": "application/json"})
+        logger.debug(f"headers={json.dumps(headers, indent=4)}")
+        logger.debug(f"json={json.dumps(pyld, indent=4)}")
+
+    logger.debug(f"method={method} type={type(method)}")
+    logger.debug(f"request url={config.BACKEND_URL}/{route_endpoint}")
+    client = get_client(config)
+    response = client.request(str(method), route_endpoint, headers=headers, **request_params)
+    logger.debug(f"{response.request.method=}, {response.status_code=}, {response.url=}")
+    if response.status_code == 415 and wire_format not in (None, "csv"):
+        # The backend no longer accepts the negotiated format; remember that and resend as csv
+        logger.debug(f"Backend rejected {wire_format} upload, retrying as csv")
+        with _wire_lock:
+            _backend_wire_formats[config.BACKEND_URL] = ["csv"]
+        response = client.request(
+            str(method), route_endpoint, headers=headers, **_file_request_params(pyld, "csv", config)
+        )
+    response.raise_for_status()
+    if response.status_code == 202:
+        logger.info(f"Backend accepted {route_endpoint} as job {response.json().get('job_id')}")
+    logger.debug(f"Response: {response.json()}")
+    return response
+
+
+def flush_outbox(config: BaseConfig | None = None) -> FlushResult | None:
+    """
+    Send everything waiting in the outbox to the backend now.
+
+    Returns:
+        FlushResult, or None if OUTBOX_MODE is off.
+
+    """
+    config = config or get_config()
+    outbox = get_outbox(config)
+    if outbox is None:
+        return None
+    return outbox.flush(partial(send_to_backend, config))
+
+
+def _defer(outbox: Outbox, config: BaseConfig, route_endpoint: str, pyld: dict[str, Any]) -> None:
+    """Store the upload in the outbox and make sure a background flusher is sending it on."""
+    entry = outbox.put(route_endpoint, pyld)
+    logger.debug(f"Stored {route_endpoint} upload as outbox entry {entry}")
+    outbox.start_flusher(
+        partial(send_to_backend, config), backoff=config.BACKEND_BACKOFF, max_backoff=config.OUTBOX_MAX_BACKOFF
+    )
+
 
 def route(route_endpoint: str, method: request_methods = "POST", send_file: bool = False):
     """
@@ -26,7 +293,11 @@ def route(route_endpoint: str, method: request_methods = "POST", send_file: bool
     Args:
         route_endpoint: The backend endpoint to route to if ROUTE_TO_BACKEND is True.
         method: If routing through backend, the request method. Default: POST.
-        send_file: If True sends a file to backend. Otherwise, json. Default: False.
+        send_file: If True sends a file to backend. Otherwise, json. Default: False. The wrapped function must then
+            return a dict with "data" (form fields), "frame" (DataFrame to upload) and "name" (file name stem).
+
+    When OUTBOX_MODE is not off, time data and probe metadata uploads that the backend cannot take right now are
+    stored in the local outbox and sent in the background (see opensampl.load.outbox) instead of raising.
 
     Returns:
         Decorator function that handles routing logic.
@@ -62,7 +333,7 @@ def route(route_endpoint: str, method: request_methods = "POST", send_file: bool
 
             """
             session = kwargs.pop("session", None)
-            config = BaseConfig()
+            config = get_config()
             config.check_routing_dependencies()
 
             logger.debug(f"{config.ROUTE_TO_BACKEND=}")
@@ -70,45 +341,27 @@ def route(route_endpoint: str, method: request_methods = "POST", send_file: bool
             # Config Validation deals with making sure we have a backend url if going through backend and
             # a database url if we are doing db operations directly
             if config.ROUTE_TO_BACKEND:
-                headers = {
-                    "access-key": config.API_KEY,
-                }
-
                 pyld = func(*args, **kwargs, _config=config)
-                if send_file:
-                    request_params = pyld
-                    logger.debug(f"data={pyld.get('data')}")
-                    logger.debug(f"filesize in bytes={len(pyld.get('files').get('file')[1])}")
-                else:
-                    request_params = {
-                        "json": pyld,
-                    }
-                    headers.update({"Content-Type": "application/json"})
-                    logger.debug(f"headers={json.dumps(headers, indent=4)}")
-                    logger.debug(f"json={json.dumps(pyld, indent=4)}")
-                # Extract data from the function
+                outbox = get_outbox(config) if route_endpoint in OUTBOX_ENDPOINTS else None
+                # Once anything is waiting in the outbox, later uploads queue behind it so they arrive in order
+                if outbox is not None and (config.OUTBOX_MODE == "always" or outbox.pending()):
+                    _defer(outbox, config, route_endpoint, pyld)
+                    return None
                 try:
-                    logger.debug(f"method={method} type={type(method)}")
-                    logger.debug(f"request url={config.BACKEND_URL}/{route_endpoint}")
-                    response = requests.request(
-                        method=str(method),
-                        url=f"{config.BACKEND_URL}/{route_endpoint}",
-                        headers=headers,
-                        **request_params,
-                        timeout=300,
-                        verify=not config.INSECURE_REQUESTS,
-                    )
-                    logger.debug(f"{response.request.method=}, {response.status_code=}, {response.url=}")
-                    response.raise_for_status()
-                    logger.debug(f"Response: {response.json()}")
+                    send_to_backend(config, route_endpoint, pyld, method=method, send_file=send_file)
                 except requests.exceptions.RequestException as e:
+                    if outbox is not None and is_transient(e):
+                        logger.warning(f"Backend unavailable, holding {route_endpoint} upload in the outbox: {e}")
+                        _defer(outbox, config, route_endpoint, pyld)
+                        return None
                     logger.debug(f"Error making request to backend: {e}")
                     raise
             else:
-                if not session:
-                    session = sessionmaker(create_engine(config.DATABASE_URL))()  # ty: ignore[no-matching-overload]
+                if session:
+                    return func(*args, **kwargs, session=session, _config=config)
 
-                return func(*args, **kwargs, session=session, _config=config)
+                with get_sessionmaker(config)() as pooled_session:
+                    return func(*args, **kwargs, session=pooled_session, _config=config)
 
         return wrapper
 
@@ -0,0 +1,106 @@
+"""Streaming discovery of the probe files to load from a directory tree."""
+
+from __future__ import annotations
+
+import os
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+REGEX_PREFIX = "re:"
+
+
+class PathFilter:
+    """
+    Include and exclude patterns for the files found while scanning
+
+    Each pattern is a glob, or a regular expression when prefixed with "re:". Globs match either the file name or the
+    path relative to the scanned directory, so "*.gz" matches files at any depth and "2024/*/*.gz" only under 2024.
+    Regular expressions are searched for in the relative path. A file is kept if it matches any include pattern (or
+    there are none) and no exclude pattern.
+    """
+
+    def __init__(self, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        """
+        Compile the include and exclude patterns.
+
+        Args:
+            include: Patterns of which a file must match at least one. Every file is included if empty.
+            exclude: Patterns of which a file must match none.
+
+        """
+        self.include = [self._compile(pattern) for pattern in include]
+        self.exclude = [self._compile(pattern) for pattern in exclude]
+
+    @staticmethod
+    def _compile(pattern: str) -> Callable[[str, str], bool]:
+        if pattern.startswith(REGEX_PREFIX):
+            regex = re.compile(pattern.removeprefix(REGEX_PREFIX))
+            return lambda _name, relative: regex.search(relative) is not None
+        return lambda name, relative: fnmatchcase(name, pattern) or fnmatchcase(relative, pattern)
+
+    def matches(self, name: str, relative: str) -> bool:
+        """Return whether the file with the given name and path relative to the scanned directory is kept."""
+        if self.include and not any(pattern(name, relative) for pattern in self.include):
+            return False
+        return not any(pattern(name, relative) for pattern in self.exclude)
+
+
+def scan_files(
+    root: Path,
+    recursive: bool = False,
+    path_filter: PathFilter | None = None,
+    skip: Iterable[Path] = (),
+    sort_key: Callable[[Path], Any] | None = None,
+) -> Iterator[Path]:
+    """
+    Yield the files under root as they are found, without listing the whole tree first.
+
+    Directories are read one at a time with os.scandir, and subdirectories are walked in name order after the files of
+    their parent. Without a sort key each directory's files are yielded in the order the filesystem returns them, so
+    memory use does not depend on the number of files. With one, each directory's matching paths are sorted before
+    being yielded, which holds a single directory's listing at a time.
+
+    Args:
+        root: Directory to scan.
+        recursive: Whether to descend into subdirectories.
+        path_filter: Include and exclude patterns the files must pass.
+        skip: Directories not to descend into, such as the archive directory processed files are moved to.
+        sort_key: Key to order each directory's files by. Files for which it returns None come last, by name.
+
+    """
+    skipped = {os.path.realpath(path) for path in skip}
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        files = []
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    path = Path(entry.path)
+                    if entry.is_dir():
+                        if recursive and os.path.realpath(path) not in skipped:
+                            subdirectories.append(path)
+                    elif entry.is_file() and (
+                        path_filter is None or path_filter.matches(entry.name, path.relative_to(root).as_posix())
+                    ):
+                        if sort_key is None:
+                            yield path
+                        else:
+                            files.append(path)
+        except OSError as e:
+            logger.warning(f"Skipping directory {directory}: {e}")
+            continue
+
+        if sort_key is not None:
+            keyed = [(sort_key(path), path) for path in files]
+            yield from (path for key, path in sorted(keyed, key=lambda item: (item[0] is None, item[0] or 0, item[1])))
+        # Reversed so the stack pops them in name order
+        pending.extend(sorted(subdirectories, reverse=True))
@@ -0,0 +1,190 @@
+"""Definition of a block of time data for a single probe/metric/reference series."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+from pydantic import BaseModel, ConfigDict
+
+from opensampl.metrics import METRICS, MetricType
+from opensampl.references import REF_TYPES, CompoundReferenceType, ReferenceType
+from opensampl.vendors.constants import ProbeKey
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+
+def reference_type_from_dict(data: dict[str, Any]) -> ReferenceType:
+    """Rebuild a ReferenceType, or CompoundReferenceType if it references a table, from its serialized form."""
+    if "reference_table" in data:
+        return CompoundReferenceType(**data)
+    return ReferenceType(**data)
+
+
+class SeriesBatch(BaseModel):
+    """
+    Time data for one probe/metric/reference series
+
+    Attributes:
+        probe_key: The probe the readings were taken on.
+        metric: The metric type of the readings.
+        reference_type: The type of reference the readings are measured against.
+        compound_reference: Lookup for the referenced entry when reference_type is compound.
+        data: DataFrame with time and value columns.
+
+    """
+
+    probe_key: ProbeKey
+    metric: MetricType = METRICS.UNKNOWN
+    reference_type: ReferenceType = REF_TYPES.UNKNOWN
+    compound_reference: dict[str, Any] | None = None
+    data: pd.DataFrame
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __len__(self) -> int:
+        """Return the number of readings in the batch."""
+        return len(self.data)
+
+    def identity_payload(self) -> dict[str, Any]:
+        """Serialize the series identity (everything except the data) to json compatible types."""
+        return {
+            "probe_key": self.probe_key.model_dump(),
+            "metric_type": self.metric.model_dump(),
+            "reference_type": self.reference_type.model_dump(),
+            "compound_key": self.compound_reference,
+        }
+
+    @classmethod
+    def from_identity_payload(cls, payload: dict[str, Any], data: pd.DataFrame) -> SeriesBatch:
+        """Rebuild a SeriesBatch from the output of identity_payload and its data."""
+        metric_type = payload.get("metric_type")
+        reference_type = payload.get("reference_type")
+        return cls(
+            probe_key=ProbeKey(**payload["probe_key"]),
+            metric=MetricType(**metric_type) if metric_type else METRICS.UNKNOWN,
+            reference_type=reference_type_from_dict(reference_type) if reference_type else REF_TYPES.UNKNOWN,
+            compound_reference=payload.get("compound_key"),
+            data=data,
+        )
+
+    def split(self, size: int) -> list[SeriesBatch]:
+        """Split the batch into batches of at most size readings each."""
+        return [
+            self.model_copy(update={"data": self.data.iloc[start : start + size]})
+            for start in range(0, len(self.data), size)
+        ]
+
+    @classmethod
+    def from_wide_frame(
+        cls,
+        data: pd.DataFrame,
+        metric_columns: dict[str, MetricType],
+        probe_key: ProbeKey,
+        reference_type: ReferenceType = REF_TYPES.UNKNOWN,
+        compound_reference: dict[str, Any] | None = None,
+    ) -> list[SeriesBatch]:
+        """
+        Split a wide frame, with a time column and one column per metric, into one batch per metric.
+
+        Rows where a metric's column is null are left out of that metric's batch.
+
+        Args:
+            data: DataFrame with a time column and one value column per metric.
+            metric_columns: Mapping of column name to the MetricType its values are.
+            probe_key: The probe every column belongs to.
+            reference_type: The reference type shared by every column.
+            compound_reference: Lookup for the referenced entry when reference_type is compound.
+
+        Returns:
+            List of SeriesBatch, one per column in metric_columns.
+
+        """
+        batches = []
+        for column, metric in metric_columns.items():
+            values = data[column]
+            mask = values.notna()
+            batches.append(
+                cls(
+                    probe_key=probe_key,
+                    metric=metric,
+                    reference_type=reference_type,
+                    compound_reference=compound_reference,
+                    data=pd.DataFrame({"time": data["time"][mask], "value": values[mask]}),
+                )
+            )
+        return batches
+
+
+def series_frame(series: list[SeriesBatch]) -> pd.DataFrame:
+    """Concatenate the data of several series into one frame, with a series column holding each row's list index."""
+    frames = [batch.data[["time", "value"]].assign(series=index) for index, batch in enumerate(series)]
+    if not frames:
+        return pd.DataFrame(columns=["time", "value", "series"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def series_from_frame(identities: list[dict[str, Any]], frame: pd.DataFrame) -> list[SeriesBatch]:
+    """Rebuild the series written by series_frame from their identity payloads and the combined frame."""
+    groups = dict(iter(frame.groupby("series", sort=False)))
+    return [
+        SeriesBatch.from_identity_payload(identity, groups.get(index, frame.iloc[0:0])[["time", "value"]])
+        for index, identity in enumerate(identities)
+    ]
+
+
+class PackedSeries(BaseModel):
+    """
+    Several series packed into one columnar frame, which is cheap to pickle when handing them between processes
+
+    Attributes:
+        identities: identity_payload of each series, in order.
+        data: Frame from series_frame, holding every series' readings.
+
+    """
+
+    identities: list[dict[str, Any]]
+    data: pd.DataFrame
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @classmethod
+    def pack(cls, series: list[SeriesBatch]) -> PackedSeries:
+        """Pack a list of series."""
+        return cls(identities=[batch.identity_payload() for batch in series], data=series_frame(series))
+
+    def unpack(self) -> list[SeriesBatch]:
+        """Rebuild the packed series."""
+        return series_from_frame(self.identities, self.data)
+
+
+def merge_series(series: list[SeriesBatch]) -> list[SeriesBatch]:
+    """Combine batches for the same series into one, keeping the order in which each series first appears."""
+    merged: dict[str, list[SeriesBatch]] = {}
+    for batch in series:
+        merged.setdefault(json.dumps(batch.identity_payload(), sort_keys=True), []).append(batch)
+    return [
+        batches[0]
+        if len(batches) == 1
+        else batches[0].model_copy(update={"data": pd.concat([b.data for b in batches], ignore_index=True)})
+        for batches in merged.values()
+    ]
+
+
+def chunk_series(series: Iterable[SeriesBatch], chunk_size: int) -> Iterator[list[SeriesBatch]]:
+    """
+    Group series into loads of at most chunk_size rows, splitting series larger than that.
+
+    The series are consumed lazily, so only one load's worth of them is held at a time.
+    """
+    pending: list[SeriesBatch] = []
+    pending_rows = 0
+    for batch in series:
+        for piece in batch.split(chunk_size):
+            if pending and pending_rows + len(piece) > chunk_size:
+                yield pending
+                pending, pending_rows = [], 0
+            pending.append(piece)
+            pending_rows += len(piece)
+    if pending:
+        yield pending
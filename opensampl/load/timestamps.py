@@ -0,0 +1,124 @@
+"""Conversion of time columns to UTC datetimes, parsing only as much as the column needs."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from opensampl.load.series import SeriesBatch
+
+epoch_units = Literal["s", "ms", "us", "ns"]
+
+ISO8601 = "ISO8601"
+SAMPLE_SIZE = 100
+
+ISO8601_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?P<offset>Z|[+-]\d{2}(?::?\d{2})?)?"
+)
+EPOCH_PATTERN = re.compile(r"-?\d+(?:\.\d*)?")
+
+# Largest magnitude of an epoch timestamp in each unit for dates before the year 5000
+EPOCH_UNIT_LIMITS: list[tuple[float, epoch_units]] = [(1e11, "s"), (1e14, "ms"), (1e17, "us")]
+
+
+def sample_values(times: pd.Series, size: int = SAMPLE_SIZE) -> list:
+    """Return up to size non-null values spread evenly through times, first and last included."""
+    values = times.dropna()
+    if len(values) <= size:
+        return values.tolist()
+    return values.iloc[np.linspace(0, len(values) - 1, size, dtype=int)].tolist()
+
+
+def infer_epoch_unit(values: Iterable[float]) -> epoch_units:
+    """Guess the unit of epoch timestamps from their magnitude, assuming they fall before the year 5000."""
+    largest = max((abs(value) for value in values), default=0)
+    for limit, unit in EPOCH_UNIT_LIMITS:
+        if largest < limit:
+            return unit
+    return "ns"
+
+
+def detect_time_format(times: pd.Series) -> tuple[str | None, epoch_units | None]:
+    """
+    Detect from a sample of times whether they are uniformly ISO-8601 strings or epoch numbers.
+
+    ISO-8601 is only detected when the sampled strings either all carry a UTC offset or all lack one, as pandas
+    applies the offset of one string to naive strings after it when parsing them together.
+
+    Returns:
+        The format to parse times with (ISO8601, or None if not detected) and the epoch unit if they are epochs.
+
+    """
+    sample = sample_values(times)
+    if not sample:
+        return None, None
+    if pd.api.types.is_numeric_dtype(times.dtype):
+        return None, infer_epoch_unit(sample)
+    if not all(isinstance(value, str) for value in sample):
+        return None, None
+
+    matches = [ISO8601_PATTERN.fullmatch(value) for value in sample]
+    if all(matches) and len({match["offset"] is None for match in matches}) == 1:
+        return ISO8601, None
+    if all(EPOCH_PATTERN.fullmatch(value) for value in sample):
+        return None, infer_epoch_unit(float(value) for value in sample)
+    return None, None
+
+
+def normalize_time_column(
+    times: pd.Series, time_format: str | None = None, unit: epoch_units | None = None
+) -> pd.Series:
+    """
+    Return times as UTC datetimes, doing only as much parsing as the column needs.
+
+    Columns that are already datetimes are only converted to UTC. Otherwise times are parsed with the given strftime
+    format (or ISO8601) or as epochs in the given unit; with neither, the format is detected from a sample of the
+    column. Rows that fail the fast parse, and columns whose format cannot be detected, are parsed one element at a
+    time as before.
+
+    Args:
+        times: Time column to convert.
+        time_format: strftime format, or ISO8601, the times are written in.
+        unit: Unit of epoch times.
+
+    Raises:
+        ValueError: If some times cannot be parsed at all.
+
+    """
+    if isinstance(times.dtype, pd.DatetimeTZDtype):
+        return times.dt.tz_convert("UTC")
+    if pd.api.types.is_datetime64_dtype(times):
+        return times.dt.tz_localize("UTC")
+
+    if time_format is None and unit is None:
+        time_format, unit = detect_time_format(times)
+
+    if unit is not None:
+        numbers = times if pd.api.types.is_numeric_dtype(times.dtype) else pd.to_numeric(times, errors="coerce")
+        parsed = pd.to_datetime(numbers, unit=unit, utc=True, errors="coerce")
+    elif time_format is not None and time_format != "mixed":
+        parsed = pd.to_datetime(times, format=time_format, utc=True, errors="coerce")
+    else:
+        return pd.to_datetime(times, format="mixed", utc=True, errors="raise")
+
+    failed = parsed.isna() & times.notna()
+    if failed.any():
+        logger.debug(f"Parsing {failed.sum()}/{len(times)} times that did not match {time_format or unit} one by one")
+        parsed[failed] = pd.to_datetime(times[failed], format="mixed", utc=True, errors="raise")
+    return parsed
+
+
+def normalize_series_times(
+    series: Iterable[SeriesBatch], time_format: str | None = None, unit: epoch_units | None = None
+) -> Iterator[SeriesBatch]:
+    """Convert the time column of each batch to UTC datetimes in place as the batches are consumed."""
+    for batch in series:
+        batch.data["time"] = normalize_time_column(batch.data["time"], time_format=time_format, unit=unit)
+        yield batch
@@ -0,0 +1,193 @@
+"""Vectorized validation of time data values against the type their metric declares."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+from pydantic import BaseModel, ConfigDict
+
+from opensampl.metrics import METRICS, MetricType
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+reject_reasons = Literal["missing_time", "invalid", "missing", "non_finite", "out_of_range", "duplicate_time"]
+REJECT_REASONS: tuple[reject_reasons, ...] = (
+    "missing_time",
+    "invalid",
+    "missing",
+    "non_finite",
+    "out_of_range",
+    "duplicate_time",
+)
+
+# Readings outside these bounds cannot be genuine for the metric
+VALUE_RANGES: dict[str, tuple[float, float]] = {
+    METRICS.STRATUM.name: (0, 16),
+    METRICS.REACHABILITY.name: (0, 255),
+    METRICS.SYNC_HEALTH.name: (0, 1),
+}
+# Numeric readings are stored as doubles in value_num, which hold integers exactly up to 2**53
+MAX_EXACT_INT = 2**53
+BOOL_STRINGS = {"true": True, "false": False, "1": True, "0": False}
+
+
+class ValidationStats(BaseModel):
+    """Counts of the rows validate_values kept and rejected, by reason"""
+
+    rows: int = 0
+    missing_time: int = 0
+    invalid: int = 0
+    missing: int = 0
+    non_finite: int = 0
+    out_of_range: int = 0
+    duplicate_time: int = 0
+
+    @property
+    def rejected(self) -> int:
+        """Number of rows rejected for any reason."""
+        return sum(getattr(self, reason) for reason in REJECT_REASONS)
+
+    @property
+    def kept(self) -> int:
+        """Number of rows that passed validation."""
+        return self.rows - self.rejected
+
+    def __add__(self, other: ValidationStats) -> ValidationStats:
+        """Combine the counts of two validations, such as those of the series in one load."""
+        return ValidationStats(
+            **{field: getattr(self, field) + getattr(other, field) for field in type(self).model_fields}
+        )
+
+    def __str__(self) -> str:
+        """Summarize the counts, such as 'kept 98/100 rows, rejected 1 missing, 1 duplicate_time'."""
+        summary = f"kept {self.kept}/{self.rows} rows"
+        rejected = [f"{getattr(self, reason)} {reason}" for reason in REJECT_REASONS if getattr(self, reason)]
+        return f"{summary}, rejected {', '.join(rejected)}" if rejected else summary
+
+
+class ValidatedValues(BaseModel):
+    """
+    The outcome of validating one series' time data
+
+    Attributes:
+        data: The rows that passed, with value coerced to the metric's value type.
+        rejects: The rows that failed, as they were given, with a reason column.
+        stats: Counts of the rows kept and rejected.
+
+    """
+
+    data: pd.DataFrame
+    rejects: pd.DataFrame
+    stats: ValidationStats
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+def _numeric_reasons(values: pd.Series, metric: MetricType) -> tuple[pd.Series, pd.Series]:
+    """Coerce values to float64, returning them with the reason each row fails, if it does."""
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    array = numbers.to_numpy()
+    low, high = VALUE_RANGES.get(metric.name, (-np.inf, np.inf))
+    with np.errstate(invalid="ignore"):
+        out_of_range = (array < low) | (array > high)
+        if metric.value_type is int:
+            out_of_range |= (array != np.trunc(array)) | (np.abs(array) > MAX_EXACT_INT)
+
+    reasons = np.select(
+        [values.isna().to_numpy(), np.isnan(array), np.isinf(array), out_of_range],
+        ["missing", "invalid", "non_finite", "out_of_range"],
+        default=None,
+    )
+    return numbers, pd.Series(reasons, index=values.index, dtype=object)
+
+
+def _object_reasons(values: pd.Series, metric: MetricType) -> tuple[pd.Series, pd.Series]:
+    """Coerce values of a non-numeric metric to its value type, returning them with the reason each row fails."""
+    missing = values.isna()
+    reasons = pd.Series(np.where(missing, "missing", None), index=values.index, dtype=object)
+    present = values[~missing]
+
+    if metric.value_type is bool:
+        if pd.api.types.is_bool_dtype(present):
+            coerced = present
+        else:
+            coerced = present.astype(str).str.strip().str.lower().map(BOOL_STRINGS)
+            reasons[coerced[coerced.isna()].index] = "invalid"
+        return coerced.dropna().astype(bool).reindex(values.index), reasons
+
+    if pd.api.types.is_numeric_dtype(present):
+        non_finite = ~np.isfinite(present.to_numpy(dtype="float64"))
+    else:
+        floats = present.map(type).isin([float, np.float64]).to_numpy()
+        non_finite = floats & ~np.isfinite(present.where(floats, 0).to_numpy(dtype="float64"))
+    reasons[present.index[non_finite]] = "non_finite"
+
+    if metric.value_type is str:
+        return present.astype(str).reindex(values.index), reasons
+    if metric.value_type in (list, dict):
+        wrong_type = ~present.map(lambda value: isinstance(value, metric.value_type)).to_numpy(dtype=bool)
+        reasons[present.index[wrong_type & reasons[present.index].isna().to_numpy()]] = "invalid"
+    return values, reasons
+
+
+def validate_values(data: pd.DataFrame, metric: MetricType) -> ValidatedValues:
+    """
+    Coerce the value column of data to the value type of metric, separating the rows that cannot be stored.
+
+    Rows without a time are rejected whatever their value. Numeric metrics are coerced to float64 in one pass and lose
+    values that are not numbers, NaN or infinite, out of the metric's range, or (for int metrics) not whole. Other
+    metrics lose missing and non-finite values and, where the metric declares bool, list or dict, values that are not
+    one. Of the rows left, only the first reading at each time is kept.
+
+    Args:
+        data: Frame with time, already normalized to UTC datetimes (NaT where missing), and value columns.
+        metric: The metric the readings are of.
+
+    Returns:
+        The rows kept and rejected, and counts of each.
+
+    """
+    data = data.reset_index(drop=True)
+    if metric.is_numeric:
+        values, reasons = _numeric_reasons(data["value"], metric)
+    else:
+        values, reasons = _object_reasons(data["value"], metric)
+    reasons = reasons.mask(data["time"].isna(), "missing_time")
+
+    valid = reasons.isna()
+    duplicated = data["time"][valid].duplicated(keep="first")
+    reasons[duplicated[duplicated].index] = "duplicate_time"
+    valid &= reasons.isna()
+
+    counts = reasons.value_counts()
+    stats = ValidationStats(rows=len(data), **{reason: int(counts.get(reason, 0)) for reason in REJECT_REASONS})
+    kept = data[valid.to_numpy()].assign(value=values[valid])
+    rejects = data[~valid.to_numpy()].assign(reason=reasons[~valid])
+    return ValidatedValues(data=kept, rejects=rejects, stats=stats)
+
+
+def write_rejects(rejects: pd.DataFrame, directory: Path) -> Path | None:
+    """
+    Write rejected rows to a new csv file in directory, for inspection or reloading once fixed.
+
+    Args:
+        rejects: Rejected rows, with whatever columns identify their series alongside time, value and reason.
+        directory: Directory to write the file in, created if needed.
+
+    Returns:
+        Path of the file written, or None if there were no rejects.
+
+    """
+    if rejects.empty:
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = directory / f"rejects-{stamp}-{uuid.uuid4().hex[:8]}.csv"
+    rejects.to_csv(path, index=False)
+    logger.warning(f"Wrote {len(rejects)} rejected rows to {path}")
+    return path
@@ -0,0 +1,180 @@
+"""Encoding of time data frames sent to the backend as file uploads."""
+
+from __future__ import annotations
+
+import gzip
+import importlib.util
+import io
+import json
+from typing import TYPE_CHECKING, BinaryIO, Literal
+
+import pandas as pd
+from loguru import logger
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+wire_formats = Literal["csv", "arrow", "parquet"]
+wire_compressions = Literal["none", "gzip", "zstd"]
+
+CONTENT_TYPES: dict[str, str] = {
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+GZIP_CONTENT_TYPE = "application/gzip"
+FILE_SUFFIXES: dict[str, str] = {"csv": ".csv", "arrow": ".arrow", "parquet": ".parquet"}
+
+# Compression codecs each format can apply to its own payload
+SUPPORTED_COMPRESSION: dict[str, set[str]] = {
+    "csv": {"none", "gzip"},
+    "arrow": {"none", "zstd"},
+    "parquet": {"none", "gzip", "zstd"},
+}
+
+
+# Schema metadata key listing the columns sent as JSON text in arrow and parquet payloads
+JSON_COLUMNS_KEY = b"opensampl.json_columns"
+
+
+class UnsupportedWireFormatError(ValueError):
+    """Raised when an upload is in a format this process cannot decode."""
+
+
+def arrow_available() -> bool:
+    """Return True if pyarrow, needed for the arrow and parquet formats, is installed."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def available_formats() -> list[str]:
+    """Return the wire formats this process can encode and decode."""
+    if arrow_available():
+        return ["arrow", "parquet", "csv"]
+    return ["csv"]
+
+
+def _json_encode_columns(data: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    """
+    JSON encode the object columns arrow cannot store as they are, returning the frame and the names encoded.
+
+    Arrow infers one type per column, so dicts with different keys would come back merged into one struct, and a mix
+    of dicts, lists, strings or numbers cannot be converted at all. Such columns, typically the value column of
+    non-numeric metrics, are sent as JSON text instead, the way bulk.encode_json_values stores them.
+    """
+    encoded = []
+    for column in data.columns:
+        if data[column].dtype != object:
+            continue
+        kind = pd.api.types.infer_dtype(data[column], skipna=True)
+        if kind.startswith("mixed") and kind != "mixed-integer-float":
+            encoded.append(column)
+    if encoded:
+        data = data.assign(**{column: data[column].map(json.dumps, na_action="ignore") for column in encoded})
+    return data, encoded
+
+
+def _json_decode_columns(table: pa.Table) -> pd.DataFrame:
+    """Convert a decoded arrow table to a frame, parsing the columns _json_encode_columns encoded."""
+    df = table.to_pandas()
+    metadata = table.schema.metadata or {}
+    for column in json.loads(metadata.get(JSON_COLUMNS_KEY, b"[]")):
+        df[column] = df[column].map(json.loads, na_action="ignore")
+    return df
+
+
+def encode_frame(
+    data: pd.DataFrame,
+    name: str,
+    wire_format: wire_formats = "csv",
+    compression: wire_compressions = "none",
+) -> tuple[str, bytes, str]:
+    """
+    Encode a frame for upload, keeping column dtypes where the format allows.
+
+    Falls back to csv if pyarrow is not installed, and to no compression if the format cannot apply the requested
+    codec.
+
+    Args:
+        data: Frame to encode.
+        name: File name without suffix.
+        wire_format: One of csv, arrow (IPC stream) or parquet.
+        compression: One of none, gzip or zstd.
+
+    Returns:
+        Tuple of (filename, content, content type) as accepted by the requests files parameter.
+
+    """
+    if wire_format != "csv" and not arrow_available():
+        logger.debug(f"pyarrow is not installed; sending {name} as csv instead of {wire_format}")
+        wire_format = "csv"
+    if compression not in SUPPORTED_COMPRESSION[wire_format]:
+        logger.debug(f"{wire_format} does not support {compression} compression; sending uncompressed")
+        compression = "none"
+
+    filename = f"{name}{FILE_SUFFIXES[wire_format]}"
+    content_type = CONTENT_TYPES[wire_format]
+    data = data.reset_index(drop=True)
+
+    if wire_format == "csv":
+        content = data.to_csv(index=False).encode("utf-8")
+        if compression == "gzip":
+            return f"{filename}.gz", gzip.compress(content), GZIP_CONTENT_TYPE
+        return filename, content, content_type
+
+    import pyarrow as pa
+
+    data, json_columns = _json_encode_columns(data)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    if json_columns:
+        metadata = (table.schema.metadata or {}) | {JSON_COLUMNS_KEY: json.dumps(json_columns).encode("utf-8")}
+        table = table.replace_schema_metadata(metadata)
+    sink = io.BytesIO()
+    if wire_format == "arrow":
+        options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink, compression=compression)
+    return filename, sink.getvalue(), content_type
+
+
+def decode_frame(content: bytes | BinaryIO, content_type: str | None, filename: str | None = None) -> pd.DataFrame:
+    """
+    Decode an uploaded frame produced by encode_frame.
+
+    The format is taken from the content type, falling back to the file name suffix. Anything unrecognized is read as
+    csv, which is what older clients send. content may be an open binary file, which is then read incrementally rather
+    than loaded into memory first.
+
+    Raises:
+        UnsupportedWireFormatError: If the payload is arrow or parquet and pyarrow is not installed.
+
+    """
+    source = io.BytesIO(content) if isinstance(content, bytes | bytearray) else content
+    content_type = (content_type or "").split(";")[0].strip()
+    filename = filename or ""
+
+    if content_type == GZIP_CONTENT_TYPE or filename.endswith(".gz"):
+        return pd.read_csv(source, compression="gzip")
+
+    wire_format = next((fmt for fmt, ctype in CONTENT_TYPES.items() if ctype == content_type), None)
+    if wire_format is None:
+        wire_format = next((fmt for fmt, suffix in FILE_SUFFIXES.items() if filename.endswith(suffix)), "csv")
+
+    if wire_format == "csv":
+        return pd.read_csv(source)
+
+    if not arrow_available():
+        raise UnsupportedWireFormatError(f"Received {wire_format} data but pyarrow is not installed")
+
+    import pyarrow as pa
+
+    if wire_format == "arrow":
+        with pa.ipc.open_stream(source) as reader:
+            return _json_decode_columns(reader.read_all())
+
+    import pyarrow.parquet as pq
+
+    return _json_decode_columns(pq.read_table(source))
@@ -1,18 +1,25 @@
 """Main functionality for loading data into the database"""
 
 import json
+from pathlib import Path
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from opensampl.config.base import BaseConfig
-from opensampl.db.orm import Base, ProbeData
+from opensampl.db.orm import Base, create_tables
 from opensampl.helpers.geolocator import create_location
+from opensampl.load.bulk import write_probe_data
+from opensampl.load.cache import SeriesIdentity, series_cache
 from opensampl.load.routing import route
+from opensampl.load.series import SeriesBatch, series_frame
 from opensampl.load.table_factory import TableFactory
+from opensampl.load.timestamps import normalize_time_column
+from opensampl.load.validation import ValidatedValues, ValidationStats, validate_values, write_rejects
 from opensampl.metrics import MetricType
 from opensampl.references import ReferenceType
 from opensampl.vendors.constants import ProbeKey, VendorType
@@ -65,6 +72,7 @@ def write_to_table(
         table_factory.write(data=data, if_exists=if_exists)
 
         session.commit()
+        series_cache.invalidate_table(table)
         return None  # noqa: TRY300
 
     except Exception as e:
@@ -85,7 +93,11 @@ def load_time_data(
     session: Session | None = None,
 ):
     """
-    Write time data to probe_data table
+    Write time data to the series_data table
+
+    When connected directly to postgres, rows are streamed with COPY into a staging table and merged into series_data
+    with a single INSERT ... SELECT; conflicting rows are skipped and reported. When routed through the backend, the
+    frame is uploaded in the WIRE_FORMAT negotiated with the backend (see opensampl.load.wire).
 
     Args:
         probe_key: ProbeKey object
@@ -100,7 +112,6 @@ def load_time_data(
 
     """
     if _config.ROUTE_TO_BACKEND:
-        csv_data = data.to_csv(index=False).encode("utf-8")
         return {
             "data": {
                 "probe_key_str": json.dumps(probe_key.model_dump()),
@@ -108,7 +119,8 @@ def load_time_data(
                 "reference_type_str": json.dumps(reference_type.model_dump()),
                 "compound_key_str": json.dumps(compound_key),
             },
-            "files": {"file": ("time_data.csv", csv_data, "text/csv")},
+            "frame": data[["time", "value"]],
+            "name": "time_data",
         }
 
     if not isinstance(session, Session):
@@ -118,7 +130,8 @@ def load_time_data(
     try:
         from opensampl.load.data import DataFactory
 
-        data_definition = DataFactory(
+        series_cache.configure(maxsize=_config.SERIES_CACHE_SIZE, ttl=_config.SERIES_CACHE_TTL)
+        identity = DataFactory.resolve(
             probe_key=probe_key,
             metric_type=metric_type,
             reference_type=reference_type,
@@ -126,50 +139,11 @@ def load_time_data(
             strict=strict,
             session=session,
         )
-        probe = data_definition.probe  # ty: ignore[possibly-unbound-attribute]
-        probe_readable = (
-            probe.name or f"{probe.ip_address} ({probe.probe_id})"  # ty: ignore[possibly-unbound-attribute]
-        )
+        probe_readable = identity.probe_readable
 
-        if any(x is None for x in [data_definition.probe, data_definition.metric, data_definition.reference]):
-            raise RuntimeError(f"Not all required definition fields filled: {data_definition.dump_factory()}")  # noqa: TRY301
-
-        df = data[["time", "value"]].copy()  # Only keep required columns.
-        df["probe_uuid"] = data_definition.probe.uuid  # ty: ignore[possibly-unbound-attribute]
-        df["reference_uuid"] = data_definition.reference.uuid  # ty: ignore[possibly-unbound-attribute]
-        df["metric_type_uuid"] = data_definition.metric.uuid  # ty: ignore[possibly-unbound-attribute]
-        logger.debug(df.head())
-        # Ensure correct dtypes
-        df["time"] = pd.to_datetime(df["time"], format="mixed", utc=True, errors="raise")
-        df["value"] = df["value"].apply(json.dumps)
-        records = df.to_dict(orient="records")
-        insert_stmt = text(f"""
-        INSERT INTO {ProbeData.__table__.schema}.{ProbeData.__tablename__}
-        (time, probe_uuid, reference_uuid, metric_type_uuid, value)
-        VALUES (:time, :probe_uuid, :reference_uuid, :metric_type_uuid, :value)
-        ON CONFLICT (time, probe_uuid, reference_uuid, metric_type_uuid)
-        DO NOTHING
-        """)  # noqa: S608
-
-        try:
-            result = session.execute(insert_stmt, records)
-            session.commit()
-            total_rows = len(records)
-            inserted = result.rowcount  # ty: ignore[unresolved-attribute]
-            excluded = total_rows - inserted
-            if excluded > 0:
-                logger.warning(
-                    f"Inserted {inserted}/{total_rows} rows for {probe_readable}; "
-                    f"{excluded}/{total_rows} rejected due to conflicts"
-                )
-            else:
-                logger.info(f"Inserted {inserted}/{total_rows} rows for {probe_readable}")
-
-        except Exception as e:
-            # In case of an error, roll back the session
-            session.rollback()
-            logger.error(f"Error inserting rows for {probe_readable}: {e}")
-            raise
+        validated = _probe_data_frame(identity, data)
+        logger.debug(validated.data.head())
+        _write_series_frame(session, [validated], [identity], probe_readable, _config.REJECT_PATH)
 
     except Exception as e:
         logger.exception(f"Error writing time data for {probe_readable}: {e}")
@@ -177,6 +151,143 @@ def load_time_data(
         raise
 
 
+@route("load_time_data_batch", send_file=True)
+def load_time_data_batch(
+    series: list[SeriesBatch],
+    _config: BaseConfig,
+    strict: bool = True,
+    session: Session | None = None,
+):
+    """
+    Write time data for many probe/metric/reference series to the series_data table in one transaction
+
+    Every series identity is resolved before any data is written, then all rows are written together. If any series
+    cannot be resolved or written, nothing is written. Use SeriesBatch.from_wide_frame to build the series from a
+    frame with one column per metric.
+
+    Args:
+        series: List of SeriesBatch objects, each with its own time and value data
+        _config: BaseSettings object, automatically filled by route wrapper
+        strict: If true, raises error if any of the data parts (reference/metric/etc) not found.
+            If false, creates new probe. Default: True
+        session: SQLAlchemy session
+
+    """
+    if _config.ROUTE_TO_BACKEND:
+        return {
+            "data": {
+                "series_str": json.dumps([batch.identity_payload() for batch in series]),
+                "strict": json.dumps(strict),
+            },
+            "frame": series_frame(series),
+            "name": "time_data_batch",
+        }
+
+    if not isinstance(session, Session):
+        raise TypeError("Session must be a SQLAlchemy session")
+
+    description = f"{len(series)} series"
+    try:
+        from opensampl.load.data import DataFactory
+
+        series_cache.configure(maxsize=_config.SERIES_CACHE_SIZE, ttl=_config.SERIES_CACHE_TTL)
+        identities = {}
+        frames = []
+        for batch in series:
+            if batch.data.empty:
+                continue
+            identity = DataFactory.resolve(
+                probe_key=batch.probe_key,
+                metric_type=batch.metric,
+                reference_type=batch.reference_type,
+                compound_key=batch.compound_reference,
+                strict=strict,
+                session=session,
+            )
+            identities[identity.cache_key] = identity
+            frames.append(_probe_data_frame(identity, batch.data))
+
+        if not frames:
+            logger.info(f"No rows to insert for {description}")
+            return None
+
+        probes = sorted({identity.probe_readable for identity in identities.values()})
+        description = f"{len(identities)} series on {', '.join(probes)}"
+        _write_series_frame(session, frames, list(identities.values()), description, _config.REJECT_PATH)
+
+    except Exception as e:
+        logger.exception(f"Error writing time data for {description}: {e}")
+        session.rollback()
+        raise
+
+
+def _probe_data_frame(identity: SeriesIdentity, data: pd.DataFrame) -> ValidatedValues:
+    """
+    Build the series_data rows for one series from its time and value data, setting aside rows that fail validation.
+
+    Values are validated against the metric type the series was resolved to, which is UNKNOWN if the given metric
+    could not be found or created when loading without strict. Values of numeric metrics go in value_num, as floats,
+    and leave value empty; other metrics keep value, coerced to the metric's value type. Rejected rows are labelled
+    with their series so they can be traced and reloaded.
+    """
+    df = data[["time", "value"]].copy()  # Only keep required columns.
+    df["time"] = normalize_time_column(df["time"])
+    metric_type = identity.metric_type
+    validated = validate_values(df, metric_type)
+    df = validated.data.assign(series_id=identity.series_id)
+    if metric_type.is_numeric:
+        df["value_num"] = df["value"]
+        df["value"] = None
+    else:
+        df["value_num"] = np.nan
+    rejects = validated.rejects.assign(
+        series_id=identity.series_id, probe=identity.probe_readable, metric=metric_type.name
+    )
+    return validated.model_copy(update={"data": df, "rejects": rejects})
+
+
+def _write_series_frame(
+    session: Session,
+    validated: list[ValidatedValues],
+    identities: list[SeriesIdentity],
+    description: str,
+    reject_dir: Path,
+) -> None:
+    """
+    Write validated series_data rows and commit, caching the identities only once the commit succeeds.
+
+    Rows rejected by validation are reported and, once the commit succeeds, written to a file in reject_dir.
+    """
+    stats = sum((values.stats for values in validated), ValidationStats())
+    if stats.rejected:
+        logger.warning(f"Validated {description}: {stats}")
+    else:
+        logger.debug(f"Validated {description}: {stats}")
+
+    df = pd.concat([values.data for values in validated], ignore_index=True)
+    try:
+        inserted = write_probe_data(session, df) if len(df) else 0
+        session.commit()
+        for identity in identities:
+            series_cache.put(identity)
+        write_rejects(pd.concat([values.rejects for values in validated], ignore_index=True), reject_dir)
+        total_rows = len(df)
+        excluded = total_rows - inserted
+        if excluded > 0:
+            logger.warning(
+                f"Inserted {inserted}/{total_rows} rows for {description}; "
+                f"{excluded}/{total_rows} rejected due to conflicts"
+            )
+        else:
+            logger.info(f"Inserted {inserted}/{total_rows} rows for {description}")
+
+    except Exception as e:
+        # In case of an error, roll back the session
+        session.rollback()
+        logger.error(f"Error inserting rows for {description}: {e}")
+        raise
+
+
 @route("load_probe_metadata")
 def load_probe_metadata(
     *,
@@ -223,6 +334,7 @@ def load_probe_metadata(
         write_to_table(table=vendor.metadata_table, data=data, session=session, if_exists="update")
 
         session.commit()
+        series_cache.invalidate(probe_key)
     except Exception as e:
         session.rollback()
         logger.exception(f"Error writing to table: {e}")
@@ -231,7 +343,7 @@ def load_probe_metadata(
 
 @route("create_new_tables", method="GET")
 def create_new_tables(*, _config: BaseConfig, create_schema: bool = True, session: Session | None = None):
-    """Use the ORM definition to create all tables, optionally creating the schema as well"""
+    """Use the ORM definition to create all tables and the probe_data view, optionally creating the schema as well"""
     if _config.ROUTE_TO_BACKEND:
         return {"create_schema": create_schema}
 
@@ -242,8 +354,7 @@ def create_new_tables(*, _config: BaseConfig, create_schema: bool = True, sessio
         if create_schema:
             session.execute(text(f"CREATE SCHEMA IF NOT EXISTS {Base.metadata.schema}"))
             session.commit()
-        Base.metadata.create_all(session.bind)
-        session.commit()
+        create_tables(session.bind)
     except Exception as e:
         session.rollback()
         logger.error(f"Error writing to table: {e}")
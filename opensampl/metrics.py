@@ -6,7 +6,16 @@ from typing import Any
 
 from pydantic import BaseModel, field_serializer, field_validator
 
-type_map = {"int": int, "float": float, "str": str, "bool": bool, "list": list, "dict": dict, "jsonb": object}
+type_map = {
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "jsonb": object,
+    "object": object,
+}
 
 
 class MetricType(BaseModel):
@@ -17,6 +26,11 @@ class MetricType(BaseModel):
     unit: str
     value_type: type
 
+    @property
+    def is_numeric(self) -> bool:
+        """Return True if readings of this metric are stored in the numeric value_num column of probe_data"""
+        return self.value_type in (float, int)
+
     def convert_to_type(self, value: Any) -> Any:
         """Convert a given value to the expected type for the Metric"""
         return self.value_type(value)
@@ -13,6 +13,7 @@ from loguru import logger
 from pydanclick import from_pydantic
 from pydantic import BaseModel, ConfigDict, Field
 
+from opensampl.load.series import SeriesBatch
 from opensampl.load_data import load_probe_metadata
 from opensampl.metrics import METRICS, MetricType
 from opensampl.references import REF_TYPES, ReferenceType
@@ -126,14 +127,18 @@ class CollectMixin(ABC):
         if collect_config.load:
             cls.load_metadata(probe_key=data.probe_key, metadata=data.metadata)
 
-            for art in data.data:
-                cls.send_data(
-                    data=art.value,
-                    metric=art.metric,
-                    reference_type=art.reference_type,
-                    compound_reference=art.compound_reference,
-                    probe_key=data.probe_key,
-                )
+            cls.send_batch(
+                [
+                    SeriesBatch(
+                        probe_key=data.probe_key,
+                        metric=art.metric,
+                        reference_type=art.reference_type,
+                        compound_reference=art.compound_reference,
+                        data=art.value,
+                    )
+                    for art in data.data
+                ]
+            )
         if collect_config.output_dir:
             file_content = cls.create_file_content(data)
             collect_config.output_dir.mkdir(parents=True, exist_ok=True)
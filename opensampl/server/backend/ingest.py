@@ -0,0 +1,110 @@
+"""Bounded worker pool that keeps blocking parsing and database work off the backend's event loop."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+
+T = TypeVar("T")
+
+INGEST_QUEUE_DEPTH = Gauge("ingest_queue_depth", "Ingest jobs waiting for a free worker")
+INGEST_IN_FLIGHT = Gauge("ingest_in_flight", "Ingest jobs currently being parsed or written")
+INGEST_JOBS = Counter("ingest_jobs_total", "Ingest jobs finished", ["endpoint", "outcome"])
+INGEST_DURATION = Histogram(
+    "ingest_job_duration_seconds", "Seconds an ingest job spent parsing and writing", ["endpoint"]
+)
+INGEST_WAIT = Histogram("ingest_queue_wait_seconds", "Seconds an ingest job waited for a free worker", ["endpoint"])
+
+
+class IngestQueueFullError(RuntimeError):
+    """Raised when the ingest queue is at its limit and a job cannot be accepted."""
+
+
+class IngestPool:
+    """
+    Run blocking ingest jobs on a fixed number of worker threads.
+
+    Jobs beyond the worker count wait in a queue; once queue_limit jobs are waiting, new jobs are refused so that the
+    caller can answer with 503 and let the client back off.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        """
+        Initialize the pool.
+
+        Args:
+            workers: Number of jobs run at once. Each holds one database connection while it runs.
+            queue_limit: Maximum number of jobs waiting for a worker.
+
+        """
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def run(self, endpoint: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run func on a worker thread and wait for its result without blocking the event loop.
+
+        Raises:
+            IngestQueueFullError: If queue_limit jobs are already waiting.
+
+        """
+        with self._lock:
+            if self.queued >= self.queue_limit:
+                raise IngestQueueFullError(f"{self.queued} ingest jobs already waiting")
+            self.queued += 1
+            INGEST_QUEUE_DEPTH.set(self.queued)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._execute, endpoint, time.perf_counter(), func, args, kwargs
+        )
+
+    def _execute(self, endpoint: str, submitted: float, func: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        started = time.perf_counter()
+        INGEST_WAIT.labels(endpoint=endpoint).observe(started - submitted)
+        with self._lock:
+            self.queued -= 1
+            self.in_flight += 1
+            INGEST_QUEUE_DEPTH.set(self.queued)
+            INGEST_IN_FLIGHT.set(self.in_flight)
+
+        outcome = "failed"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "completed"
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            INGEST_DURATION.labels(endpoint=endpoint).observe(elapsed)
+            INGEST_JOBS.labels(endpoint=endpoint, outcome=outcome).inc()
+            with self._lock:
+                self.in_flight -= 1
+                if outcome == "completed":
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                INGEST_IN_FLIGHT.set(self.in_flight)
+            logger.debug(f"{endpoint} job {outcome} in {elapsed:.3f}s")
+
+    def status(self) -> dict[str, int]:
+        """Return worker count, queue depth, in-flight jobs and finished job counts."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
@@ -0,0 +1,120 @@
+"""In-memory cache of valid API access keys for the backend."""
+
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from loguru import logger
+from prometheus_client import Counter
+
+API_KEY_CACHE_LOOKUPS = Counter(
+    "api_key_cache_lookups_total", "API key validations, by whether the cached key set could be used", ["result"]
+)
+API_KEY_CACHE_REFRESHES = Counter("api_key_cache_refreshes_total", "Reloads of the API key set", ["outcome"])
+
+KeyLoader = Callable[[], dict[str, datetime | None]]
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
+class ApiKeyCache:
+    """
+    Cache of valid API keys, reloaded from their source in the background.
+
+    Keys are held as sha256 digests in a dict, so a lookup is a single hash and dict access regardless of how many
+    keys exist, and raw keys are not kept in memory. Expiry times are kept with each key so a key stops being accepted
+    as soon as it expires, even between reloads.
+
+    A lookup only waits on the loader when the key set has never been loaded, has been invalidated, or is older than
+    the ttl because background refreshes failed. Otherwise it is served from memory while a background thread reloads
+    the keys every refresh_interval seconds.
+    """
+
+    def __init__(self, loader: KeyLoader, ttl: float = 60.0, refresh_interval: float | None = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            loader: Returns a mapping of every valid key to its expiry time, or None if it never expires.
+            ttl: Seconds a loaded key set may be used before a lookup must reload it.
+            refresh_interval: Seconds between background reloads. Defaults to half the ttl.
+
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval if refresh_interval is not None else ttl / 2
+        self._lock = threading.Lock()
+        self._keys: dict[bytes, datetime | None] = {}
+        self._loaded_at: float | None = None
+        self._refresher: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at <= self.ttl
+
+    def refresh(self) -> None:
+        """Reload the key set from the loader, keeping the previous set if loading fails."""
+        try:
+            loaded = self.loader()
+        except Exception as e:
+            API_KEY_CACHE_REFRESHES.labels(outcome="failed").inc()
+            logger.warning(f"Could not reload api access keys, keeping {len(self._keys)} cached keys: {e}")
+            return
+        keys = {_digest(key): expires_at for key, expires_at in loaded.items()}
+        with self._lock:
+            self._keys = keys
+            self._loaded_at = time.monotonic()
+        API_KEY_CACHE_REFRESHES.labels(outcome="succeeded").inc()
+        logger.debug(f"Loaded {len(keys)} api access keys")
+
+    def _ensure_loaded(self) -> None:
+        self._start_refresher()
+        with self._lock:
+            fresh = self._fresh()
+        API_KEY_CACHE_LOOKUPS.labels(result="hit" if fresh else "miss").inc()
+        if not fresh:
+            self.refresh()
+
+    def _start_refresher(self) -> None:
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="api-key-refresh", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def has_keys(self) -> bool:
+        """Return True if any key is currently valid."""
+        self._ensure_loaded()
+        now = datetime.now(tz=UTC)
+        with self._lock:
+            return any(expires_at is None or expires_at > now for expires_at in self._keys.values())
+
+    def is_valid(self, key: str | None) -> bool:
+        """Return True if key is a known key that has not expired."""
+        if not key:
+            return False
+        self._ensure_loaded()
+        with self._lock:
+            if (digest := _digest(key)) not in self._keys:
+                return False
+            expires_at = self._keys[digest]
+        return expires_at is None or expires_at > datetime.now(tz=UTC)
+
+    def invalidate(self) -> None:
+        """Force the next lookup to reload the key set, e.g. after a key has been created."""
+        with self._lock:
+            self._loaded_at = None
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop.set()
@@ -1,15 +1,14 @@
 """API Configuration to Indirectly interact with the database"""
 
-import io
 import json
 import os
 import sys
 import time
 from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 from typing import Any
 
-import pandas as pd
 import psycopg2
 from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, Response, Security, UploadFile
 from fastapi.responses import JSONResponse, RedirectResponse
@@ -24,8 +23,13 @@ from sqlalchemy.orm import Session, sessionmaker
 from opensampl import load_data
 from opensampl.db.access_orm import APIAccessKey
 from opensampl.db.orm import ProbeMetadata
+from opensampl.load.series import SeriesBatch, series_from_frame
+from opensampl.load.wire import UnsupportedWireFormatError, available_formats, decode_frame
 from opensampl.metrics import METRICS, MetricType
 from opensampl.references import REF_TYPES, CompoundReferenceType, ReferenceType
+from opensampl.server.backend.ingest import IngestPool, IngestQueueFullError
+from opensampl.server.backend.keys import ApiKeyCache
+from opensampl.server.backend.spool import IngestSpool, SpoolJob
 from opensampl.vendors.constants import ProbeKey, VendorType
 
 
@@ -72,7 +76,28 @@ REQUEST_LATENCY = Histogram(
     "http_request_duration_seconds", "Duration of HTTP requests in seconds", ["method", "endpoint"]
 )
 
-EXCLUDED_PATHS = {"/metrics", "/healthcheck", "/healthcheck_database", "/healthcheck_metadata"}
+EXCLUDED_PATHS = {"/metrics", "/healthcheck", "/healthcheck_database", "/healthcheck_metadata", "/ingest_status"}
+
+# Uploads are parsed and written on a bounded pool of worker threads so they never block the event loop
+ingest_pool = IngestPool(
+    workers=int(os.getenv("BACKEND_INGEST_WORKERS", "4")),
+    queue_limit=int(os.getenv("BACKEND_INGEST_QUEUE_LIMIT", "64")),
+)
+INGEST_RETRY_AFTER = 1
+
+# With async ingest, uploads are acknowledged with 202 once spooled to disk and written by background writers
+ASYNC_INGEST = os.getenv("BACKEND_ASYNC_INGEST", "false").lower() == "true"
+spool = (
+    IngestSpool(
+        directory=Path(os.getenv("BACKEND_SPOOL_DIR", "/var/lib/opensampl/spool")),
+        session_factory=sessionmaker(bind=engine),
+        writers=int(os.getenv("BACKEND_SPOOL_WRITERS", "2")),
+        max_batch_rows=int(os.getenv("BACKEND_COALESCE_ROWS", "500000")),
+        max_wait=float(os.getenv("BACKEND_COALESCE_WAIT", "0.5")),
+    )
+    if ASYNC_INGEST
+    else None
+)
 
 logger.configure(handlers=[{"sink": sys.stderr, "level": loglevel}])
 
@@ -82,25 +107,30 @@ API_KEY_NAME = "access-key"
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
 
 
-def get_keys():
-    """Get active API keys"""
+def load_keys() -> dict[str, datetime | None]:
+    """Get active API keys, with their expiry time"""
     env_keys = os.getenv("API_KEYS", "").strip()
     keys = [k.strip() for k in env_keys.split(",") if k.strip()]
     if keys:
         logger.debug("api access keys loaded from env")
+        return dict.fromkeys(keys)
+    Session = sessionmaker(bind=engine)  # noqa: N806
+    with Session() as session:
+        now = datetime.now(tz=UTC)
+        stmt = select(APIAccessKey.key, APIAccessKey.expires_at).where(
+            or_(APIAccessKey.expires_at.is_(None), APIAccessKey.expires_at > now)
+        )
+        result = session.execute(stmt)
+        # expires_at is stored without a timezone, as UTC
+        keys = {
+            key: expires_at.replace(tzinfo=UTC) if expires_at and expires_at.tzinfo is None else expires_at
+            for key, expires_at in result.all()
+        }
+        logger.debug("api access keys loaded from db")
         return keys
-    try:
-        Session = sessionmaker(bind=engine)  # noqa: N806
-        with Session() as session:
-            now = datetime.now(tz=UTC)
-            stmt = select(APIAccessKey.key).where(or_(APIAccessKey.expires_at is None, APIAccessKey.expires_at > now))
-            result = session.execute(stmt)
-            keys = [row[0] for row in result.all()]
-            logger.debug("api access keys loaded from db")
-            return keys
-    except Exception as e:
-        logger.debug(f"exception attempting to load api access keys from db: {e}")
-        return []
+
+
+api_key_cache = ApiKeyCache(loader=load_keys, ttl=float(os.getenv("API_KEY_CACHE_TTL", "60")))
 
 
 def require_api_key(bootstrap: bool = False):
@@ -111,11 +141,10 @@ def require_api_key(bootstrap: bool = False):
         if not USE_API_KEY:
             return None  # Security is disabled
 
-        keys = get_keys()
-        if not keys and bootstrap:
+        if bootstrap and not api_key_cache.has_keys():
             logger.warning("No API keys configured; allowing bootstrap API key generation")
             return None
-        if api_key not in keys:
+        if not api_key_cache.is_valid(api_key):
             raise HTTPException(status_code=403, detail="Invalid or missing API key")
         return api_key
 
@@ -185,7 +214,7 @@ def write_to_table(
         return JSONResponse(content={"message": f"Succeeded loading data into {payload.table}"}, status_code=200)
     except IntegrityError as e:
         if isinstance(e.orig, psycopg2.errors.UniqueViolation):
-            return JSONResponse(content={"message": f"Unique violation error: {e}"}, status_code=409)
+            return _conflict_response(e)
         return JSONResponse(content={"message": f"Integrity error: {e}"}, status_code=500)
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemy error: {e}")
@@ -198,6 +227,32 @@ def write_to_table(
         return JSONResponse(content={"message": f"Failed to load JSON into database: {e}"}, status_code=500)
 
 
+def _conflict_response(error: IntegrityError) -> JSONResponse:
+    """Report a unique violation, naming the constraint so clients can tell an already loaded file from a clash"""
+    constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+    return JSONResponse(
+        content={"message": f"Unique violation error: {error}", "constraint": constraint}, status_code=409
+    )
+
+
+def _busy_response(error: IngestQueueFullError) -> JSONResponse:
+    """Ask the client to retry later when every ingest worker is busy and the queue is full"""
+    logger.warning(f"Refusing ingest request: {error}")
+    return JSONResponse(
+        content={"message": f"Backend is busy: {error}"},
+        status_code=503,
+        headers={"Retry-After": str(INGEST_RETRY_AFTER)},
+    )
+
+
+def _accepted_response(rows: int, job: SpoolJob) -> JSONResponse:
+    """Acknowledge an upload that has been spooled for a background writer"""
+    return JSONResponse(
+        content={"message": f"Accepted {rows} data points", "job_id": job.job_id, "status": job.status},
+        status_code=202,
+    )
+
+
 @app.post("/load_time_data")
 async def load_time_data(  # noqa: PLR0912, C901
     probe_key_str: str = Form(...),
@@ -229,29 +284,100 @@ async def load_time_data(  # noqa: PLR0912, C901
 
         compound_key = None if compound_key_str is None else json.loads(compound_key_str)
 
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
-        logger.info(df.head())
-        # Convert time strings back to datetime
-        df["time"] = pd.to_datetime(df["time"])
-
-        # Use the same load_time_data function as before
-        load_data.load_time_data(
-            probe_key=probe_key,
-            metric_type=metric_type,
-            reference_type=reference_type,
-            compound_key=compound_key,
-            data=df,
-            session=session,
-        )
+        def ingest() -> tuple[int, SpoolJob | None]:
+            # Times stay as sent; load_time_data only parses them if they did not arrive typed
+            df = decode_frame(file.file, file.content_type, file.filename)
+            logger.info(df.head())
+
+            if spool is not None:
+                batch = SeriesBatch(
+                    probe_key=probe_key,
+                    metric=metric_type,
+                    reference_type=reference_type,
+                    compound_reference=compound_key,
+                    data=df,
+                )
+                return len(df), spool.submit([batch])
+
+            # Use the same load_time_data function as before
+            load_data.load_time_data(
+                probe_key=probe_key,
+                metric_type=metric_type,
+                reference_type=reference_type,
+                compound_key=compound_key,
+                data=df,
+                session=session,
+            )
+            return len(df), None
+
+        rows, job = await ingest_pool.run("load_time_data", ingest)
+        if job is not None:
+            return _accepted_response(rows, job)
+        return JSONResponse(content={"message": f"Successfully loaded {rows} data points"}, status_code=200)
+    except IngestQueueFullError as e:
+        return _busy_response(e)
+    except UnsupportedWireFormatError as e:
+        return JSONResponse(content={"message": str(e)}, status_code=415)
+    except IntegrityError as e:
+        if session:
+            session.rollback()
+            session.close()
+        if isinstance(e.orig, psycopg2.errors.UniqueViolation):
+            return _conflict_response(e)
+        return JSONResponse(content={"message": f"Integrity error: {e}"}, status_code=500)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {e}")
+        if session:
+            session.rollback()
+            session.close()
+        raise HTTPException(status_code=500, detail=f"Database error: {e!s}") from e
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}")
+        if session:
+            session.rollback()
+            session.close()
+        raise HTTPException(status_code=500, detail=f"Error processing time series data: {e!s}") from e
+
+
+@app.post("/load_time_data_batch")
+async def load_time_data_batch(  # noqa: C901
+    series_str: str = Form(...),
+    strict: str = Form("true"),
+    file: UploadFile = File(...),
+    api_key: str = Depends(require_api_key()),
+    session: Session = Depends(get_db),
+):
+    """Load provided data for many probe/metric/reference series in one transaction"""
+    try:
+        series_payloads = json.loads(series_str)
+
+        def ingest() -> tuple[int, SpoolJob | None]:
+            df = decode_frame(file.file, file.content_type, file.filename)
+            series = series_from_frame(series_payloads, df)
 
-        return JSONResponse(content={"message": f"Successfully loaded {len(df)} data points"}, status_code=200)
+            if spool is not None:
+                return len(df), spool.submit(series, strict=json.loads(strict))
+
+            load_data.load_time_data_batch(series=series, strict=json.loads(strict), session=session)
+            return len(df), None
+
+        rows, job = await ingest_pool.run("load_time_data_batch", ingest)
+        if job is not None:
+            return _accepted_response(rows, job)
+        return JSONResponse(
+            content={"message": f"Successfully loaded {rows} data points across {len(series_payloads)} series"},
+            status_code=200,
+        )
+    except IngestQueueFullError as e:
+        return _busy_response(e)
+    except UnsupportedWireFormatError as e:
+        return JSONResponse(content={"message": str(e)}, status_code=415)
     except IntegrityError as e:
         if session:
             session.rollback()
             session.close()
         if isinstance(e.orig, psycopg2.errors.UniqueViolation):
-            return JSONResponse(content={"message": f"Unique violation error: {e}"}, status_code=409)
+            return _conflict_response(e)
         return JSONResponse(content={"message": f"Integrity error: {e}"}, status_code=500)
     except SQLAlchemyError as e:
         logger.error(f"Database error: {e}")
@@ -285,7 +411,7 @@ def load_probe_metadata(
     except IntegrityError as e:
         session.rollback()
         if isinstance(e.orig, psycopg2.errors.UniqueViolation):
-            return JSONResponse(content={"message": f"Unique violation error: {e}"}, status_code=409)
+            return _conflict_response(e)
         return JSONResponse(content={"message": f"Integrity error: {e}"}, status_code=500)
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemy error: {e}")
@@ -333,6 +459,7 @@ def generate_api_key(
         session.add(new_key)
 
         session.commit()
+        api_key_cache.invalidate()
         return JSONResponse(content={"message": "Succeeded in creating new access key"}, status_code=200)
     except SQLAlchemyError as e:
         logger.error(f"SQLAlchemy error: {e}")
@@ -342,6 +469,30 @@ def generate_api_key(
         return JSONResponse(content={"message": f"Failed to create new access key: {e}"}, status_code=500)
 
 
+@app.get("/wire_formats")
+def wire_formats():
+    """List the upload formats accepted for time data, in order of preference"""
+    return {"formats": available_formats()}
+
+
+@app.get("/ingest_status")
+def ingest_status():
+    """Report ingest worker count, queue depth and in-flight jobs"""
+    status = ingest_pool.status()
+    if spool is not None:
+        status["spool"] = spool.stats()
+    return status
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str, api_key: str = Depends(require_api_key())):
+    """Report the progress of an upload accepted for background writing"""
+    job = spool.status(job_id) if spool is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job {job_id}")
+    return job.model_dump()
+
+
 @app.get("/healthcheck")
 def healthcheck():
     """Ensure the api is accepting queries"""
@@ -0,0 +1,337 @@
+"""Durable on-disk queue of accepted uploads, drained into the database by background writers."""
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Literal
+
+from loguru import logger
+from prometheus_client import Counter, Gauge, Histogram
+from pydantic import BaseModel
+from sqlalchemy.exc import DBAPIError, DisconnectionError, OperationalError
+from sqlalchemy.orm import Session
+
+from opensampl import load_data
+from opensampl.load.series import SeriesBatch, merge_series, series_frame, series_from_frame
+from opensampl.load.wire import available_formats, decode_frame, encode_frame
+
+SPOOL_DEPTH = Gauge("spool_queue_depth", "Accepted uploads waiting to be written to the database")
+SPOOL_LAG = Gauge("spool_lag_seconds", "Age of the oldest accepted upload not yet written")
+SPOOL_JOBS = Counter("spool_jobs_total", "Spooled uploads finished", ["outcome"])
+SPOOL_ROWS = Counter("spool_rows_written_total", "Rows written to the database from spooled uploads")
+SPOOL_BATCH_JOBS = Histogram(
+    "spool_batch_jobs", "Uploads coalesced into each database write", buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+SPOOL_WRITE_SECONDS = Histogram("spool_write_seconds", "Seconds spent writing each coalesced batch")
+
+job_states = Literal["queued", "writing", "done", "failed"]
+
+# SQLSTATEs of a server that is shutting down or not yet accepting connections. Connection exceptions are class 08.
+UNAVAILABLE_SQLSTATES = frozenset({"57P01", "57P02", "57P03"})
+
+
+class SpoolJob(BaseModel):
+    """An accepted upload and its progress"""
+
+    job_id: str
+    status: job_states = "queued"
+    rows: int
+    series: int
+    strict: bool = True
+    submitted_at: float
+    finished_at: float | None = None
+    error: str | None = None
+    data_file: str
+    content_type: str
+
+
+class IngestSpool:
+    """
+    Accept uploads onto local disk and write them to the database in the background.
+
+    An upload is written to the spool directory and fsynced before it is acknowledged, so accepted data survives a
+    backend restart; jobs still in the spool at startup are queued again. Writer threads take every job waiting (up to
+    max_batch_rows rows, waiting up to max_wait seconds for more to arrive), merge uploads for the same series, and
+    write the lot with a single load_time_data_batch call, so many small uploads become one COPY. If a coalesced write
+    fails, its jobs are retried one at a time so one bad upload does not fail the others; uploads that still fail are
+    moved to the failed/ subdirectory. If the database cannot be reached, jobs stay queued and are retried; errors
+    from a connected database, such as a statement timeout, count against the uploads like any other failure.
+
+    Status of the most recent finished jobs is kept in memory.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        session_factory: Callable[[], Session],
+        writers: int = 2,
+        max_batch_rows: int = 500_000,
+        max_wait: float = 0.5,
+        keep_finished: int = 10_000,
+        retry_delay: float = 5.0,
+    ):
+        """
+        Initialize the spool, queueing any jobs left over from a previous run, and start the writers.
+
+        Args:
+            directory: Where accepted uploads are stored until written.
+            session_factory: Creates database sessions for the writers.
+            writers: Number of writer threads.
+            max_batch_rows: Most rows a writer coalesces into one database write.
+            max_wait: Seconds a writer waits for more uploads to coalesce before writing what it has.
+            keep_finished: Number of finished jobs whose status is kept for lookups.
+            retry_delay: Seconds a writer pauses after finding the database unavailable.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.session_factory = session_factory
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.keep_finished = keep_finished
+        self.retry_delay = retry_delay
+        self.failed_directory = self.directory / "failed"
+        self.wire_format = "arrow" if "arrow" in available_formats() else "csv"
+
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[str] = queue.Queue()
+        self._pending: dict[str, SpoolJob] = {}
+        self._finished: OrderedDict[str, SpoolJob] = OrderedDict()
+        self._stop = threading.Event()
+
+        SPOOL_DEPTH.set_function(self._depth)
+        SPOOL_LAG.set_function(self._lag)
+        self._recover()
+        self._writers = [
+            threading.Thread(target=self._writer_loop, name=f"spool-writer-{i}", daemon=True) for i in range(writers)
+        ]
+        for writer in self._writers:
+            writer.start()
+
+    def _job_file(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def _recover(self) -> None:
+        """Queue jobs accepted before a restart and remove data files whose job was never acknowledged."""
+        jobs = []
+        for job_file in self.directory.glob("*.json"):
+            try:
+                job = SpoolJob.model_validate(json.loads(job_file.read_text())["job"])
+            except (ValueError, KeyError) as e:
+                logger.error(f"Skipping unreadable spool job {job_file}: {e}")
+                continue
+            jobs.append(job.model_copy(update={"status": "queued"}))
+        known = {job.data_file for job in jobs}
+        for data_file in self.directory.iterdir():
+            if data_file.is_file() and data_file.suffix != ".json" and data_file.name not in known:
+                data_file.unlink(missing_ok=True)
+        for job in sorted(jobs, key=lambda j: j.submitted_at):
+            self._pending[job.job_id] = job
+            self._queue.put(job.job_id)
+        if jobs:
+            logger.info(f"Recovered {len(jobs)} spooled uploads")
+
+    def submit(self, series: list[SeriesBatch], strict: bool = True) -> SpoolJob:
+        """
+        Durably store an upload and queue it for writing.
+
+        Raises:
+            KeyError: If a series is missing its time or value column.
+            ValueError: If the times cannot be parsed.
+
+        Returns:
+            The queued job.
+
+        """
+        job_id = uuid.uuid4().hex
+        frame = series_frame(series)
+        # Reject unparseable times now, while the client can still be told
+        frame["time"] = load_data.normalize_time_column(frame["time"])
+        filename, content, content_type = encode_frame(frame, job_id, self.wire_format)
+        job = SpoolJob(
+            job_id=job_id,
+            rows=len(frame),
+            series=len(series),
+            strict=strict,
+            submitted_at=time.time(),
+            data_file=filename,
+            content_type=content_type,
+        )
+        _write_durably(self.directory / filename, content)
+        payload = {"job": job.model_dump(), "series": [batch.identity_payload() for batch in series]}
+        # The job file is written last; its presence is what marks the upload as accepted
+        _write_durably(self._job_file(job_id), json.dumps(payload).encode("utf-8"))
+
+        with self._lock:
+            self._pending[job_id] = job
+        self._queue.put(job_id)
+        return job
+
+    def status(self, job_id: str) -> SpoolJob | None:
+        """Return the job, or None if it is unknown or finished too long ago to be remembered."""
+        with self._lock:
+            return self._pending.get(job_id) or self._finished.get(job_id)
+
+    def _depth(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._pending.values() if job.status == "queued")
+
+    def _lag(self) -> float:
+        with self._lock:
+            oldest = min((job.submitted_at for job in self._pending.values()), default=None)
+        return 0.0 if oldest is None else time.time() - oldest
+
+    def stats(self) -> dict[str, float | int]:
+        """Return queue depth, jobs being written, and lag of the oldest unwritten job."""
+        with self._lock:
+            writing = sum(1 for job in self._pending.values() if job.status == "writing")
+        return {"writers": len(self._writers), "queued": self._depth(), "writing": writing, "lag_seconds": self._lag()}
+
+    def _take_batch(self) -> list[str]:
+        """Wait for a job, then gather more until the row budget or the coalescing wait runs out."""
+        try:
+            first = self._queue.get(timeout=1)
+        except queue.Empty:
+            return []
+        job_ids = [first]
+        with self._lock:
+            rows = self._pending[first].rows
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_rows:
+            try:
+                job_id = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            job_ids.append(job_id)
+            with self._lock:
+                rows += self._pending[job_id].rows
+        return job_ids
+
+    def _writer_loop(self) -> None:
+        while not self._stop.is_set():
+            job_ids = self._take_batch()
+            if not job_ids:
+                continue
+            with self._lock:
+                by_strict = {
+                    strict: [j for j in job_ids if self._pending[j].strict == strict] for strict in (True, False)
+                }
+            for strict, group in by_strict.items():
+                if group:
+                    self._write(group, strict)
+
+    def _load_series(self, job_id: str) -> list[SeriesBatch]:
+        payload = json.loads(self._job_file(job_id).read_text())
+        job = self._pending[job_id]
+        with (self.directory / job.data_file).open("rb") as f:
+            frame = decode_frame(f, job.content_type, job.data_file)
+        return series_from_frame(payload["series"], frame)
+
+    def _merged_series(self, job_ids: list[str]) -> list[SeriesBatch]:
+        """Load the jobs' uploads, combining the data of uploads for the same series."""
+        return merge_series([batch for job_id in job_ids for batch in self._load_series(job_id)])
+
+    def _write(self, job_ids: list[str], strict: bool) -> None:
+        """Write the jobs in one transaction, falling back to one at a time if that fails."""
+        with self._lock:
+            for job_id in job_ids:
+                self._pending[job_id].status = "writing"
+        start = time.perf_counter()
+        try:
+            series = self._merged_series(job_ids)
+            with self.session_factory() as session:
+                load_data.load_time_data_batch(series=series, strict=strict, session=session)
+        except Exception as e:
+            if is_database_unavailable(e):
+                # The database is unavailable rather than the data being bad; keep the uploads and try again later
+                logger.warning(f"Database unavailable, requeueing {len(job_ids)} spooled uploads: {e}")
+                with self._lock:
+                    for job_id in job_ids:
+                        self._pending[job_id].status = "queued"
+                for job_id in job_ids:
+                    self._queue.put(job_id)
+                self._stop.wait(self.retry_delay)
+                return
+            if len(job_ids) > 1:
+                logger.warning(f"Coalesced write of {len(job_ids)} uploads failed, retrying individually: {e}")
+                for job_id in job_ids:
+                    self._write([job_id], strict)
+                return
+            self._finish(job_ids[0], "failed", str(e))
+            return
+
+        SPOOL_WRITE_SECONDS.observe(time.perf_counter() - start)
+        SPOOL_BATCH_JOBS.observe(len(job_ids))
+        for job_id in job_ids:
+            self._finish(job_id, "done")
+
+    def _finish(self, job_id: str, status: job_states, error: str | None = None) -> None:
+        with self._lock:
+            job = self._pending.pop(job_id)
+            job.status = status
+            job.error = error
+            job.finished_at = time.time()
+            self._finished[job_id] = job
+            while len(self._finished) > self.keep_finished:
+                self._finished.popitem(last=False)
+        SPOOL_JOBS.labels(outcome=status).inc()
+        if status == "done":
+            SPOOL_ROWS.inc(job.rows)
+            (self.directory / job.data_file).unlink(missing_ok=True)
+            self._job_file(job_id).unlink(missing_ok=True)
+            return
+
+        # Keep rejected uploads for inspection, out of the way of recovery
+        logger.error(f"Spooled upload {job_id} failed and was moved to {self.failed_directory}: {error}")
+        self.failed_directory.mkdir(exist_ok=True)
+        for path in (self.directory / job.data_file, self._job_file(job_id)):
+            if path.exists():
+                path.replace(self.failed_directory / path.name)
+
+    def stop(self) -> None:
+        """Stop the writers once they finish their current batch."""
+        self._stop.set()
+        for writer in self._writers:
+            writer.join()
+
+
+def is_database_unavailable(error: Exception) -> bool:
+    """
+    Return whether a write failed because the database could not be reached, rather than because of what was written.
+
+    That is a dropped or refused connection, which libpq reports without a SQLSTATE, a connection exception (class
+    08), or a server shutting down or starting up. Any other database error, such as a statement timeout, is specific
+    to the write and would fail again if it were retried.
+    """
+    if isinstance(error, DisconnectionError):
+        return True
+    if not isinstance(error, DBAPIError):
+        return False
+    if error.connection_invalidated:
+        return True
+    pgcode = getattr(error.orig, "pgcode", None)
+    if pgcode is None:
+        return isinstance(error, OperationalError)
+    return pgcode.startswith("08") or pgcode in UNAVAILABLE_SQLSTATES
+
+
+def _write_durably(path: Path, content: bytes) -> None:
+    """Write content to path so that it is either fully on disk or absent, even across a crash."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(path)
+    # The rename is only durable once the directory entry itself has been flushed
+    directory = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
@@ -6,7 +6,7 @@ import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import TextIO, cast
+from typing import TYPE_CHECKING, TextIO, cast
 
 import click
 from dotenv import find_dotenv
@@ -15,6 +15,9 @@ from loguru import logger
 from opensampl.config.server import ServerConfig
 from opensampl.server import ensure_docker
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
 ensure_docker()
 
 
@@ -169,5 +172,55 @@ def run(ctx: click.Context, run_commands: list) -> None:
     process.wait()
 
 
+@cli.group()
+def compression() -> None:
+    """Inspect and configure compression of the time data hypertable."""
+
+
+def _db_session(config: ServerConfig) -> Session:
+    """Open a session on the server's database, preferring DATABASE_URL when it is configured."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    return Session(create_engine(config.DATABASE_URL or config.get_db_url()))
+
+
+@compression.command()
+@click.pass_context
+def report(ctx: click.Context) -> None:
+    """Report the compression ratio of every series_data chunk."""
+    from tabulate import tabulate
+
+    from opensampl.db.compression import chunk_compression_stats
+
+    with _db_session(ctx.obj["conf"]) as session:
+        chunks = chunk_compression_stats(session)
+
+    click.echo(tabulate(chunks, headers="keys", tablefmt="simple", floatfmt=".2f", missingval="-"))
+    compressed = [chunk for chunk in chunks if chunk["after_bytes"]]
+    if compressed:
+        before = sum(chunk["before_bytes"] for chunk in compressed)
+        after = sum(chunk["after_bytes"] for chunk in compressed)
+        click.echo(
+            f"\n{len(compressed)}/{len(chunks)} chunks compressed: "
+            f"{before / 2**20:,.1f} MB -> {after / 2**20:,.1f} MB ({before / after:.2f}x)"
+        )
+    else:
+        click.echo(f"\n0/{len(chunks)} chunks compressed")
+
+
+@compression.command()
+@click.argument("compress_after")
+@click.pass_context
+def policy(ctx: click.Context, compress_after: str) -> None:
+    """Compress series_data chunks once all of their data is older than COMPRESS_AFTER, such as "7 days"."""
+    from opensampl.db.compression import set_compression_policy
+
+    with _db_session(ctx.obj["conf"]) as session:
+        set_compression_policy(session, compress_after)
+        session.commit()
+    click.echo(f"Chunks will be compressed once older than {compress_after}")
+
+
 if __name__ == "__main__":
     cli()
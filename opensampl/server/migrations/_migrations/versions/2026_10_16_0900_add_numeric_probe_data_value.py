@@ -0,0 +1,197 @@
+"""add numeric probe data value
+
+Revision ID: 9841603be1b0
+Revises: c95e49e551be
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9841603be1b0'
+down_revision: Union[str, None] = 'c95e49e551be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+BACKFILL_JOB = 'backfill_probe_data_value_num'
+NUMERIC_VALUE_TYPES = "('float', 'int')"
+
+# Writers that predate value_num send every reading as JSON; move the numeric readings of numeric metrics over.
+# Only those writers pay for the metric_type lookup, as current writers fill value_num themselves.
+SPLIT_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION {SCHEMA}.split_probe_data_value()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.value_num IS NULL AND jsonb_typeof(NEW.value) = 'number' AND EXISTS (
+        SELECT 1 FROM {SCHEMA}.metric_type m
+        WHERE m.uuid = NEW.metric_type_uuid AND m.value_type IN {NUMERIC_VALUE_TYPES}
+    ) THEN
+        NEW.value_num := (NEW.value #>> '{{}}')::double precision;
+        NEW.value := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER probe_data_split_value
+    BEFORE INSERT ON {SCHEMA}.probe_data
+    FOR EACH ROW
+EXECUTE FUNCTION {SCHEMA}.split_probe_data_value();
+"""
+
+PROBE_DATA_CHUNKS = f"""
+    SELECT format('%I.%I', ch.chunk_schema, ch.chunk_name) AS chunk, ch.range_end
+    FROM timescaledb_information.chunks ch
+    WHERE ch.hypertable_schema = '{SCHEMA}' AND ch.hypertable_name = 'probe_data'
+      AND format('%I.%I', ch.chunk_schema, ch.chunk_name) NOT IN (
+          SELECT b.chunk FROM {SCHEMA}.probe_data_value_num_backfill b
+      )
+"""
+
+# Moves existing readings a few chunks at a time, newest first so that dashboards speed up soonest, committing after
+# each chunk. pg_cron runs it every minute until every chunk is done, at which point it unschedules itself.
+BACKFILL_SQL = f"""
+CREATE TABLE IF NOT EXISTS {SCHEMA}.probe_data_value_num_backfill (
+    chunk TEXT PRIMARY KEY,
+    rows_moved BIGINT NOT NULL,
+    finished_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE PROCEDURE {SCHEMA}.{BACKFILL_JOB}(max_chunks INT DEFAULT 4)
+LANGUAGE plpgsql AS $$
+DECLARE
+    next_chunk TEXT;
+    moved BIGINT;
+    remaining BIGINT;
+BEGIN
+    -- Skip this run if the previous one is still working through its chunks
+    IF NOT pg_try_advisory_lock(hashtext('{SCHEMA}.{BACKFILL_JOB}')) THEN
+        RETURN;
+    END IF;
+
+    FOR next_chunk IN
+        SELECT pending.chunk FROM ({PROBE_DATA_CHUNKS}) pending ORDER BY pending.range_end DESC LIMIT max_chunks
+    LOOP
+        EXECUTE format($update$
+            UPDATE %s pd
+            SET value_num = (pd.value #>> '{{}}')::double precision, value = NULL
+            FROM {SCHEMA}.metric_type m
+            WHERE pd.metric_type_uuid = m.uuid
+              AND m.value_type IN {NUMERIC_VALUE_TYPES}
+              AND jsonb_typeof(pd.value) = 'number'
+        $update$, next_chunk);
+        GET DIAGNOSTICS moved = ROW_COUNT;
+        INSERT INTO {SCHEMA}.probe_data_value_num_backfill (chunk, rows_moved) VALUES (next_chunk, moved);
+        RAISE NOTICE 'Moved % readings to value_num in %', moved, next_chunk;
+        COMMIT;
+    END LOOP;
+
+    SELECT count(*) INTO remaining FROM ({PROBE_DATA_CHUNKS}) pending;
+    IF remaining = 0 THEN
+        PERFORM cron.unschedule(j.jobid) FROM cron.job j WHERE j.jobname = '{BACKFILL_JOB}';
+        RAISE NOTICE 'value_num backfill complete';
+    END IF;
+    PERFORM pg_advisory_unlock(hashtext('{SCHEMA}.{BACKFILL_JOB}'));
+END;
+$$;
+"""
+
+FILTER_FUNCTIONS = {
+    "get_probe_data_by_probe": ("probe_uuid_param TEXT", "pd.probe_uuid = probe_uuid_param"),
+    "get_probe_data_by_metric": ("metric_type_uuid_param TEXT", "pd.metric_type_uuid = metric_type_uuid_param"),
+    "get_probe_data_by_probe_and_metric": (
+        "probe_uuid_param TEXT, metric_type_uuid_param TEXT",
+        "pd.probe_uuid = probe_uuid_param AND pd.metric_type_uuid = metric_type_uuid_param",
+    ),
+}
+
+
+def filter_function_sql(name: str, params: str, where: str, with_value_num: bool) -> str:
+    """Build one of the data filtering functions, optionally returning value_num alongside the JSON value."""
+    value_num_column = ",\n        value_num DOUBLE PRECISION" if with_value_num else ""
+    # Keep value populated for every metric so existing queries of the functions still work
+    value_select = "COALESCE(pd.value, to_jsonb(pd.value_num))" if with_value_num else "pd.value"
+    value_num_select = ",\n            pd.value_num" if with_value_num else ""
+    return f"""
+    DROP FUNCTION IF EXISTS {name};
+    CREATE OR REPLACE FUNCTION {name}({params})
+    RETURNS TABLE(
+        "time" TIMESTAMP,
+        probe_uuid VARCHAR(36),
+        reference_uuid VARCHAR(36),
+        metric_type_uuid VARCHAR(36),
+        value JSONB{value_num_column}
+    ) AS $$
+    BEGIN
+        RETURN QUERY
+        SELECT
+            pd.time,
+            pd.probe_uuid,
+            pd.reference_uuid,
+            pd.metric_type_uuid,
+            {value_select}{value_num_select}
+        FROM {SCHEMA}.probe_data pd
+        WHERE {where}
+        ORDER BY pd.time;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+
+
+def upgrade() -> None:
+    op.add_column(
+        'probe_data',
+        sa.Column(
+            'value_num',
+            postgresql.DOUBLE_PRECISION(),
+            nullable=True,
+            comment="Measurement value for metrics with a float or int value type",
+        ),
+        schema=SCHEMA,
+    )
+    op.alter_column(
+        'probe_data', 'value',
+        existing_type=postgresql.JSONB(),
+        comment="Measurement value stored as JSON, for metrics whose value type is not numeric",
+        schema=SCHEMA,
+    )
+    op.execute(sa.text(SPLIT_TRIGGER_SQL))
+
+    for name, (params, where) in FILTER_FUNCTIONS.items():
+        op.execute(sa.text(filter_function_sql(name, params, where, with_value_num=True)))
+
+    op.execute(sa.text(BACKFILL_SQL))
+    op.execute(sa.text(f"SELECT cron.schedule('{BACKFILL_JOB}', '* * * * *', 'CALL {SCHEMA}.{BACKFILL_JOB}()');"))
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"""
+    SELECT cron.unschedule(jobid) FROM cron.job WHERE jobname = '{BACKFILL_JOB}';
+    DROP PROCEDURE IF EXISTS {SCHEMA}.{BACKFILL_JOB};
+    DROP TABLE IF EXISTS {SCHEMA}.probe_data_value_num_backfill;
+    DROP TRIGGER IF EXISTS probe_data_split_value ON {SCHEMA}.probe_data;
+    DROP FUNCTION IF EXISTS {SCHEMA}.split_probe_data_value;
+    """))
+
+    for name, (params, where) in FILTER_FUNCTIONS.items():
+        op.execute(sa.text(filter_function_sql(name, params, where, with_value_num=False)))
+
+    # Readings only kept in value_num would be lost with the column; put them back in value first
+    op.execute(sa.text(f"""
+    UPDATE {SCHEMA}.probe_data
+    SET value = to_jsonb(value_num)
+    WHERE value IS NULL AND value_num IS NOT NULL;
+    """))
+    op.drop_column('probe_data', 'value_num', schema=SCHEMA)
+    op.alter_column(
+        'probe_data', 'value',
+        existing_type=postgresql.JSONB(),
+        comment="Measurement value stored as JSON; value's expected type defined via metric",
+        schema=SCHEMA,
+    )
@@ -0,0 +1,219 @@
+"""add series key
+
+Revision ID: 3fd6a8c2b471
+Revises: 9841603be1b0
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from loguru import logger
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3fd6a8c2b471'
+down_revision: Union[str, None] = '9841603be1b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+SERIES_KEY = ['probe_uuid', 'reference_uuid', 'metric_type_uuid']
+
+CHUNK_INTERVAL_SQL = """
+    SELECT d.time_interval FROM timescaledb_information.dimensions d
+    WHERE d.hypertable_schema = '{schema}' AND d.hypertable_name = '{table}' AND d.column_name = 'time'
+"""
+
+# Rows copied from probe_data also finish the value_num backfill, so that job is no longer needed afterwards
+MOVE_CHUNK_SQL = f"""
+INSERT INTO {SCHEMA}.series_data (time, series_id, value, value_num)
+SELECT
+    pd.time,
+    s.series_id,
+    CASE WHEN moves_to_value_num THEN NULL ELSE pd.value END,
+    CASE WHEN moves_to_value_num THEN (pd.value #>> '{{{{}}}}')::double precision ELSE pd.value_num END
+FROM {{chunk}} pd
+JOIN {SCHEMA}.series s
+    ON s.probe_uuid = pd.probe_uuid AND s.reference_uuid = pd.reference_uuid
+    AND s.metric_type_uuid = pd.metric_type_uuid
+JOIN {SCHEMA}.metric_type m ON m.uuid = pd.metric_type_uuid,
+LATERAL (
+    SELECT pd.value_num IS NULL AND m.value_type IN ('float', 'int') AND jsonb_typeof(pd.value) = 'number'
+        AS moves_to_value_num
+) conversion
+"""
+
+RESTORE_CHUNK_SQL = f"""
+INSERT INTO {SCHEMA}.probe_data (time, probe_uuid, reference_uuid, metric_type_uuid, value, value_num)
+SELECT sd.time, s.probe_uuid, s.reference_uuid, s.metric_type_uuid, sd.value, sd.value_num
+FROM {{chunk}} sd
+JOIN {SCHEMA}.series s ON s.series_id = sd.series_id
+"""
+
+CREATE_VIEW_SQL = f"""
+CREATE VIEW {SCHEMA}.probe_data AS
+SELECT sd.time, s.probe_uuid, s.reference_uuid, s.metric_type_uuid, sd.value, sd.value_num
+FROM {SCHEMA}.series_data sd
+JOIN {SCHEMA}.series s ON s.series_id = sd.series_id;
+"""
+
+# Writers that still insert into probe_data get the same defaults and value_num handling the table's triggers gave
+# them, with the row stored against its series in series_data. Rows that already exist are skipped, as ON CONFLICT
+# cannot be used on a view.
+INSERT_TRIGGER_SQL = f"""
+CREATE OR REPLACE FUNCTION {SCHEMA}.insert_probe_data()
+RETURNS TRIGGER AS $$
+DECLARE
+    target_series INTEGER;
+BEGIN
+    NEW.reference_uuid := COALESCE(NEW.reference_uuid, get_default_uuid_for('reference'));
+    NEW.metric_type_uuid := COALESCE(NEW.metric_type_uuid, get_default_uuid_for('metric_type'));
+
+    INSERT INTO {SCHEMA}.series (probe_uuid, reference_uuid, metric_type_uuid)
+    VALUES (NEW.probe_uuid, NEW.reference_uuid, NEW.metric_type_uuid)
+    ON CONFLICT ON CONSTRAINT uq_series_identity DO NOTHING;
+
+    SELECT s.series_id INTO target_series
+    FROM {SCHEMA}.series s
+    WHERE s.probe_uuid = NEW.probe_uuid AND s.reference_uuid = NEW.reference_uuid
+      AND s.metric_type_uuid = NEW.metric_type_uuid;
+
+    IF NEW.value_num IS NULL AND jsonb_typeof(NEW.value) = 'number' AND EXISTS (
+        SELECT 1 FROM {SCHEMA}.metric_type m
+        WHERE m.uuid = NEW.metric_type_uuid AND m.value_type IN ('float', 'int')
+    ) THEN
+        NEW.value_num := (NEW.value #>> '{{}}')::double precision;
+        NEW.value := NULL;
+    END IF;
+
+    INSERT INTO {SCHEMA}.series_data (time, series_id, value, value_num)
+    VALUES (NEW.time, target_series, NEW.value, NEW.value_num)
+    ON CONFLICT (series_id, time) DO NOTHING;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER probe_data_insert
+    INSTEAD OF INSERT ON {SCHEMA}.probe_data
+    FOR EACH ROW
+EXECUTE FUNCTION {SCHEMA}.insert_probe_data();
+"""
+
+
+def create_hypertable_like(table: str, source: str) -> None:
+    """Make table a hypertable on time, with the chunk interval source is currently using."""
+    op.execute(sa.text(f"""
+    SELECT create_hypertable('{SCHEMA}.{table}', 'time',
+        chunk_time_interval => COALESCE(({CHUNK_INTERVAL_SQL.format(schema=SCHEMA, table=source)}), INTERVAL '1 day'),
+        if_not_exists => TRUE);
+    """))
+
+
+def copy_by_chunk(source: str, statement: str) -> None:
+    """Run statement once per chunk of the source hypertable, oldest first, so each statement stays bounded."""
+    connection = op.get_bind()
+    chunks = connection.execute(sa.text(f"SELECT show_chunks('{SCHEMA}.{source}')")).scalars().all()
+    for index, chunk in enumerate(chunks, start=1):
+        moved = connection.execute(sa.text(statement.format(chunk=chunk))).rowcount
+        logger.info(f"Copied {moved} rows from {chunk} ({index}/{len(chunks)})")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'series',
+        sa.Column('series_id', sa.Integer(), sa.Identity(), primary_key=True,
+                  comment="Auto generated integer key of the series"),
+        sa.Column('probe_uuid', sa.String(36), sa.ForeignKey(f'{SCHEMA}.probe_metadata.uuid'), nullable=False,
+                  comment="Foreign key to the probe that collected the data"),
+        sa.Column('reference_uuid', sa.String(36), sa.ForeignKey(f'{SCHEMA}.reference.uuid'), nullable=False,
+                  comment="Foreign key to the reference point for the readings"),
+        sa.Column('metric_type_uuid', sa.String(36), sa.ForeignKey(f'{SCHEMA}.metric_type.uuid'), nullable=False,
+                  comment="Foreign key to the metric type being measured"),
+        sa.UniqueConstraint(*SERIES_KEY, name='uq_series_identity'),
+        schema=SCHEMA,
+    )
+    op.create_table(
+        'series_data',
+        sa.Column('time', sa.TIMESTAMP(), nullable=False, comment="Timestamp of the measurement"),
+        sa.Column('series_id', sa.Integer(), sa.ForeignKey(f'{SCHEMA}.series.series_id'), nullable=False,
+                  comment="Foreign key to the probe/reference/metric series of the reading"),
+        sa.Column('value', postgresql.JSONB(),
+                  comment="Measurement value stored as JSON, for metrics whose value type is not numeric"),
+        sa.Column('value_num', postgresql.DOUBLE_PRECISION(),
+                  comment="Measurement value for metrics with a float or int value type"),
+        sa.PrimaryKeyConstraint('series_id', 'time', name='series_data_pkey'),
+        schema=SCHEMA,
+    )
+    create_hypertable_like('series_data', 'probe_data')
+
+    op.execute(sa.text(f"""
+    INSERT INTO {SCHEMA}.series (probe_uuid, reference_uuid, metric_type_uuid)
+    SELECT DISTINCT probe_uuid, reference_uuid, metric_type_uuid
+    FROM {SCHEMA}.probe_data
+    ORDER BY probe_uuid, reference_uuid, metric_type_uuid;
+    """))
+    copy_by_chunk('probe_data', MOVE_CHUNK_SQL)
+
+    op.execute(sa.text(f"""
+    SELECT cron.unschedule(jobid) FROM cron.job WHERE jobname = 'backfill_probe_data_value_num';
+    DROP PROCEDURE IF EXISTS {SCHEMA}.backfill_probe_data_value_num;
+    DROP TABLE IF EXISTS {SCHEMA}.probe_data_value_num_backfill;
+    """))
+
+    # Dropping the table also drops its triggers; set_probe_data_defaults and split_probe_data_value are kept for the
+    # downgrade. Anything else still depending on the table makes this fail rather than being dropped with it.
+    op.drop_table('probe_data', schema=SCHEMA)
+    op.execute(sa.text(CREATE_VIEW_SQL))
+    op.execute(sa.text(INSERT_TRIGGER_SQL))
+    op.execute(f'GRANT SELECT ON {SCHEMA}.series, {SCHEMA}.series_data, {SCHEMA}.probe_data TO "grafana";')
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"""
+    DROP VIEW IF EXISTS {SCHEMA}.probe_data;
+    DROP FUNCTION IF EXISTS {SCHEMA}.insert_probe_data;
+    """))
+
+    op.create_table(
+        'probe_data',
+        sa.Column('time', sa.TIMESTAMP(), nullable=False, comment="Timestamp of the measurement"),
+        sa.Column('probe_uuid', sa.String(36), sa.ForeignKey(f'{SCHEMA}.probe_metadata.uuid'), nullable=False,
+                  comment="Foreign key to the probe that collected the data"),
+        sa.Column('reference_uuid', sa.String(36), nullable=False,
+                  comment="Foreign key to the reference point for the reading"),
+        sa.Column('metric_type_uuid', sa.String(36), nullable=False,
+                  comment="Foreign key to the metric type being measured"),
+        sa.Column('value', postgresql.JSONB(),
+                  comment="Measurement value stored as JSON, for metrics whose value type is not numeric"),
+        sa.Column('value_num', postgresql.DOUBLE_PRECISION(),
+                  comment="Measurement value for metrics with a float or int value type"),
+        sa.ForeignKeyConstraint(['reference_uuid'], [f'{SCHEMA}.reference.uuid'], name='fk_probe_data_reference_uuid'),
+        sa.ForeignKeyConstraint(['metric_type_uuid'], [f'{SCHEMA}.metric_type.uuid'],
+                                name='fk_probe_data_metric_type_uuid'),
+        sa.PrimaryKeyConstraint('time', *SERIES_KEY, name='probe_data_pkey'),
+        schema=SCHEMA,
+    )
+    create_hypertable_like('probe_data', 'series_data')
+    copy_by_chunk('series_data', RESTORE_CHUNK_SQL)
+
+    op.execute(sa.text(f"""
+    CREATE TRIGGER probe_data_set_defaults
+        BEFORE INSERT ON {SCHEMA}.probe_data
+        FOR EACH ROW
+    EXECUTE FUNCTION set_probe_data_defaults();
+
+    CREATE TRIGGER probe_data_split_value
+        BEFORE INSERT ON {SCHEMA}.probe_data
+        FOR EACH ROW
+    EXECUTE FUNCTION {SCHEMA}.split_probe_data_value();
+    """))
+
+    op.drop_table('series_data', schema=SCHEMA)
+    op.drop_table('series', schema=SCHEMA)
@@ -0,0 +1,58 @@
+"""compress series data
+
+Revision ID: 5be27d90a4c3
+Revises: 3fd6a8c2b471
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+import os
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5be27d90a4c3'
+down_revision: Union[str, None] = '3fd6a8c2b471'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+
+
+def sanitize_interval(value: str, fallback: str) -> str:
+    """
+    Validate that the input string is a safe Postgres INTERVAL.
+    Fallback to a default if not valid.
+    """
+    pattern = r"^\s*\d+\s+(second|minute|hour|day|week|month|year)s?\s*$"
+    if re.match(pattern, value.strip(), re.IGNORECASE):
+        return value.strip()
+    return fallback
+
+
+def upgrade() -> None:
+    compress_after = sanitize_interval(os.getenv("COMPRESS_AFTER", ""), "7 days")
+
+    # Segmenting by series keeps each series' readings together in a compressed chunk, so reading one series only
+    # decompresses its own segments, and ordering by time within a segment is what compresses the readings best.
+    op.execute(sa.text(f"""
+    ALTER TABLE {SCHEMA}.series_data SET (
+        timescaledb.compress,
+        timescaledb.compress_segmentby = 'series_id',
+        timescaledb.compress_orderby = 'time'
+    );
+    """))
+    op.execute(sa.text(
+        f"SELECT add_compression_policy('{SCHEMA}.series_data', compress_after => INTERVAL '{compress_after}');"
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"""
+    SELECT remove_compression_policy('{SCHEMA}.series_data', if_exists => true);
+    SELECT decompress_chunk(c, if_compressed => true) FROM show_chunks('{SCHEMA}.series_data') c;
+    ALTER TABLE {SCHEMA}.series_data SET (timescaledb.compress = false);
+    """))
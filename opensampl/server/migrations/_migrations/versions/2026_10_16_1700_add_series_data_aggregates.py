@@ -0,0 +1,100 @@
+"""add series data aggregates
+
+Revision ID: a71c0d3e9f52
+Revises: 5be27d90a4c3
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from loguru import logger
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71c0d3e9f52'
+down_revision: Union[str, None] = '5be27d90a4c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+
+# The pg_cron refreshed materialized views of 2025_01_28_2212_create_time_buckets used the same bucket sizes. Each
+# refresh policy re-materializes the buckets older than now - end_offset that have changed since its last run, and the
+# newest bucket is left to real-time aggregation. The policies have no start_offset: files are often loaded long after
+# they were recorded, and a bounded window would leave such backfills out of the aggregates for good. Only buckets with
+# new or changed rows are re-materialized, so refreshing the whole history costs no more than the backfill itself.
+time_buckets = [
+    #suffix   interval      end_offset    schedule_interval
+    ('1min', '1 minute', '1 minute', '1 minute'),
+    ('5min', '5 minutes', '5 minutes', '5 minutes'),
+    ('15min', '15 minutes', '15 minutes', '15 minutes'),
+    ('1hour', '1 hour', '1 hour', '30 minutes'),
+    ('6hour', '6 hours', '6 hours', '1 hour'),
+    ('1day', '1 day', '1 day', '6 hours'),
+]
+
+# Only numeric readings are stored in value_num, so filtering on it keeps every numeric metric and nothing else
+CREATE_AGGREGATE_SQL = """
+CREATE MATERIALIZED VIEW {schema}.series_data_{suffix}
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT
+    time_bucket(INTERVAL '{interval}', sd.time) AS "time",
+    sd.series_id,
+    avg(sd.value_num) AS mean,
+    min(sd.value_num) AS min,
+    max(sd.value_num) AS max,
+    count(sd.value_num) AS count,
+    first(sd.value_num, sd.time) AS first,
+    last(sd.value_num, sd.time) AS last
+FROM {schema}.series_data sd
+WHERE sd.value_num IS NOT NULL
+GROUP BY time_bucket(INTERVAL '{interval}', sd.time), sd.series_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('{schema}.series_data_{suffix}',
+    start_offset => NULL,
+    end_offset => INTERVAL '{end_offset}',
+    schedule_interval => INTERVAL '{schedule_interval}');
+
+CREATE VIEW {schema}.probe_data_{suffix} AS
+SELECT a.time, s.probe_uuid, s.reference_uuid, s.metric_type_uuid, a.mean, a.min, a.max, a.count, a.first, a.last
+FROM {schema}.series_data_{suffix} a
+JOIN {schema}.series s ON s.series_id = a.series_id;
+
+GRANT SELECT ON {schema}.series_data_{suffix}, {schema}.probe_data_{suffix} TO "grafana";
+"""
+
+
+def upgrade() -> None:
+    # The materialized views themselves were dropped by 2025_06_03_1254, but their refresh jobs were left scheduled
+    for suffix, *_ in time_buckets:
+        op.execute(sa.text(f"""
+        SELECT cron.unschedule(jobid) FROM cron.job WHERE jobname = 'refresh_{suffix}';
+        DROP MATERIALIZED VIEW IF EXISTS {SCHEMA}.avg_phase_err_{suffix} CASCADE;
+        DROP MATERIALIZED VIEW IF EXISTS {SCHEMA}.mtie_{suffix} CASCADE;
+        """))
+
+    for suffix, interval, end_offset, schedule_interval in time_buckets:
+        op.execute(sa.text(CREATE_AGGREGATE_SQL.format(
+            schema=SCHEMA, suffix=suffix, interval=interval, end_offset=end_offset, schedule_interval=schedule_interval,
+        )))
+
+    # Materialize the existing history once, so real-time aggregation only has to cover recent data. Refreshing
+    # cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for suffix, _, end_offset, _ in time_buckets:
+            logger.info(f"Materializing {SCHEMA}.series_data_{suffix}")
+            op.execute(sa.text(
+                f"CALL refresh_continuous_aggregate('{SCHEMA}.series_data_{suffix}', NULL, "
+                f"localtimestamp - INTERVAL '{end_offset}');"
+            ))
+
+
+def downgrade() -> None:
+    for suffix, *_ in reversed(time_buckets):
+        op.execute(sa.text(f"""
+        DROP VIEW IF EXISTS {SCHEMA}.probe_data_{suffix};
+        DROP MATERIALIZED VIEW IF EXISTS {SCHEMA}.series_data_{suffix};
+        """))
@@ -0,0 +1,128 @@
+"""ranged data functions
+
+Revision ID: e3b8f6a1d094
+Revises: a71c0d3e9f52
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f6a1d094'
+down_revision: Union[str, None] = 'a71c0d3e9f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+
+FILTER_FUNCTIONS = {
+    'get_probe_data_by_probe': ('probe_uuid_param TEXT', 's.probe_uuid = probe_uuid_param'),
+    'get_probe_data_by_metric': ('metric_type_uuid_param TEXT', 's.metric_type_uuid = metric_type_uuid_param'),
+    'get_probe_data_by_probe_and_metric': (
+        'probe_uuid_param TEXT, metric_type_uuid_param TEXT',
+        's.probe_uuid = probe_uuid_param AND s.metric_type_uuid = metric_type_uuid_param',
+    ),
+}
+
+
+def ranged_function_sql(name: str, params: str, where: str) -> str:
+    """
+    Build one of the time ranged data functions. Kept in step with data_function_sql in opensampl.db.orm.
+
+    Plain STABLE SQL functions are inlined into the calling query, so the planner sees the time bounds and can use the
+    series_data primary key and exclude chunks, which it cannot do through a plpgsql function.
+    """
+    return f"""
+    DROP FUNCTION IF EXISTS {name};
+    CREATE OR REPLACE FUNCTION {name}(
+        {params},
+        start_time TIMESTAMP DEFAULT NULL,
+        end_time TIMESTAMP DEFAULT NULL,
+        max_rows INTEGER DEFAULT NULL,
+        after_time TIMESTAMP DEFAULT NULL,
+        after_series_id INTEGER DEFAULT NULL,
+        bucket_width INTERVAL DEFAULT NULL
+    )
+    RETURNS TABLE(
+        "time" TIMESTAMP,
+        probe_uuid VARCHAR(36),
+        reference_uuid VARCHAR(36),
+        metric_type_uuid VARCHAR(36),
+        value JSONB,
+        value_num DOUBLE PRECISION,
+        series_id INTEGER
+    )
+    LANGUAGE sql STABLE PARALLEL SAFE
+    AS $$
+    SELECT r.* FROM (
+        SELECT sd.time AS "time", s.probe_uuid, s.reference_uuid, s.metric_type_uuid,
+            COALESCE(sd.value, to_jsonb(sd.value_num)) AS value, sd.value_num, s.series_id
+        FROM {SCHEMA}.series s
+        JOIN {SCHEMA}.series_data sd ON sd.series_id = s.series_id
+        WHERE bucket_width IS NULL AND {where}
+          AND sd.time >= COALESCE(GREATEST(start_time, after_time), '-infinity')
+          AND sd.time < COALESCE(end_time, 'infinity')
+        UNION ALL
+        SELECT date_bin(bucket_width, sd.time, TIMESTAMP '2000-01-03'), s.probe_uuid, s.reference_uuid,
+            s.metric_type_uuid, to_jsonb(avg(sd.value_num)), avg(sd.value_num), s.series_id
+        FROM {SCHEMA}.series s
+        JOIN {SCHEMA}.series_data sd ON sd.series_id = s.series_id
+        WHERE bucket_width IS NOT NULL AND {where} AND sd.value_num IS NOT NULL
+          AND sd.time >= COALESCE(GREATEST(start_time, after_time), '-infinity')
+          AND sd.time < COALESCE(end_time, 'infinity')
+        GROUP BY 1, s.series_id, s.probe_uuid, s.reference_uuid, s.metric_type_uuid
+    ) r
+    WHERE after_time IS NULL OR (r.time, r.series_id) > (after_time, COALESCE(after_series_id, 2147483647))
+    ORDER BY r.time, r.series_id
+    LIMIT max_rows
+    $$;
+    """
+
+
+def full_history_function_sql(name: str, params: str, where: str) -> str:
+    """Build the previous plpgsql version of a data function, which returns the whole history of its series."""
+    where = where.replace('s.', 'pd.')
+    return f"""
+    DROP FUNCTION IF EXISTS {name};
+    CREATE OR REPLACE FUNCTION {name}({params})
+    RETURNS TABLE(
+        "time" TIMESTAMP,
+        probe_uuid VARCHAR(36),
+        reference_uuid VARCHAR(36),
+        metric_type_uuid VARCHAR(36),
+        value JSONB,
+        value_num DOUBLE PRECISION
+    ) AS $$
+    BEGIN
+        RETURN QUERY
+        SELECT
+            pd.time,
+            pd.probe_uuid,
+            pd.reference_uuid,
+            pd.metric_type_uuid,
+            COALESCE(pd.value, to_jsonb(pd.value_num)),
+            pd.value_num
+        FROM {SCHEMA}.probe_data pd
+        WHERE {where}
+        ORDER BY pd.time;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+
+
+def upgrade() -> None:
+    # series_data's (series_id, time) primary key already serves time ranges of a series in either direction, so only
+    # the lookup of a probe's series by metric needs an index
+    op.create_index('ix_series_probe_metric', 'series', ['probe_uuid', 'metric_type_uuid'], schema=SCHEMA)
+    for name, (params, where) in FILTER_FUNCTIONS.items():
+        op.execute(sa.text(ranged_function_sql(name, params, where)))
+
+
+def downgrade() -> None:
+    for name, (params, where) in FILTER_FUNCTIONS.items():
+        op.execute(sa.text(full_history_function_sql(name, params, where)))
+    op.drop_index('ix_series_probe_metric', table_name='series', schema=SCHEMA)
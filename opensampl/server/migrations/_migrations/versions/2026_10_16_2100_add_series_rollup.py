@@ -0,0 +1,127 @@
+"""add series rollup
+
+Revision ID: 0c4d2b7e8a61
+Revises: e3b8f6a1d094
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4d2b7e8a61'
+down_revision: Union[str, None] = 'e3b8f6a1d094'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = 'castdb'
+
+# Continuous aggregates created by 2026_10_16_1700_add_series_data_aggregates
+AGGREGATES = [
+    ('series_data_1min', '1 minute'),
+    ('series_data_5min', '5 minutes'),
+    ('series_data_15min', '15 minutes'),
+    ('series_data_1hour', '1 hour'),
+    ('series_data_6hour', '6 hours'),
+    ('series_data_1day', '1 day'),
+]
+
+SOURCES = ",\n            ".join(f"('{name}', INTERVAL '{width}')" for name, width in AGGREGATES)
+
+# Picks the coarsest aggregate whose buckets are still no wider than the bucket width the point budget needs, and
+# widens the buckets to a whole number of that aggregate's buckets so they are never split. Windows too narrow for
+# the 1 minute aggregate read series_data itself.
+ROLLUP_SOURCE_SQL = f"""
+CREATE OR REPLACE FUNCTION {SCHEMA}.rollup_source(
+    from_time TIMESTAMP,
+    to_time TIMESTAMP,
+    max_points INTEGER DEFAULT 1000,
+    min_width INTERVAL DEFAULT NULL
+)
+RETURNS TABLE(source TEXT, source_width INTERVAL, bucket_width INTERVAL)
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    WITH wanted AS (
+        SELECT GREATEST((to_time - from_time) / GREATEST(max_points, 1), min_width, INTERVAL '1 second') AS width
+    ),
+    sources(source, width) AS (
+        VALUES
+            {SOURCES}
+    )
+    SELECT
+        COALESCE(s.source, 'series_data'),
+        s.width,
+        CASE
+            WHEN s.width IS NULL THEN w.width
+            ELSE s.width * ceil(extract(epoch FROM w.width) / extract(epoch FROM s.width))
+        END
+    FROM wanted w
+    LEFT JOIN LATERAL (
+        SELECT sources.source, sources.width FROM sources WHERE sources.width <= w.width ORDER BY sources.width DESC LIMIT 1
+    ) s ON true
+$$;
+"""
+
+# Buckets are re-aggregated from the chosen source: means are weighted by their counts, so they match averaging the
+# raw readings. The aggregate buckets that start before from_time are included whole.
+SERIES_ROLLUP_SQL = f"""
+CREATE OR REPLACE FUNCTION {SCHEMA}.series_rollup(
+    series INTEGER,
+    from_time TIMESTAMP,
+    to_time TIMESTAMP,
+    max_points INTEGER DEFAULT 1000,
+    min_width INTERVAL DEFAULT NULL
+)
+RETURNS TABLE(
+    "time" TIMESTAMP,
+    mean DOUBLE PRECISION,
+    min DOUBLE PRECISION,
+    max DOUBLE PRECISION,
+    count BIGINT,
+    first DOUBLE PRECISION,
+    last DOUBLE PRECISION
+)
+LANGUAGE plpgsql STABLE PARALLEL SAFE
+AS $$
+DECLARE
+    chosen RECORD;
+BEGIN
+    SELECT * INTO chosen FROM {SCHEMA}.rollup_source(from_time, to_time, max_points, min_width);
+
+    IF chosen.source = 'series_data' THEN
+        RETURN QUERY EXECUTE '
+            SELECT time_bucket($4, sd.time) AS bucket, avg(sd.value_num), min(sd.value_num), max(sd.value_num),
+                count(sd.value_num), first(sd.value_num, sd.time), last(sd.value_num, sd.time)
+            FROM {SCHEMA}.series_data sd
+            WHERE sd.series_id = $1 AND sd.time >= $2 AND sd.time < $3 AND sd.value_num IS NOT NULL
+            GROUP BY bucket
+            ORDER BY bucket'
+        USING series, from_time, to_time, chosen.bucket_width;
+    ELSE
+        RETURN QUERY EXECUTE format('
+            SELECT time_bucket($4, a.time) AS bucket, sum(a.mean * a.count) / sum(a.count)::double precision,
+                min(a.min), max(a.max), sum(a.count)::bigint, first(a.first, a.time), last(a.last, a.time)
+            FROM {SCHEMA}.%I a
+            WHERE a.series_id = $1 AND a.time >= time_bucket($5, $2) AND a.time < $3
+            GROUP BY bucket
+            ORDER BY bucket', chosen.source)
+        USING series, from_time, to_time, chosen.bucket_width, chosen.source_width;
+    END IF;
+END;
+$$;
+"""
+
+
+def upgrade() -> None:
+    op.execute(sa.text(ROLLUP_SOURCE_SQL))
+    op.execute(sa.text(SERIES_ROLLUP_SQL))
+
+
+def downgrade() -> None:
+    op.execute(sa.text(f"""
+    DROP FUNCTION IF EXISTS {SCHEMA}.series_rollup;
+    DROP FUNCTION IF EXISTS {SCHEMA}.rollup_source;
+    """))
@@ -1,22 +1,24 @@
 """ADVA clock implementation"""
 
-import gzip
 import random
 import re
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import ClassVar, TextIO
+from typing import BinaryIO, ClassVar
 
 import click
 import pandas as pd
 from loguru import logger
 from pydantic import Field
 
+from opensampl.load.series import SeriesBatch
 from opensampl.metrics import METRICS
 from opensampl.mixins.random_data import RandomDataMixin
 from opensampl.references import REF_TYPES
 from opensampl.vendors.base_probe import BaseProbe
 from opensampl.vendors.constants import VENDORS, ProbeKey
+from opensampl.vendors.header import CommentedHeader, open_binary
 
 
 class AdvaProbe(BaseProbe, RandomDataMixin):
@@ -24,6 +26,7 @@ class AdvaProbe(BaseProbe, RandomDataMixin):
 
     timestamp: datetime
     start_time: datetime
+    headers: dict
     vendor = VENDORS.ADVA
 
     file_pattern: ClassVar = re.compile(
@@ -33,6 +36,24 @@ class AdvaProbe(BaseProbe, RandomDataMixin):
         r"(?P<hour>\d+)-(?P<minute>\d+)-(?P<second>\d+)\.txt(?:\.gz)?"
     )
 
+    header_to_column: ClassVar[dict[str, str]] = {
+        "Adva Direction": "adva_direction",
+        "Adva MTIE Mask": "adva_mtie_mask",
+        "Adva Mask Margin": "adva_mask_margin",
+        "Adva Probe": "adva_probe",
+        "Adva Reference": "adva_reference",
+        "Adva Reference Expected QL": "adva_reference_expected_ql",
+        "Adva Source": "adva_source",
+        "Adva Status": "adva_status",
+        "Adva Version": "adva_version",
+        "Frequency": "frequency",
+        "Multiplier": "multiplier",
+        "Start": "start",
+        "TimeMultiplier": "timemultiplier",
+        "Title": "title",
+        "Type": "type",
+    }
+
     class RandomDataConfig(RandomDataMixin.RandomDataConfig):
         """Model for storing random data generation configurations as provided by CLI or YAML"""
 
@@ -69,9 +90,16 @@ class AdvaProbe(BaseProbe, RandomDataMixin):
         self.probe_key, self.timestamp = self.parse_file_name(self.input_file)
 
     @classmethod
-    def filter_files(cls, files: list[Path]) -> list[Path]:
+    def filter_files(cls, files: Iterable[Path]) -> Iterable[Path]:
         """Filter the files found in the input directory when loading to those which match the regex"""
-        return [f for f in files if cls.file_pattern.fullmatch(f.name)]
+        return (f for f in files if cls.file_pattern.fullmatch(f.name))
+
+    @classmethod
+    def file_timestamp(cls, path: Path) -> datetime | None:
+        """Return the collection time in the file name, or None if it does not match the ADVA naming convention"""
+        if not cls.file_pattern.fullmatch(path.name):
+            return None
+        return cls.parse_file_name(path)[1]
 
     @classmethod
     def parse_file_name(cls, file_name: Path) -> tuple[ProbeKey, datetime]:
@@ -95,73 +123,63 @@ class AdvaProbe(BaseProbe, RandomDataMixin):
             return ProbeKey(probe_id=probe_id, ip_address=ip_address), timestamp
         raise ValueError(f"Could not parse file name {file_name} into probe key and timestamp for ADVA probe")
 
-    def _open_file(self) -> TextIO | gzip.GzipFile:
-        """Open the input file, handling both .txt and .txt.gz formats"""
-        if self.input_file.name.endswith(".gz"):
-            return gzip.open(self.input_file, "rt")
-        return self.input_file.open()
-
-    def process_time_data(self) -> None:
-        """Process time data from ADVA probe files"""
-        compression = "gzip" if self.input_file.name.endswith(".gz") else None
-
-        df = pd.read_csv(
-            self.input_file,
-            compression=compression,
-            header=None,
-            comment="#",
-            names=["time", "value"],
-            dtype={"time": "float64", "value": "float64"},
-            engine="python",
-            sep=r",\s*",
-        )
-        if not self.metadata_parsed:
-            # need to get the probe's start time from the metadata if we do not already have it
-            self.process_metadata()
-
-        base_time = pd.Timestamp(self.start_time)
-        offsets = pd.to_timedelta(df["time"], unit="s")
-        df["time"] = base_time + offsets
+    def _open_file(self) -> BinaryIO:
+        """Open the input file for buffered binary reading, handling both .txt and .txt.gz formats"""
+        return open_binary(self.input_file)
 
-        df["value_str"] = df["value"].apply(lambda x: f"{x:.10e}")
+    def _read_header(self, f: BinaryIO) -> None:
+        """Parse the leading '#' lines of f into self.headers, leaving f positioned at the first reading"""
+        self._file_header = CommentedHeader.from_stream(self.input_file, f)
+        self._parse_header()
 
-        self.send_time_data(data=df, reference_type=REF_TYPES.GNSS)
-
-    def process_metadata(self) -> dict:
-        """Process metadata from ADVA probe files"""
-        header_to_column = {
-            "Adva Direction": "adva_direction",
-            "Adva MTIE Mask": "adva_mtie_mask",
-            "Adva Mask Margin": "adva_mask_margin",
-            "Adva Probe": "adva_probe",
-            "Adva Reference": "adva_reference",
-            "Adva Reference Expected QL": "adva_reference_expected_ql",
-            "Adva Source": "adva_source",
-            "Adva Status": "adva_status",
-            "Adva Version": "adva_version",
-            "Frequency": "frequency",
-            "Multiplier": "multiplier",
-            "Start": "start",
-            "TimeMultiplier": "timemultiplier",
-            "Title": "title",
-            "Type": "type",
-        }
+    def _parse_header(self) -> None:
+        """Parse the "Key: Value" lines of the file header into self.headers"""
         headers = {}
         freeform_header = {}
-        with self._open_file() as f:
-            for line in f:
-                if not line.startswith("#"):
-                    break
-                header = line.lstrip("#").strip()
-                key, value = header.split(": ")
-                if key in header_to_column:
-                    headers[header_to_column.get(key)] = value
-                else:
-                    freeform_header[key] = value
+        for line in self.file_header.lines:
+            header = line.lstrip("#").strip()
+            key, value = header.split(": ", maxsplit=1)
+            if key in self.header_to_column:
+                headers[self.header_to_column[key]] = value
+            else:
+                freeform_header[key] = value
         headers["additional_metadata"] = freeform_header
         self.start_time = datetime.strptime(headers["start"], "%Y/%m/%d %H:%M:%S").astimezone(tz=timezone.utc)
+        self.headers = headers
         self.metadata_parsed = True
-        return headers
+
+    def parse_time_data(self) -> Iterator[SeriesBatch]:
+        """
+        Parse the phase offset readings from ADVA probe files
+
+        The header and the readings are read in a single pass over the file, and the header is kept for
+        process_metadata.
+        """
+        with self._open_file() as f:
+            self._read_header(f)
+            df = pd.read_csv(
+                f,
+                header=None,
+                comment="#",
+                names=["time", "value"],
+                dtype={"time": "float64", "value": "float64"},
+                engine="c",
+                sep=",",
+                skipinitialspace=True,
+            )
+
+        df["time"] = pd.Timestamp(self.start_time) + pd.to_timedelta(df["time"], unit="s")
+        yield SeriesBatch(probe_key=self.probe_key, metric=METRICS.PHASE_OFFSET, reference_type=REF_TYPES.GNSS, data=df)
+
+    def process_metadata(self) -> dict:
+        """
+        Process metadata from ADVA probe files
+
+        Only the header is read, unless parse_time_data has already read it.
+        """
+        if not self.metadata_parsed:
+            self._parse_header()
+        return self.headers
 
     @classmethod
     def generate_random_data(
@@ -2,38 +2,53 @@
 
 from __future__ import annotations
 
+import multiprocessing
+import os
 import shutil
+import threading
 from abc import ABC, abstractmethod
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, ClassVar, TypeVar
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, TypeVar
 
 import click
 import psycopg2.errors
 import requests
 import requests.exceptions
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.exc import IntegrityError
 from tqdm import tqdm
 
-from opensampl.load_data import load_probe_metadata, load_time_data
+from opensampl.load.cache import series_cache
+from opensampl.load.client import client_stats
+from opensampl.load.routing import pool_status
+from opensampl.load.scan import PathFilter, scan_files
+from opensampl.load.series import PackedSeries, SeriesBatch, chunk_series
+from opensampl.load.timestamps import normalize_series_times
+from opensampl.load_data import load_probe_metadata, load_time_data_batch
 from opensampl.metrics import METRICS, MetricType
+from opensampl.vendors.constants import ProbeKey  # noqa: TC001 needed at runtime by the ParsedFile model
+from opensampl.vendors.header import CommentedHeader
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Generator, Iterable, Iterator
 
     import pandas as pd
 
+    from opensampl.load.timestamps import epoch_units
     from opensampl.references import ReferenceType
-    from opensampl.vendors.constants import ProbeKey, VendorType
+    from opensampl.vendors.constants import VendorType
 
 T = TypeVar("T")
 F = TypeVar("F", bound=Callable[..., Any])
 
+# Keys of the time data tables. Violating one of these is the only conflict that means a file was already loaded.
+ALREADY_LOADED_CONSTRAINTS = frozenset({"series_data_pkey", "probe_data_pkey"})
+
 
 class dualmethod:  # noqa: N801
     """
@@ -125,6 +140,126 @@ def dummy_tqdm(*args: list, **kwargs: dict) -> Generator:
     yield DummyTqdm(*args, **kwargs)
 
 
+def _load_series(series: list[SeriesBatch]) -> None:
+    load_time_data_batch(series=series)
+
+
+def run_series_pipeline(
+    series: Iterable[SeriesBatch],
+    chunk_size: int | None = None,
+    max_pending: int = 2,
+    load: Callable[[list[SeriesBatch]], Any] | None = None,
+) -> int:
+    """
+    Load series as they are produced, with parsing and loading running side by side.
+
+    With a chunk size, series are grouped into loads of at most chunk_size rows which run on a background thread, in
+    order. At most max_pending loads are queued or running at once; the parser blocks until one finishes, so no more
+    than about (max_pending + 1) * chunk_size rows are held however large the input is. Without a chunk size, every
+    series is loaded at once, in one transaction, after parsing finishes.
+
+    Args:
+        series: SeriesBatch objects, typically a vendor's parse_time_data generator.
+        chunk_size: Maximum rows per load. If None, everything is loaded at once.
+        max_pending: Maximum loads queued or in progress while parsing continues.
+        load: Called with each group of series to load. Defaults to load_time_data_batch.
+
+    Returns:
+        Number of loads made.
+
+    """
+    load = load or _load_series
+    if not chunk_size:
+        batches = list(series)
+        if not batches:
+            return 0
+        load(batches)
+        return 1
+
+    slots = threading.BoundedSemaphore(max_pending)
+    futures = []
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="series-load") as executor:
+        for group in chunk_series(series, chunk_size):
+            slots.acquire()
+            # Stop parsing as soon as a load has failed, rather than at the end of the input
+            for future in futures:
+                if future.done():
+                    future.result()
+            future = executor.submit(load, group)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        for future in futures:
+            future.result()
+    return len(futures)
+
+
+def _conflict_constraint(error: requests.exceptions.HTTPError | IntegrityError) -> str | None:
+    """Return the name of the unique constraint a load violated, or None if it failed for another reason."""
+    if isinstance(error, IntegrityError):
+        if not isinstance(error.orig, psycopg2.errors.UniqueViolation):  # ty: ignore[unresolved-attribute]
+            return None
+        return getattr(error.orig.diag, "constraint_name", None)
+    if error.response is None or error.response.status_code != 409:
+        return None
+    try:
+        return error.response.json().get("constraint")
+    except ValueError:
+        return None
+
+
+@contextmanager
+def skip_if_already_loaded(filepath: Path, kind: str) -> Generator[None]:
+    """
+    Log and carry on when loading kind from filepath fails because its time data was already loaded.
+
+    Only a conflict on the key of the time data tables means that. Any other unique violation, such as two loaders
+    racing to create the same row, is raised so that the file is not archived without its data.
+    """
+    try:
+        yield
+    except (requests.exceptions.HTTPError, IntegrityError) as e:
+        if _conflict_constraint(e) not in ALREADY_LOADED_CONSTRAINTS:
+            raise
+        logger.warning(
+            f"{filepath} violates unique constraint for {kind}, implying already loaded. "
+            f"Will move to archive if archiving is enabled."
+        )
+
+
+def default_parse_workers() -> int:
+    """Return the number of parser processes to use: one per CPU, less one left for the loader threads."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+class ParsedFile(BaseModel):
+    """
+    A probe file parsed in a worker process, ready to be loaded by the parent process
+
+    Attributes:
+        filepath: The file that was parsed.
+        probe_key: The probe the file belongs to.
+        metadata: Result of process_metadata, if metadata was requested.
+        series: Result of parse_time_data, packed into one frame, if time data was requested.
+
+    """
+
+    filepath: Path
+    probe_key: ProbeKey | None
+    metadata: dict | None = None
+    series: PackedSeries | None = None
+
+
+def parse_probe_file(
+    probe_class: type[BaseProbe], filepath: Path, metadata: bool, time_data: bool, kwargs: dict
+) -> ParsedFile:
+    """Parse, without loading, one file with probe_class. Runs in the worker processes of --executor process."""
+    probe = probe_class(input_file=filepath, **kwargs)
+    # Time data first, so parsers that read the header along with the data do not open the file twice
+    series = PackedSeries.pack(list(probe.normalize_times(probe.parse_time_data()))) if time_data else None
+    parsed_metadata = probe.process_metadata() if metadata else None
+    return ParsedFile(filepath=filepath, probe_key=probe.probe_key, metadata=parsed_metadata, series=series)
+
+
 class LoadConfig(BaseModel):
     """Model for storing probe loading configurations as provided by CLI"""
 
@@ -136,12 +271,21 @@ class LoadConfig(BaseModel):
     max_workers: int = 4
     chunk_size: int | None = None
     show_progress: bool = False
+    executor: Literal["thread", "process"] = "thread"
+    parse_workers: int | None = None
+    recursive: bool = False
+    include: list[str] = Field(default_factory=list)
+    exclude: list[str] = Field(default_factory=list)
 
 
 class BaseProbe(ABC):
     """BaseProbe abstract object"""
 
     vendor: ClassVar[VendorType]
+    # How parse_time_data writes times that are not already datetimes: a strftime format (or ISO8601), or the unit of
+    # epoch times. Left as None, the format is detected from a sample of each series.
+    time_format: ClassVar[str | None] = None
+    time_unit: ClassVar[epoch_units | None] = None
 
     def __init__(
         self,
@@ -157,6 +301,14 @@ class BaseProbe(ABC):
         self.metadata: dict = {} | kwargs
 
         self.metadata_parsed: bool = False
+        self._file_header: CommentedHeader | None = None
+
+    @property
+    def file_header(self) -> CommentedHeader:
+        """The '#' commented header of input_file, read the first time it is needed and kept for the probe's life"""
+        if self._file_header is None:
+            self._file_header = CommentedHeader.read(self.input_file)
+        return self._file_header
 
     @classmethod
     def help_str(cls) -> str:
@@ -202,6 +354,38 @@ class BaseProbe(ABC):
                 default=4,
                 help="Maximum number of worker threads when processing directories",
             ),
+            click.option(
+                "--executor",
+                "-e",
+                type=click.Choice(["thread", "process"]),
+                default="thread",
+                help="Parse the files of a directory in worker threads, or in worker processes with results loaded "
+                "by --max-workers threads. default: thread",
+            ),
+            click.option(
+                "--parse-workers",
+                type=int,
+                required=False,
+                help="Number of worker processes parsing files with --executor process. default: CPU count - 1",
+            ),
+            click.option(
+                "--recursive",
+                "-r",
+                is_flag=True,
+                help="Also load the files in subdirectories when given a directory",
+            ),
+            click.option(
+                "--include",
+                multiple=True,
+                help="Only load files whose name or relative path matches this glob, or regular expression when "
+                "prefixed with 're:'. Can be given more than once.",
+            ),
+            click.option(
+                "--exclude",
+                multiple=True,
+                help="Skip files whose name or relative path matches this glob, or regular expression when prefixed "
+                "with 're:'. Can be given more than once.",
+            ),
             click.option(
                 "--chunk-size",
                 "-c",
@@ -224,7 +408,7 @@ class BaseProbe(ABC):
         ]
 
     @classmethod
-    def process_single_file(  # noqa: PLR0912, C901
+    def process_single_file(
         cls,
         filepath: Path,
         metadata: bool,
@@ -238,47 +422,17 @@ class BaseProbe(ABC):
         """Process a single file with the given options."""
         try:
             probe = cls(input_file=filepath, chunk_size=chunk_size, **kwargs)
-            try:
-                if metadata:
+            if metadata:
+                with skip_if_already_loaded(filepath, "metadata"):
                     logger.debug(f"Loading {cls.__name__} metadata from {filepath}")
                     probe.send_metadata()
                     logger.debug(f"Metadata loading complete for {filepath}")
-            except requests.exceptions.HTTPError as e:
-                resp = e.response
-                if resp is None:
-                    raise
-                status_code = resp.status_code
-                if status_code == 409:
-                    logger.warning(
-                        f"{filepath} violates unique constraint for metadata, implying already loaded.  "
-                        f"Will move to archive if archiving is enabled"
-                    )
-                else:
-                    raise
 
-            try:
-                if time_data:
+            if time_data:
+                with skip_if_already_loaded(filepath, "time data"):
                     logger.debug(f"Loading {cls.__name__} time series data from {filepath}")
                     probe.process_time_data()
                     logger.debug(f"Time series data loading complete for {filepath}")
-            except requests.exceptions.HTTPError as e:
-                resp = e.response
-                if resp is None:
-                    raise
-                status_code = resp.status_code
-                if status_code == 409:
-                    logger.warning(
-                        f"{filepath} violates unique constraint for time data, implying already loaded. "
-                        f"Will move to archive if archiving is enabled."
-                    )
-                else:
-                    raise
-            except IntegrityError as e:
-                if isinstance(e.orig, psycopg2.errors.UniqueViolation):  # ty: ignore[unresolved-attribute]
-                    logger.warning(
-                        f"{filepath} violates unique constraint for time data, implying already loaded. "
-                        f"Will move to archive if archiving is enabled."
-                    )
 
             if not no_archive:
                 probe.archive_file(archive_dir)
@@ -297,10 +451,14 @@ class BaseProbe(ABC):
         Puts the file in the archive directory, with year/month/vendor/ipaddress_id hierarchy based on
         date that the file was processed.
         """
+        self._archive(self.input_file, self.probe_key, archive_dir)
+
+    @classmethod
+    def _archive(cls, filepath: Path, probe_key: ProbeKey, archive_dir: Path) -> None:
         now = datetime.now(tz=timezone.utc)
-        archive_path = archive_dir / str(now.year) / f"{now.month:02d}" / self.vendor.name / str(self.probe_key)
+        archive_path = archive_dir / str(now.year) / f"{now.month:02d}" / cls.vendor.name / str(probe_key)
         archive_path.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(self.input_file), str(archive_path / self.input_file.name))
+        shutil.move(str(filepath), str(archive_path / filepath.name))
 
     @classmethod
     def get_cli_command(cls) -> Callable:
@@ -359,6 +517,11 @@ class BaseProbe(ABC):
             max_workers=kwargs.pop("max_workers", 4),
             chunk_size=kwargs.pop("chunk_size", None),
             show_progress=kwargs.pop("show_progress", False),
+            executor=kwargs.pop("executor", "thread"),
+            parse_workers=kwargs.pop("parse_workers", None),
+            recursive=kwargs.pop("recursive", False),
+            include=list(kwargs.pop("include", None) or []),
+            exclude=list(kwargs.pop("exclude", None) or []),
         )
 
         if not config.metadata and not config.time_data:
@@ -403,14 +566,36 @@ class BaseProbe(ABC):
         )
 
     @classmethod
-    def filter_files(cls, files: list[Path]) -> list[Path]:
+    def filter_files(cls, files: Iterable[Path]) -> Iterable[Path]:
         """Filter the files found in the input directory when loading this vendor's data files"""
         return files
 
+    @classmethod
+    def file_timestamp(cls, path: Path) -> datetime | None:  # noqa: ARG003
+        """
+        Return the time a data file was written, if the vendor's file names carry one.
+
+        Vendors that implement this have each directory's files loaded oldest first.
+        """
+        return None
+
+    @classmethod
+    def _scan_directory(cls, config: LoadConfig) -> Iterable[Path]:
+        """Stream the files of config.filepath this vendor should load, without listing the directory up front."""
+        sort_key = cls.file_timestamp if cls.file_timestamp.__func__ is not BaseProbe.file_timestamp.__func__ else None
+        files = scan_files(
+            config.filepath,
+            recursive=config.recursive,
+            path_filter=PathFilter(config.include, config.exclude),
+            skip=[] if config.no_archive else [config.archive_dir],
+            sort_key=sort_key,
+        )
+        return cls.filter_files(files)
+
     @classmethod
     def _process_directory(cls, config: LoadConfig, extra_kwargs: dict) -> None:
         """
-        Process all files in a directory using a thread pool and optional progress bar.
+        Process all files in a directory using a thread or process pool and optional progress bar.
 
         Args:
         ----
@@ -422,33 +607,143 @@ class BaseProbe(ABC):
             Logs and continues on individual thread exceptions, but does not raise
 
         """
-        files = [x for x in config.filepath.iterdir() if x.is_file()]
-        files = cls.filter_files(files)
-        logger.info(f"Found {len(files)} files in directory {config.filepath}")
+        files = cls._scan_directory(config)
         progress_context = tqdm if config.show_progress else dummy_tqdm
 
-        with progress_context(total=len(files), desc=f"Processing {config.filepath.name}") as pbar:  # noqa: SIM117
-            with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
-                futures = [
-                    executor.submit(
-                        cls.process_single_file,
-                        file,
-                        config.metadata,
-                        config.time_data,
-                        config.archive_dir,
-                        config.no_archive,
-                        config.chunk_size,
-                        pbar=pbar,
-                        **extra_kwargs,
+        if config.executor == "process" and config.time_data and cls.parse_time_data is BaseProbe.parse_time_data:
+            logger.warning(f"{cls.__name__} does not implement parse_time_data, parsing files in threads instead")
+            config = config.model_copy(update={"executor": "thread"})
+
+        # The number of files is not known until the scan finishes, so the progress bar only counts up
+        with progress_context(total=None, desc=f"Processing {config.filepath.name}") as pbar:
+            if config.executor == "process":
+                count = cls._process_files_in_processes(files, config, extra_kwargs, pbar)
+            else:
+                count = cls._process_files_in_threads(files, config, extra_kwargs, pbar)
+        logger.info(f"Processed {count} files in directory {config.filepath}")
+
+        pool = pool_status()
+        if pool:
+            logger.debug(f"Database connection pool after processing {config.filepath}: {pool}")
+            logger.debug(f"Series cache after processing {config.filepath}: {series_cache.stats()}")
+        backend_latency = client_stats()
+        if backend_latency:
+            logger.debug(f"Backend request latency after processing {config.filepath}: {backend_latency}")
+
+    @classmethod
+    def _process_files_in_threads(
+        cls, files: Iterable[Path], config: LoadConfig, extra_kwargs: dict, pbar: tqdm | DummyTqdm
+    ) -> int:
+        """
+        Parse and load each file in a pool of config.max_workers threads.
+
+        Files are taken from the iterable as workers free up, so only a few are queued at a time however many there are.
+
+        Returns:
+            Number of files submitted.
+
+        """
+        submitted = 0
+        running: dict[Future, Path] = {}
+        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
+            for file in files:
+                if len(running) >= 2 * config.max_workers:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        cls._log_thread_error(future, running.pop(future))
+                future = executor.submit(
+                    cls.process_single_file,
+                    file,
+                    config.metadata,
+                    config.time_data,
+                    config.archive_dir,
+                    config.no_archive,
+                    config.chunk_size,
+                    pbar=pbar,
+                    **extra_kwargs,
+                )
+                running[future] = file
+                submitted += 1
+
+            for future, file in running.items():
+                cls._log_thread_error(future, file)
+        return submitted
+
+    @staticmethod
+    def _log_thread_error(future: Future, file: Path) -> None:
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Error in thread processing {file}: {e!s}")
+
+    @classmethod
+    def _process_files_in_processes(
+        cls, files: Iterable[Path], config: LoadConfig, extra_kwargs: dict, pbar: tqdm | DummyTqdm
+    ) -> int:
+        """
+        Parse files in a pool of worker processes and load the results in a pool of config.max_workers threads.
+
+        Parsing is CPU bound and holds the GIL, so it only scales across processes; loading waits on the database or
+        backend and shares the process-wide connection pool from threads. Files are handed out as workers free up,
+        with a bounded number parsed ahead of the loaders, so parsed files never pile up in memory.
+
+        Returns:
+            Number of files submitted.
+
+        """
+        parse_workers = config.parse_workers or default_parse_workers()
+        in_flight = parse_workers + 2 * config.max_workers
+        logger.info(f"Parsing in {parse_workers} processes, loading in {config.max_workers} threads")
+
+        remaining = iter(files)
+        submitted = 0
+        parsing: dict[Future, Path] = {}
+        loading: dict[Future, Path] = {}
+        # spawn rather than fork, so workers do not inherit the loader threads' connections and locks
+        with (
+            ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")) as parsers,
+            ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix="file-load") as loaders,
+        ):
+            while True:
+                while len(parsing) + len(loading) < in_flight and (file := next(remaining, None)):
+                    future = parsers.submit(
+                        parse_probe_file, cls, file, config.metadata, config.time_data, extra_kwargs
                     )
-                    for file in files
-                ]
+                    parsing[future] = file
+                    submitted += 1
+                if not parsing and not loading:
+                    break
+
+                done, _ = wait([*parsing, *loading], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        file = parsing.pop(future)
+                        try:
+                            parsed = future.result()
+                        except Exception as e:
+                            logger.error(f"Error parsing file {file}: {e!s}")
+                            continue
+                        loading[loaders.submit(cls._load_parsed_file, parsed, config, pbar)] = file
+                    else:
+                        file = loading.pop(future)
+                        try:
+                            future.result()
+                        except Exception as e:
+                            logger.error(f"Error loading file {file}: {e!s}")
+        return submitted
 
-                for future in futures:
-                    try:
-                        future.result()
-                    except Exception as e:  # noqa: PERF203
-                        logger.error(f"Error in thread: {e!s}")
+    @classmethod
+    def _load_parsed_file(cls, parsed: ParsedFile, config: LoadConfig, pbar: tqdm | DummyTqdm) -> None:
+        """Load the metadata and time data of a file parsed by parse_probe_file, then archive it."""
+        if parsed.metadata is not None:
+            with skip_if_already_loaded(parsed.filepath, "metadata"):
+                cls._send_metadata_to_db(parsed.probe_key, parsed.metadata)
+        if parsed.series is not None:
+            with skip_if_already_loaded(parsed.filepath, "time data"):
+                run_series_pipeline(parsed.series.unpack(), chunk_size=config.chunk_size)
+        if not config.no_archive:
+            cls._archive(parsed.filepath, parsed.probe_key, config.archive_dir)
+        pbar.update(1)
 
     @property
     def probe_id(self):
@@ -460,18 +755,28 @@ class BaseProbe(ABC):
         """Return ip_address of probe"""
         return self.probe_key.ip_address
 
-    @abstractmethod
     def process_time_data(self) -> None:
         """
         Parse and load time series data from self.input_file.
 
-        Use either send_time_data (which prefills METRICS.PHASE_OFFSET)
-        or send_data and provide alternative METRICS type.
-        Both require a df as follows:
-            pd.DataFrame with columns:
-                - time (datetime64[ns]): timestamp for each measurement
-                - value (float64): measured value at each timestamp
+        Feeds parse_time_data through run_series_pipeline, so data is loaded while the rest of the file is parsed.
         """
+        run_series_pipeline(self.normalize_times(self.parse_time_data()), chunk_size=self.chunk_size)
+
+    @abstractmethod
+    def parse_time_data(self) -> Iterator[SeriesBatch]:
+        """
+        Parse time series data from self.input_file, yielding a SeriesBatch per block of readings.
+
+        A series may be yielded in several blocks. Each batch's data is a pd.DataFrame with columns:
+            - time (datetime64[ns]): timestamp for each measurement
+            - value (float64): measured value at each timestamp
+        """
+
+    @classmethod
+    def normalize_times(cls, series: Iterable[SeriesBatch]) -> Iterator[SeriesBatch]:
+        """Convert the times of each series to UTC datetimes as they are consumed, using time_format or time_unit"""
+        return normalize_series_times(series, time_format=cls.time_format, unit=cls.time_unit)
 
     @dualmethod
     def send_data(
@@ -489,24 +794,27 @@ class BaseProbe(ABC):
         if probe_key is None:
             raise ValueError("send data must be called with probe_key if used as class method")
 
-        if hasattr(self, "chunk_size") and self.chunk_size:
-            for chunk_start in range(0, len(data), self.chunk_size):
-                chunk = data.iloc[chunk_start : chunk_start + self.chunk_size]
-                load_time_data(
+        self.send_batch(
+            [
+                SeriesBatch(
                     probe_key=probe_key,
-                    metric_type=metric,
+                    metric=metric,
                     reference_type=reference_type,
-                    data=chunk,
-                    compound_key=compound_reference,
+                    compound_reference=compound_reference,
+                    data=data,
                 )
-        else:
-            load_time_data(
-                probe_key=probe_key,
-                metric_type=metric,
-                reference_type=reference_type,
-                data=data,
-                compound_key=compound_reference,
-            )
+            ]
+        )
+
+    @dualmethod
+    def send_batch(self, series: list[SeriesBatch]) -> None:
+        """
+        Ingests data for many series into the database, in one transaction per chunk
+
+        Series are grouped so each load carries at most chunk_size rows when a chunk size is set, otherwise every
+        series is loaded at once.
+        """
+        run_series_pipeline(self.normalize_times(series), chunk_size=getattr(self, "chunk_size", None))
 
     def send_time_data(
         self, data: pd.DataFrame, reference_type: ReferenceType, compound_reference: dict[str, Any] | None = None
@@ -0,0 +1,78 @@
+"""Reader for the '#' commented header at the top of vendor data files."""
+
+from __future__ import annotations
+
+import gzip
+from contextlib import contextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+import pandas as pd
+import yaml
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+COMMENT = b"#"
+
+
+def open_binary(path: Path) -> BinaryIO:
+    """Open path for buffered binary reading, decompressing it if it ends in .gz"""
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return path.open("rb")
+
+
+class CommentedHeader:
+    """
+    The leading '#' lines of a vendor data file, and the byte offset where the data after them starts
+
+    Vendors that write a YAML header with each line prefixed by "# " read it through fields. The data can then be read
+    from the offset, so the CSV engine neither rereads nor rescans the header.
+    """
+
+    def __init__(self, path: Path, lines: list[str], data_offset: int):
+        """
+        Initialize a header that has already been read.
+
+        Args:
+            path: The file the header was read from.
+            lines: The header lines, decoded, including their leading '#'.
+            data_offset: Offset in the (decompressed) file of the first byte after the header.
+
+        """
+        self.path = path
+        self.lines = lines
+        self.data_offset = data_offset
+
+    @classmethod
+    def from_stream(cls, path: Path, f: BinaryIO) -> CommentedHeader:
+        """Read the header from the start of f, which is left positioned at the first byte after it."""
+        lines = []
+        while f.peek(1)[:1] == COMMENT:
+            lines.append(f.readline().decode())
+        return cls(path, lines, f.tell())
+
+    @classmethod
+    def read(cls, path: Path) -> CommentedHeader:
+        """Read just the header of path."""
+        with open_binary(path) as f:
+            return cls.from_stream(path, f)
+
+    @cached_property
+    def fields(self) -> dict[str, Any]:
+        """The header parsed as YAML, with the "# " prefix of each line removed."""
+        return yaml.safe_load("".join(line[2:] for line in self.lines)) or {}
+
+    @contextmanager
+    def open_data(self) -> Iterator[BinaryIO]:
+        """Open the file positioned at the first byte after the header."""
+        with open_binary(self.path) as f:
+            f.seek(self.data_offset)
+            yield f
+
+    def read_csv(self, **kwargs: Any) -> pd.DataFrame:
+        """Read the data after the header with pd.read_csv, using the C engine unless another is given."""
+        with self.open_data() as f:
+            return pd.read_csv(f, **{"engine": "c"} | kwargs)
@@ -1,15 +1,16 @@
 """MicrochipTP4100 clock Parser implementation"""
 
 import random
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 from typing import ClassVar
 
 import click
 import pandas as pd
-import yaml
 from loguru import logger
 from pydantic import Field
 
+from opensampl.load.series import SeriesBatch
 from opensampl.metrics import METRICS
 from opensampl.mixins.random_data import RandomDataMixin
 from opensampl.references import REF_TYPES
@@ -69,40 +70,26 @@ class MicrochipTP4100Probe(BaseProbe, RandomDataMixin):
 
     def get_header(self) -> dict:
         """Retrieve the yaml formatted header information from the input file loaded into a dict"""
-        header_lines = []
-        with self.input_file.open() as f:
-            for line in f:
-                if line.startswith("#"):
-                    header_lines.append(line[2:])
-                else:
-                    break
-
-        header_str = "".join(header_lines)
-        return {k.strip().lower(): v for k, v in yaml.safe_load(header_str).items()}
+        return {k.strip().lower(): v for k, v in self.file_header.fields.items()}
 
     @classmethod
-    def filter_files(cls, files: list[Path]) -> list[Path]:
+    def filter_files(cls, files: Iterable[Path]) -> Iterable[Path]:
         """Filter the files found in input directory to only take .csv and .txt"""
-        return [x for x in files if any(x.name.endswith(ext) for ext in (".csv", ".txt"))]
+        return (x for x in files if any(x.name.endswith(ext) for ext in (".csv", ".txt")))
 
-    def process_time_data(self) -> None:
+    def parse_time_data(self) -> Iterator[SeriesBatch]:
         """
-        Process time series data from the input file.
+        Parse time series data from the input file.
 
-        Returns:
-            pd.DataFrame: DataFrame with columns:
+        Yields:
+            SeriesBatch for the metric named in the header, with a DataFrame with columns:
                 - time (datetime64[ns]): timestamp for each measurement
                 - value (float64): measured value at each timestamp
 
         """
         collection_method = self.header.get("method", "")
         try:
-            df = pd.read_csv(
-                self.input_file,
-                delimiter=", " if collection_method == "download_file" else ",",
-                comment="#",
-                engine="python",
-            )
+            df = self._read_data(download_file=collection_method == "download_file")
         except pd.errors.EmptyDataError as e:
             raise ValueError(f"No data in {self.input_file}") from e
 
@@ -116,15 +103,8 @@ class MicrochipTP4100Probe(BaseProbe, RandomDataMixin):
             logger.warning(f"Metric type {header_metric} not configured for MicrochipTWST; skipping upload")
             return
 
-        if len(df.columns) < 2:
-            raise ValueError("Expected at at least 2 columns in the CSV")
-        df.columns = ["time", "value", *df.columns[2:]]
-
         if "(ns)" in header_metric:
-            df["value"] = df["value"].apply(lambda x: float(x) / 1e9)
-
-        if collection_method == "download_file":
-            df["time"] = pd.to_datetime(df["time"], format="%Y-%m-%d,%H:%M:%S", utc=True)
+            df["value"] = df["value"].to_numpy(dtype="float64") / 1e9
 
         header_ref = self.header.get("reference").upper()
         reference = self.REFERENCES.get(header_ref, None)
@@ -134,7 +114,35 @@ class MicrochipTP4100Probe(BaseProbe, RandomDataMixin):
             )
             reference = REF_TYPES.UNKNOWN
 
-        self.send_data(data=df, metric=metric, reference_type=reference)
+        yield SeriesBatch(probe_key=self.probe_key, metric=metric, reference_type=reference, data=df)
+
+    def _read_data(self, download_file: bool) -> pd.DataFrame:
+        """
+        Read the time and value columns that follow the header, with the C CSV engine.
+
+        Files saved with download_file separate fields with ", " and write times as "%Y-%m-%d,%H:%M:%S", so on a plain
+        "," the date and time of day land in separate columns and are joined again before parsing.
+        """
+        with self.file_header.open_data() as f:
+            if not download_file:
+                df = pd.read_csv(f, comment="#", engine="c", skipinitialspace=True)
+                if len(df.columns) < 2:
+                    raise ValueError("Expected at at least 2 columns in the CSV")
+                return df.set_axis(["time", "value", *df.columns[2:]], axis=1)
+
+            f.readline()  # column names
+            df = pd.read_csv(
+                f,
+                header=None,
+                names=["date", "clock", "value"],
+                usecols=[0, 1, 2],
+                dtype={"date": str, "clock": str, "value": "float64"},
+                comment="#",
+                engine="c",
+                skipinitialspace=True,
+            )
+        time = pd.to_datetime(df["date"] + " " + df["clock"], format="%Y-%m-%d %H:%M:%S", utc=True)
+        return pd.DataFrame({"time": time, "value": df["value"]})
 
     def process_metadata(self) -> dict:
         """
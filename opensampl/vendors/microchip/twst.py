@@ -1,7 +1,7 @@
 """Microchip TWST clock Parser implementation"""
 
 import random
-import re
+from collections.abc import Iterator
 from datetime import timedelta
 from pathlib import Path
 from typing import ClassVar
@@ -9,13 +9,11 @@ from typing import ClassVar
 import click
 import numpy as np
 import pandas as pd
-import psycopg2.errors
-import requests
-import yaml
 from loguru import logger
 from pydantic import Field
-from sqlalchemy.exc import IntegrityError
 
+from opensampl.load.series import SeriesBatch
+from opensampl.load.timestamps import ISO8601
 from opensampl.load_data import load_probe_metadata
 from opensampl.metrics import METRICS
 from opensampl.mixins.random_data import RandomDataMixin
@@ -29,6 +27,7 @@ class MicrochipTWSTProbe(BaseProbe, RandomDataMixin):
 
     vendor = VENDORS.MICROCHIP_TWST
     MEASUREMENTS: ClassVar = {"meas:offset": METRICS.PHASE_OFFSET, "tracking:ebno": METRICS.EB_NO}
+    time_format: ClassVar = ISO8601
 
     class RandomDataConfig(RandomDataMixin.RandomDataConfig):
         """Model for storing random data generation configurations as provided by CLI or YAML"""
@@ -125,65 +124,65 @@ class MicrochipTWSTProbe(BaseProbe, RandomDataMixin):
         self.header = self.get_header()
         self.probe_key = ProbeKey(probe_id="modem", ip_address=self.header["local"]["ip"])
 
-    def process_time_data(self) -> None:
-        """Process time series data from the input file."""
-        df = pd.read_csv(
-            self.input_file,
-            comment="#",
-        )
-        measurement_suffix = "|".join(map(re.escape, self.MEASUREMENTS.keys()))
-        pattern = rf"chan:\d+:{measurement_suffix}$"
-        df_mask = df["reading"].str.contains(pattern)
-        included_rows = df_mask.sum()
-        excluded_rows = len(df) - included_rows
-        logger.info(f"Included {included_rows}/{len(df)} rows, Excluded {excluded_rows}/{len(df)} rows")
-        df = df[df_mask].copy()
-
-        df.rename(columns={"timestamp": "time"}, inplace=True)
-        df["channel"] = df["reading"].str.extract(r"chan:(\d+)").astype(int)
-        df["measurement"] = df["reading"].str.extract(r"chan:\d+:(.*)")
-
-        grouped_dfs = {
-            (chan, meas): group.reset_index(drop=True)
-            for (chan, meas), group in df.groupby(["channel", "measurement"])  # ty: ignore[not-iterable]
-        }
+    @classmethod
+    def decompose_readings(cls, readings: pd.Categorical) -> tuple[np.ndarray, list[tuple[int, str]]]:
+        """
+        Map each reading name to the channel and measurement series it belongs to.
+
+        Reading names look like chan:<channel>:<measurement>. Only the distinct names are inspected, so the cost does
+        not depend on the number of rows.
 
-        for key, df in grouped_dfs.items():
-            logger.debug(f"Loading: {key}")
-            channel, measurement = key
-            compound_key = {"ip_address": self.probe_key.ip_address, "probe_id": f"chan:{channel}"}
-
-            metric = self.MEASUREMENTS.get(measurement)
-            if not metric:
-                raise ValueError(f"Unknown metrics type {measurement}")
-
-            try:
-                self.send_data(data=df, metric=metric, reference_type=REF_TYPES.PROBE, compound_reference=compound_key)
-            except requests.HTTPError as e:
-                resp = e.response
-                if resp is None:
-                    raise
-                status_code = resp.status_code
-                if status_code == 409:
-                    logger.info(f"(chan, meas)={key} already loaded for time frame, continuing..")
-                    continue
-                raise
-            except IntegrityError as e:
-                if isinstance(e.orig, psycopg2.errors.UniqueViolation):  # ty: ignore[unresolved-attribute]
-                    logger.info(f"Chan: meas={key} already loaded for time frame, continuing..")
+        Args:
+            readings: The reading column, as a categorical.
+
+        Returns:
+            The series index of every row, -1 for readings that are not one of MEASUREMENTS, and the (channel,
+            measurement) of each series index.
+
+        """
+        category_keys = {}
+        for code, name in enumerate(readings.categories):
+            prefix, _, rest = name.partition(":")
+            channel, _, measurement = rest.partition(":")
+            if prefix == "chan" and channel.isdigit() and measurement in cls.MEASUREMENTS:
+                category_keys[code] = (int(channel), measurement)
+
+        series = sorted(set(category_keys.values()))
+        series_index = {key: index for index, key in enumerate(series)}
+        category_series = np.full(len(readings.categories) + 1, -1, dtype=np.int64)
+        for code, key in category_keys.items():
+            category_series[code] = series_index[key]
+        # Missing readings have code -1, which indexes the trailing -1
+        return category_series[readings.codes], series
+
+    def parse_time_data(self) -> Iterator[SeriesBatch]:
+        """Parse time series data from the input file, yielding one series per channel and measurement."""
+        df = self.file_header.read_csv(dtype={"reading": "category"})
+
+        row_series, series = self.decompose_readings(df["reading"].array)
+        included_rows = int((row_series >= 0).sum())
+        logger.info(f"Included {included_rows}/{len(df)} rows, Excluded {len(df) - included_rows}/{len(df)} rows")
+
+        # One stable sort groups each series' rows together in time order; every series is then a slice of it
+        order = np.argsort(row_series, kind="stable")[len(df) - included_rows :]
+        times = df["timestamp"].to_numpy()[order]
+        values = df["value"].to_numpy()[order]
+        bounds = np.searchsorted(row_series[order], np.arange(len(series) + 1))
+
+        for index, (channel, measurement) in enumerate(series):
+            logger.debug(f"Loading: {(channel, measurement)}")
+            rows = slice(bounds[index], bounds[index + 1])
+            yield SeriesBatch(
+                probe_key=self.probe_key,
+                metric=self.MEASUREMENTS[measurement],
+                reference_type=REF_TYPES.PROBE,
+                compound_reference={"ip_address": self.probe_key.ip_address, "probe_id": f"chan:{channel}"},
+                data=pd.DataFrame({"time": times[rows], "value": values[rows]}, copy=False),
+            )
 
     def get_header(self) -> dict:
         """Retrieve the yaml formatted header information from the input file loaded into a dict"""
-        header_lines = []
-        with self.input_file.open() as f:
-            for line in f:
-                if line.startswith("#"):
-                    header_lines.append(line[2:])
-                else:
-                    break
-
-        header_str = "".join(header_lines)
-        return yaml.safe_load(header_str)
+        return self.file_header.fields
 
     def process_metadata(self) -> dict:
         """
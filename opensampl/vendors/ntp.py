@@ -17,14 +17,13 @@ from typing import TYPE_CHECKING, Any, ClassVar, Literal, TypeVar
 import click
 import numpy as np
 import pandas as pd
-import psycopg2.errors
-import requests
 import yaml
 from loguru import logger
 from pydanclick import from_pydantic
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy.exc import IntegrityError
 
+from opensampl.load.series import SeriesBatch
+from opensampl.load.timestamps import ISO8601
 from opensampl.load_data import load_probe_metadata
 from opensampl.metrics import METRICS, MetricType
 from opensampl.mixins.collect import CollectMixin
@@ -36,7 +35,7 @@ from opensampl.vendors.constants import VENDORS, ProbeKey
 T = TypeVar("T")
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator
     from pathlib import Path
 
 
@@ -488,6 +487,7 @@ class NtpProbe(BaseProbe, CollectMixin, RandomDataMixin):
     """Probe parser for NTP vendor data files"""
 
     vendor = VENDORS.NTP
+    time_format: ClassVar = ISO8601
 
     class CollectConfig(CollectMixin.CollectConfig):
         """
@@ -559,16 +559,7 @@ class NtpProbe(BaseProbe, CollectMixin, RandomDataMixin):
 
         """
         if not self.metadata_parsed:
-            header_lines = []
-            with self.input_file.open() as f:
-                for line in f:
-                    if line.startswith("#"):
-                        header_lines.append(line[2:])
-                    else:
-                        break
-
-            header_str = "".join(header_lines)
-            self.metadata = yaml.safe_load(header_str)
+            self.metadata = self.file_header.fields
             self.collection_probe = ProbeKey(
                 ip_address=self.metadata.get("collection_ip"), probe_id=self.metadata.get("collection_id")
             )
@@ -593,22 +584,9 @@ class NtpProbe(BaseProbe, CollectMixin, RandomDataMixin):
         load_probe_metadata(vendor=cls.vendor, probe_key=collection_probe, data={"reference": True})
         load_probe_metadata(vendor=cls.vendor, probe_key=probe_key, data=metadata)
 
-    def process_time_data(self) -> None:
-        """
-        Parse and load time series data from self.input_file.
-
-        Use either send_time_data (which prefills METRICS.PHASE_OFFSET)
-        or send_data and provide alternative METRICS type.
-        Both require a df as follows:
-            pd.DataFrame with columns:
-                - time (datetime64[ns]): timestamp for each measurement
-                - value (float64): measured value at each timestamp
-
-        """
-        raw_df = pd.read_csv(
-            self.input_file,
-            comment="#",
-        )
+    def parse_time_data(self) -> Iterator[SeriesBatch]:
+        """Parse time series data from self.input_file, yielding one series per supported metric."""
+        raw_df = self.file_header.read_csv()
         self.process_metadata()
 
         reference_type = REF_TYPES.PROBE
@@ -620,28 +598,13 @@ class NtpProbe(BaseProbe, CollectMixin, RandomDataMixin):
             if not metric:
                 logger.warning(f"Metric {metr} is not supported for NTP. Will not ingest {len(df)} rows")
                 continue
-            try:
-                self.send_data(
-                    data=df,
-                    metric=metric,
-                    reference_type=reference_type,
-                    compound_reference=self.collection_probe.model_dump(),
-                )
-            except requests.HTTPError as e:
-                resp = e.response
-                if resp is None:
-                    raise
-                status_code = resp.status_code
-                if status_code == 409:
-                    logger.info(f"{metr} against {self.collection_probe} already loaded for time frame, continuing..")
-                    continue
-                raise
-            except IntegrityError as e:
-                if isinstance(e.orig, psycopg2.errors.UniqueViolation):  # ty: ignore[unresolved-attribute]
-                    logger.info(
-                        f"{metr} against {self.collection_probe} already loaded for time "
-                        f"frame already loaded for time frame, continuing.."
-                    )
+            yield SeriesBatch(
+                probe_key=self.probe_key,
+                metric=metric,
+                reference_type=reference_type,
+                compound_reference=self.collection_probe.model_dump(),
+                data=df,
+            )
 
     @classmethod
     def collect(cls, collect_config: CollectConfig) -> CollectMixin.CollectArtifact:
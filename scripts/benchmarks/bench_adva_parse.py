@@ -0,0 +1,110 @@
+"""
+Benchmark parsing large ADVA captures.
+
+Writes a gzipped 1 Hz ADVA capture covering the requested number of days, then times AdvaProbe reading its header and
+readings against the previous approach: a separate pass for the header, the python CSV engine with a regex separator,
+and a formatted string column built per row. Peak memory is measured with tracemalloc, which sees pandas' and numpy's
+allocations. Nothing is loaded, so no database is needed.
+
+Usage:
+    python scripts/benchmarks/bench_adva_parse.py --days 1 --days 3 --days 7
+"""
+
+import gzip
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from opensampl.vendors.adva import AdvaProbe
+
+HEADER = "# Title: bench\n# Type: Phase\n# Start: 2024/01/01 00:00:00\n# Adva Probe: ClockProbe\n"
+
+
+def write_capture(directory: Path, days: int) -> Path:
+    """Write a gzipped 1 Hz ADVA phase offset capture covering the given number of days."""
+    rows = days * 86_400
+    path = directory / f"10.0.0.1CLOCK_PROBE-1-1-2024-01-01-00-00-{days:02d}.txt.gz"
+    values = np.random.default_rng(0).normal(0, 1e-8, rows)
+    with gzip.open(path, "wt") as f:
+        f.write(HEADER)
+        for start in range(0, rows, 86_400):
+            f.writelines(f"{second}, {values[second]:.10e}\n" for second in range(start, min(start + 86_400, rows)))
+    return path
+
+
+def previous_parser(path: Path) -> pd.DataFrame:
+    """Parse the capture the way AdvaProbe did before reading it in a single pass."""
+    probe = AdvaProbe(path)
+    probe.process_metadata()
+    df = pd.read_csv(
+        path,
+        compression="gzip",
+        header=None,
+        comment="#",
+        names=["time", "value"],
+        dtype={"time": "float64", "value": "float64"},
+        engine="python",
+        sep=r",\s*",
+    )
+    df["time"] = pd.Timestamp(probe.start_time) + pd.to_timedelta(df["time"], unit="s")
+    df["value_str"] = df["value"].apply(lambda x: f"{x:.10e}")
+    return df
+
+
+def current_parser(path: Path) -> pd.DataFrame:
+    """Parse the capture with AdvaProbe, metadata included."""
+    probe = AdvaProbe(path)
+    (batch,) = probe.parse_time_data()
+    probe.process_metadata()
+    return batch.data
+
+
+def measure(parser: Callable[[Path], pd.DataFrame], path: Path) -> tuple[int, float, int]:
+    """
+    Return the rows parsed, the seconds taken and the peak memory allocated in bytes.
+
+    Timing and memory come from separate runs, as tracing allocations slows parsing down.
+    """
+    start = time.perf_counter()
+    rows = len(parser(path))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    parser(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+@click.command()
+@click.option("--days", "-d", multiple=True, type=int, default=[1, 3, 7], show_default=True)
+def main(days: tuple[int, ...]):
+    """Report rows/s and peak memory of the previous and current ADVA parsers for each capture length."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for length in days:
+            path = write_capture(Path(directory), length)
+            for name, parser in (("previous", previous_parser), ("current", current_parser)):
+                rows, elapsed, peak = measure(parser, path)
+                results.append(
+                    {
+                        "parser": name,
+                        "days": length,
+                        "rows": rows,
+                        "seconds": elapsed,
+                        "rows/s": rows / elapsed,
+                        "peak (MB)": peak / 2**20,
+                    }
+                )
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare parsing a directory of probe files in worker threads with parsing it in worker processes.
+
+Writes a directory of synthetic gzipped ADVA files, then times parse_probe_file over all of them in a thread pool and
+in a process pool for each worker count, which is the work `opensampl load --executor thread|process` spreads across
+its workers. Nothing is loaded, so no database is needed; the rows/s columns show how far parsing alone scales.
+
+Usage:
+    python scripts/benchmarks/bench_parse_executor.py --files 64 --rows 86400 -w 1 -w 2 -w 4 -w 8 -w 16 -w 32
+"""
+
+import gzip
+import multiprocessing
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import click
+import numpy as np
+from tabulate import tabulate
+
+from opensampl.vendors.adva import AdvaProbe
+from opensampl.vendors.base_probe import parse_probe_file
+
+HEADER = "# Title: bench\n# Type: Phase\n# Start: 2024/01/01 00:00:00\n"
+
+
+def write_files(directory: Path, files: int, rows: int) -> list[Path]:
+    """Write the given number of gzipped 1 Hz ADVA phase offset files, each holding rows readings."""
+    values = np.random.default_rng(0).normal(0, 1e-8, rows)
+    body = "".join(f"{second}, {value:.10e}\n" for second, value in enumerate(values))
+    paths = []
+    for index in range(files):
+        path = directory / f"10.0.0.1CLOCK_PROBE-1-{index}-2024-01-01-00-00-00.txt.gz"
+        with gzip.open(path, "wt") as f:
+            f.write(HEADER + body)
+        paths.append(path)
+    return paths
+
+
+def time_parse(executor: Executor, paths: list[Path]) -> float:
+    """Return the seconds taken to parse every path with executor."""
+    start = time.perf_counter()
+    parse = partial(parse_probe_file, AdvaProbe, metadata=True, time_data=True, kwargs={})
+    for parsed in executor.map(parse, paths):
+        assert parsed.series is not None
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--files", "-f", type=int, default=64, show_default=True)
+@click.option("--rows", "-r", type=int, default=86_400, show_default=True, help="Readings per file")
+@click.option("--workers", "-w", multiple=True, type=int, default=[1, 2, 4, 8, 16, 32], show_default=True)
+def main(files: int, rows: int, workers: tuple[int, ...]):
+    """Report parse throughput of the thread and process executors for each worker count."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(Path(directory), files, rows)
+        baseline = {}
+        for count in workers:
+            for name in ("thread", "process"):
+                if name == "thread":
+                    executor = ThreadPoolExecutor(max_workers=count)
+                else:
+                    executor = ProcessPoolExecutor(max_workers=count, mp_context=multiprocessing.get_context("spawn"))
+                with executor:
+                    # Start every worker before timing, so process start up is not counted
+                    list(executor.map(time.sleep, [0.1] * count))
+                    elapsed = time_parse(executor, paths)
+                baseline.setdefault(name, elapsed)
+                results.append(
+                    {
+                        "executor": name,
+                        "workers": count,
+                        "seconds": elapsed,
+                        "files/s": files / elapsed,
+                        "rows/s": files * rows / elapsed,
+                        "speedup": baseline[name] / elapsed,
+                    }
+                )
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark converting time columns to UTC datetimes.
+
+Builds 1 Hz time columns in the forms vendors and uploads produce them (datetimes, ISO-8601 strings with and without a
+UTC offset, epoch seconds, a vendor specific strftime format, and mixed formats) and times normalize_time_column on
+each against the previous approach of parsing every element with format="mixed". Nothing is loaded, so no database is
+needed.
+
+Usage:
+    python scripts/benchmarks/bench_timestamps.py --rows 100000 --rows 1000000
+"""
+
+import time
+from collections.abc import Callable
+
+import click
+import pandas as pd
+from tabulate import tabulate
+
+from opensampl.load.timestamps import normalize_time_column
+
+HINTED_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+
+def make_columns(rows: int) -> dict[str, tuple[pd.Series, dict]]:
+    """Return each form of time column with the hint a vendor would declare for it."""
+    times = pd.Series(pd.date_range("2024-01-01", periods=rows, freq="s", tz="UTC"))
+    iso = times.dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "datetime64": (times, {}),
+        "iso8601 (Z)": (iso, {}),
+        "iso8601 (+00:00)": (times.astype(str), {}),
+        "epoch seconds": (times.astype("int64") // 10**9, {}),
+        "strftime hint": (times.dt.strftime(HINTED_FORMAT), {"time_format": HINTED_FORMAT}),
+        "mixed": (iso.where(times.dt.second % 2 == 0, times.dt.strftime("%d %b %Y %H:%M:%S")), {}),
+    }
+
+
+def previous(times: pd.Series, **_) -> pd.Series:
+    """Convert times the way load_time_data did before detecting their format."""
+    if isinstance(times.dtype, pd.DatetimeTZDtype):
+        return times.dt.tz_convert("UTC")
+    return pd.to_datetime(times, format="mixed", utc=True, errors="raise")
+
+
+def timed(func: Callable[[], object]) -> float:
+    """Return the seconds func takes."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--rows", "-r", multiple=True, type=int, default=[100_000, 1_000_000], show_default=True)
+def main(rows: tuple[int, ...]):
+    """Report rows/s of the previous and current time normalization for each form of time column."""
+    results = []
+    for size in rows:
+        for form, (times, hint) in make_columns(size).items():
+            for name, convert in (("previous", previous), ("current", normalize_time_column)):
+                elapsed = timed(lambda convert=convert, times=times, hint=hint: convert(times, **hint))
+                results.append({"form": form, "version": name, "rows": size, "rows/s": size / elapsed})
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.0f"))
+
+
+if __name__ == "__main__":
+    main()
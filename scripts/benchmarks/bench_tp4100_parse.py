@@ -0,0 +1,109 @@
+"""
+Benchmark parsing Microchip TP4100 exports and converting chart data.
+
+Writes one synthetic 24 hour, 1 Hz download_file export per channel and times MicrochipTP4100Probe reading them against
+the previous approach (python CSV engine with a ", " delimiter and a per-row nanosecond conversion). It also times
+converting the same number of get_chart_data points from TAI seconds to UTC timestamps, per row as before and with
+tai_to_utc. Nothing is collected or loaded, so neither a device nor a database is needed.
+
+Usage:
+    python scripts/benchmarks/bench_tp4100_parse.py --channels 8 --rows 86400
+"""
+
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from opensampl.collect.microchip.tp4100.collect_4100 import tai_to_utc
+from opensampl.vendors.microchip.tp4100 import MicrochipTP4100Probe
+
+HEADER = (
+    "# Start: '2024-01-01T00:00:00+00:00'\n# host: 10.0.0.5\n# metric: Time-Error (ns)\n# method: download_file\n"
+    "# reference: GNSS\nTime, Time-Error (ns)\n"
+)
+TAI_UTC_OFFSET = 37
+
+
+def write_exports(directory: Path, channels: int, rows: int) -> list[Path]:
+    """Write one download_file export of rows readings per channel."""
+    times = pd.date_range("2024-01-01", periods=rows, freq="s").strftime("%Y-%m-%d,%H:%M:%S")
+    values = np.random.default_rng(0).integers(-200, 200, rows)
+    body = "".join(f"{stamp}, {value}\n" for stamp, value in zip(times, values, strict=True))
+    paths = []
+    for channel in range(channels):
+        path = directory / f"tp4100-{channel}.csv"
+        path.write_text(HEADER + body)
+        paths.append(path)
+    return paths
+
+
+def previous_parser(path: Path) -> pd.DataFrame:
+    """Parse an export the way MicrochipTP4100Probe did before using the C engine."""
+    MicrochipTP4100Probe(path)
+    df = pd.read_csv(path, delimiter=", ", comment="#", engine="python")
+    df.columns = ["time", "value", *df.columns[2:]]
+    df["value"] = df["value"].apply(lambda x: float(x) / 1e9)
+    df["time"] = pd.to_datetime(df["time"], format="%Y-%m-%d,%H:%M:%S", utc=True)
+    return df
+
+
+def current_parser(path: Path) -> pd.DataFrame:
+    """Parse an export with MicrochipTP4100Probe."""
+    (batch,) = MicrochipTP4100Probe(path).parse_time_data()
+    return batch.data
+
+
+def previous_chart(chart: pd.DataFrame) -> pd.Series:
+    """Convert chart data timestamps one row at a time, as collect_chart_data did."""
+    return chart.apply(lambda r: datetime.fromtimestamp(int(r["X"]) - int(r["OFFSET"]), UTC), axis=1)
+
+
+def current_chart(chart: pd.DataFrame) -> pd.Series:
+    """Convert chart data timestamps with tai_to_utc."""
+    return tai_to_utc(chart["X"], chart["OFFSET"])
+
+
+def timed(func: Callable[[], object]) -> float:
+    """Return the seconds func takes."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--channels", "-c", type=int, default=8, show_default=True)
+@click.option("--rows", "-r", type=int, default=86_400, show_default=True, help="Readings per channel")
+def main(channels: int, rows: int):
+    """Report rows/s of the previous and current TP4100 parsing and chart data conversion."""
+    total = channels * rows
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_exports(Path(directory), channels, rows)
+        for name, parser in (("previous", previous_parser), ("current", current_parser)):
+            elapsed = timed(lambda parser=parser: [parser(path) for path in paths])
+            results.append({"step": "download_file", "version": name, "rows": total, "rows/s": total / elapsed})
+
+    start = 1_704_067_200 + TAI_UTC_OFFSET
+    chart = pd.DataFrame(
+        {
+            "X": [str(second) for second in range(start, start + total)],
+            "OFFSET": str(TAI_UTC_OFFSET),
+            "Y": np.random.default_rng(0).normal(0, 50, total),
+        }
+    )
+    for name, convert in (("previous", previous_chart), ("current", current_chart)):
+        elapsed = timed(lambda convert=convert: convert(chart))
+        results.append({"step": "chart_data", "version": name, "rows": total, "rows/s": total / elapsed})
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.0f"))
+
+
+if __name__ == "__main__":
+    main()
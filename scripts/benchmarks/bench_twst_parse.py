@@ -0,0 +1,96 @@
+"""
+Benchmark parsing large Microchip TWST captures.
+
+Writes a synthetic ATS 6502 capture with every reading enabled: for each second and channel, the offset and Eb/No
+readings that are loaded plus a number of status readings that are skipped. It then times MicrochipTWSTProbe reading
+it against the previous regex based decomposition. Nothing is loaded, so no database is needed.
+
+Usage:
+    python scripts/benchmarks/bench_twst_parse.py --lines 1000000 --lines 5000000
+"""
+
+import re
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import click
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from opensampl.vendors.microchip.twst import MicrochipTWSTProbe
+
+HEADER = "# local:\n#   ip: 10.0.0.1\n# remotes:\n#   1: {}\n#   2: {}\n#   3: {}\n#   4: {}\n"
+CHANNELS = 4
+STATUS_READINGS = ["tracking:state", "tracking:cn0", "rx:power", "rx:freq", "tx:power", "meas:range"]
+
+
+def write_capture(directory: Path, lines: int) -> Path:
+    """Write a capture of about the given number of reading lines."""
+    readings = [
+        f"chan:{channel}:{name}"
+        for channel in range(1, CHANNELS + 1)
+        for name in ["meas:offset", "tracking:ebno", *STATUS_READINGS]
+    ]
+    seconds = max(1, lines // len(readings))
+    times = pd.date_range("2024-01-01", periods=seconds, freq="s").strftime("%Y-%m-%dT%H:%M:%SZ")
+    frame = pd.DataFrame(
+        {
+            "timestamp": np.repeat(times, len(readings)),
+            "reading": np.tile(readings, seconds),
+            "value": np.random.default_rng(0).normal(0, 1e-9, seconds * len(readings)),
+        }
+    )
+    path = directory / f"twst-{lines}.csv"
+    with path.open("w") as f:
+        f.write(HEADER)
+        frame.to_csv(f, index=False)
+    return path
+
+
+def previous_parser(path: Path) -> list[pd.DataFrame]:
+    """Parse the capture the way MicrochipTWSTProbe did before decomposing readings by category."""
+    MicrochipTWSTProbe(path)
+    df = pd.read_csv(path, comment="#")
+    measurement_suffix = "|".join(map(re.escape, MicrochipTWSTProbe.MEASUREMENTS.keys()))
+    df = df[df["reading"].str.contains(rf"chan:\d+:(?:{measurement_suffix})$")].copy()
+    df = df.rename(columns={"timestamp": "time"})
+    df["channel"] = df["reading"].str.extract(r"chan:(\d+)").astype(int)
+    df["measurement"] = df["reading"].str.extract(r"chan:\d+:(.*)")
+    return [group.reset_index(drop=True) for _, group in df.groupby(["channel", "measurement"])]
+
+
+def current_parser(path: Path) -> list[pd.DataFrame]:
+    """Parse the capture with MicrochipTWSTProbe."""
+    return [batch.data for batch in MicrochipTWSTProbe(path).parse_time_data()]
+
+
+def measure(parser: Callable[[Path], list[pd.DataFrame]], path: Path) -> tuple[int, float]:
+    """Return the rows loaded and the seconds taken."""
+    start = time.perf_counter()
+    rows = sum(len(frame) for frame in parser(path))
+    return rows, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--lines", "-l", multiple=True, type=int, default=[1_000_000, 5_000_000], show_default=True)
+def main(lines: tuple[int, ...]):
+    """Report lines/s of the previous and current TWST parsers for each capture size."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in lines:
+            path = write_capture(Path(directory), size)
+            total = sum(1 for _ in path.open()) - HEADER.count("\n") - 1
+            for name, parser in (("previous", previous_parser), ("current", current_parser)):
+                rows, elapsed = measure(parser, path)
+                results.append(
+                    {"parser": name, "lines": total, "rows kept": rows, "seconds": elapsed, "lines/s": total / elapsed}
+                )
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.2f"))
+
+
+if __name__ == "__main__":
+    main()
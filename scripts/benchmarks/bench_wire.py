@@ -0,0 +1,104 @@
+"""
+Benchmark the wire formats used to upload time data to the backend.
+
+For each format, reports the payload size and the rows per second of the full round trip a routed upload goes
+through: encoding on the client, decoding on the backend, and preparing the probe_data rows in load_time_data.
+With --backend-url, also times uploads to a running backend, which includes the database write.
+
+Usage:
+    python scripts/benchmarks/bench_wire.py
+    python scripts/benchmarks/bench_wire.py --backend-url http://localhost:8015 --rows 100000
+"""
+
+import time
+
+import click
+import numpy as np
+import pandas as pd
+import requests
+from tabulate import tabulate
+
+from opensampl.load.cache import SeriesIdentity
+from opensampl.load.wire import available_formats, decode_frame, encode_frame
+from opensampl.load_data import _probe_data_frame
+from opensampl.metrics import METRICS
+from opensampl.references import REF_TYPES
+from opensampl.vendors.constants import ProbeKey
+
+BENCH_PROBE = ProbeKey(probe_id="bench-wire-1", ip_address="198.51.100.2")
+BENCH_IDENTITY = SeriesIdentity(
+    series_id=1,
+    probe_uuid="p",
+    metric_type_uuid="m",
+    reference_uuid="r",
+    probe_readable=str(BENCH_PROBE),
+    metric_type=METRICS.PHASE_OFFSET,
+    cache_key=(),
+)
+COMBINATIONS = [("csv", "none"), ("csv", "gzip"), ("arrow", "none"), ("arrow", "zstd"), ("parquet", "zstd")]
+
+
+def make_frame(rows: int, offset_days: int = 0) -> pd.DataFrame:
+    """Build a 1 Hz phase offset frame shaped like a vendor parser's output."""
+    start = pd.Timestamp("2020-01-01", tz="UTC") + pd.Timedelta(days=offset_days)
+    return pd.DataFrame(
+        {
+            "time": start + pd.to_timedelta(np.arange(rows), unit="s"),
+            "value": np.random.default_rng(0).normal(0, 1e-8, rows),
+        }
+    )
+
+
+def upload(backend_url: str, df: pd.DataFrame, wire_format: str, compression: str) -> None:
+    """Send one frame to the backend's load_time_data endpoint."""
+    response = requests.post(
+        f"{backend_url}/load_time_data",
+        data={
+            "probe_key_str": BENCH_PROBE.model_dump_json(),
+            "metric_type_str": METRICS.PHASE_OFFSET.model_dump_json(),
+            "reference_type_str": REF_TYPES.GNSS.model_dump_json(),
+        },
+        files={"file": encode_frame(df, "time_data", wire_format, compression)},
+        timeout=600,
+    )
+    response.raise_for_status()
+
+
+@click.command()
+@click.option("--rows", "-r", multiple=True, type=int, default=[10_000, 100_000, 1_000_000], show_default=True)
+@click.option("--repeat", type=int, default=3, show_default=True, help="Runs per format and size; best is reported")
+@click.option("--backend-url", default=None, help="Also time uploads to this backend (writes benchmark data)")
+def main(rows: tuple[int, ...], repeat: int, backend_url: str | None):
+    """Compare payload size and round trip throughput of each wire format."""
+    combinations = [(fmt, comp) for fmt, comp in COMBINATIONS if fmt in available_formats()]
+    results = []
+    for size in rows:
+        df = make_frame(size)
+        for wire_format, compression in combinations:
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                filename, content, content_type = encode_frame(df, "time_data", wire_format, compression)
+                _probe_data_frame(BENCH_IDENTITY, decode_frame(content, content_type, filename))
+                best = min(best, time.perf_counter() - start)
+            result = {
+                "format": wire_format,
+                "compression": compression,
+                "rows": size,
+                "bytes": len(content),
+                "bytes/row": len(content) / size,
+                "round trip rows/s": size / best,
+            }
+            if backend_url:
+                # Shift each upload so every format writes fresh rows rather than conflicting with the last one
+                shifted = make_frame(size, offset_days=len(results) + 1)
+                start = time.perf_counter()
+                upload(backend_url, shifted, wire_format, compression)
+                result["backend rows/s"] = size / (time.perf_counter() - start)
+            results.append(result)
+
+    click.echo(tabulate(results, headers="keys", floatfmt=",.1f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,8 @@ def mock_config():
         config.DATABASE_URL = "sqlite:///:memory:"
         config.LOG_LEVEL = "DEBUG"
         config.ENABLE_GEOLOCATE = False
+        config.SERIES_CACHE_SIZE = 4096
+        config.SERIES_CACHE_TTL = 900.0
 
         mock.return_value = config
         yield mock
@@ -76,6 +78,9 @@ def mock_config_backend():
         config.API_KEY = "test-api-key"
         config.INSECURE_REQUESTS = False
         config.LOG_LEVEL = "DEBUG"
+        config.WIRE_FORMAT = "csv"
+        config.WIRE_COMPRESSION = "none"
+        config.OUTBOX_MODE = "off"
 
         mock.return_value = config
         yield mock
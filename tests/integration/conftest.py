@@ -24,7 +24,7 @@ from pytest_postgresql import factories as pg_factories
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
 
-from opensampl.db.orm import Base
+from opensampl.db.orm import Base, create_tables
 from opensampl.db.orm import Defaults as DBDefaults
 from opensampl.db.orm import MetricType as DBMetricType
 from opensampl.db.orm import Reference as DBReference
@@ -77,7 +77,7 @@ def db_engine(postgresql_proc):
     Lifecycle:
         1. Create the opensampl_test database.
         2. Install PostGIS and create the castdb schema.
-        3. Create all ORM tables via Base.metadata.create_all().
+        3. Create all ORM tables and the probe_data view via create_tables().
         4. Seed metric_type, reference_type, reference, and defaults tables.
         5. Install the get_default_uuid_for() PL/pgSQL stub.
     """
@@ -109,7 +109,7 @@ def db_engine(postgresql_proc):
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
         conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {Base.metadata.schema}"))
 
-    Base.metadata.create_all(engine)
+    create_tables(engine)
     _seed_lookup_tables(engine)
     _install_default_uuid_stub(engine)
 
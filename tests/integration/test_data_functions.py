@@ -0,0 +1,99 @@
+"""
+tests/integration/test_data_functions.py
+
+Tests for the time ranged get_probe_data_by_* functions, including the plans postgres chooses for them.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from opensampl.db.orm import ProbeMetadata, Series, SeriesData
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def series(db_session, seeded_uuids) -> Series:
+    """One phase offset series with a reading every second for a minute."""
+    probe = ProbeMetadata(probe_id="1-1", ip_address="10.0.0.1", vendor="test", model="test")
+    db_session.add(probe)
+    db_session.flush()
+    series = Series(
+        probe_uuid=probe.uuid,
+        reference_uuid=seeded_uuids["reference.unknown"],
+        metric_type_uuid=seeded_uuids["metric_type.Phase Offset"],
+    )
+    db_session.add(series)
+    db_session.flush()
+    db_session.add_all(
+        SeriesData(time=START + timedelta(seconds=i), series_id=series.series_id, value_num=float(i)) for i in range(60)
+    )
+    db_session.flush()
+    return series
+
+
+def _call(db_session, series: Series, **kwargs) -> list:
+    args = ", ".join(f"{name} => :{name}" for name in kwargs)
+    return db_session.execute(
+        text(f"SELECT * FROM get_probe_data_by_probe_and_metric(:probe, :metric{', ' if args else ''}{args})"),  # noqa: S608
+        {"probe": series.probe_uuid, "metric": series.metric_type_uuid, **kwargs},
+    ).all()
+
+
+def test_full_history_by_default(db_session, series):
+    """Without a range or limit every reading is returned, oldest first."""
+    rows = _call(db_session, series)
+    assert [row.value_num for row in rows] == [float(i) for i in range(60)]
+    assert rows[0].value == 0.0
+
+
+def test_time_range_and_limit(db_session, series):
+    """start_time is inclusive, end_time exclusive, and max_rows caps the result."""
+    rows = _call(
+        db_session,
+        series,
+        start_time=START + timedelta(seconds=10),
+        end_time=START + timedelta(seconds=20),
+        max_rows=5,
+    )
+    assert [row.value_num for row in rows] == [10.0, 11.0, 12.0, 13.0, 14.0]
+
+
+def test_cursor_pages_through_range(db_session, series):
+    """Passing the last row's time and series_id returns the next page without repeats."""
+    seen = []
+    after = {}
+    while page := _call(db_session, series, end_time=START + timedelta(seconds=25), max_rows=10, **after):
+        seen.extend(row.value_num for row in page)
+        after = {"after_time": page[-1].time, "after_series_id": page[-1].series_id}
+    assert seen == [float(i) for i in range(25)]
+
+
+def test_bucket_width_averages(db_session, series):
+    """With a bucket width, readings are averaged into buckets aligned with time_bucket."""
+    rows = _call(db_session, series, bucket_width=timedelta(seconds=20))
+    assert [(row.time, row.value_num) for row in rows] == [
+        (START, 9.5),
+        (START + timedelta(seconds=20), 29.5),
+        (START + timedelta(seconds=40), 49.5),
+    ]
+
+
+def test_plan_uses_series_data_index(db_session, series):
+    """The function is inlined, so the time bounds reach the series_data primary key scan."""
+    db_session.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(
+        db_session.execute(
+            text("""
+            EXPLAIN (COSTS OFF)
+            SELECT * FROM get_probe_data_by_probe_and_metric(
+                :probe, :metric, TIMESTAMP '2024-01-01 00:00:10', TIMESTAMP '2024-01-01 00:00:20', 100)
+            """),
+            {"probe": series.probe_uuid, "metric": series.metric_type_uuid},
+        ).scalars()
+    )
+    assert "Function Scan" not in plan, plan
+    assert "series_data_pkey" in plan, plan
+    assert "2024-01-01 00:00:10" in plan, plan
@@ -0,0 +1,67 @@
+"""Tests for the backend's API key cache."""
+
+import time
+from datetime import UTC, datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from opensampl.server.backend.keys import ApiKeyCache  # noqa: E402
+
+
+class TestApiKeyCache:
+    """Test key validation, expiry, and reload behavior."""
+
+    def test_lookups_served_from_memory(self):
+        """The loader runs once while the key set is fresh."""
+        loader = Mock(return_value={"secret": None})
+        cache = ApiKeyCache(loader, ttl=60, refresh_interval=0)
+        assert cache.is_valid("secret")
+        assert not cache.is_valid("guess")
+        assert not cache.is_valid(None)
+        assert cache.has_keys()
+        loader.assert_called_once()
+
+    def test_invalidate_reloads(self):
+        """A new key is accepted on the next lookup after invalidation."""
+        loader = Mock(return_value={"old": None})
+        cache = ApiKeyCache(loader, ttl=60, refresh_interval=0)
+        assert not cache.is_valid("new")
+        loader.return_value = {"old": None, "new": None}
+        cache.invalidate()
+        assert cache.is_valid("new")
+        assert loader.call_count == 2  # noqa: PLR2004
+
+    def test_expired_keys_rejected_between_reloads(self):
+        """A key stops validating at its expiry time without waiting for a reload."""
+        soon = datetime.now(tz=UTC) + timedelta(milliseconds=50)
+        cache = ApiKeyCache(Mock(return_value={"brief": soon}), ttl=60, refresh_interval=0)
+        assert cache.is_valid("brief")
+        time.sleep(0.1)
+        assert not cache.is_valid("brief")
+        assert not cache.has_keys()
+
+    def test_failed_reload_keeps_keys(self):
+        """A database error during reload leaves the previous keys in place."""
+        loader = Mock(return_value={"secret": None})
+        cache = ApiKeyCache(loader, ttl=60, refresh_interval=0)
+        assert cache.is_valid("secret")
+        loader.side_effect = RuntimeError("db down")
+        cache.invalidate()
+        assert cache.is_valid("secret")
+
+    def test_background_refresh(self):
+        """The background thread picks up new keys without a lookup having to wait."""
+        loader = Mock(return_value={"old": None})
+        cache = ApiKeyCache(loader, ttl=60, refresh_interval=0.02)
+        try:
+            assert cache.is_valid("old")
+            loader.return_value = {"new": None}
+            deadline = time.monotonic() + 2
+            while loader.call_count < 2 and time.monotonic() < deadline:  # noqa: PLR2004
+                time.sleep(0.01)
+            assert cache.is_valid("new")
+        finally:
+            cache.stop()
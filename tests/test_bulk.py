@@ -0,0 +1,159 @@
+"""Tests for the bulk series_data writers."""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from opensampl.db import compression
+from opensampl.load import bulk
+
+
+def _prepared_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "time": pd.to_datetime(
+                [datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc), datetime(2024, 1, 1, 12, 0, 1, tzinfo=timezone.utc)]
+            ),
+            "value": [1.5e-9, -2.25],
+            "series_id": 3,
+        }
+    )
+
+
+class TestEncodeJsonValues:
+    """Test the JSON encoding used for the JSONB value column."""
+
+    def test_numeric_values(self):
+        """Float columns encode without falling back to json.dumps."""
+        encoded = bulk.encode_json_values(pd.Series([1.5e-9, 2.0, -3.25]))
+        assert list(encoded) == ["1.5e-09", "2.0", "-3.25"]
+
+    def test_bool_values(self):
+        """Booleans encode as JSON literals rather than python reprs."""
+        assert list(bulk.encode_json_values(pd.Series([True, False]))) == ["true", "false"]
+
+    def test_object_values(self):
+        """Object columns are encoded with json.dumps."""
+        encoded = bulk.encode_json_values(pd.Series([{"a": 1}, "text"]))
+        assert list(encoded) == ['{"a": 1}', '"text"']
+
+    def test_missing_values_stay_missing(self):
+        """Rows whose reading lives in value_num are not encoded as JSON null."""
+        assert list(bulk.encode_json_values(pd.Series([None, None]))) == [None, None]
+        assert list(bulk.encode_json_values(pd.Series([None, {"a": 1}]))) == [None, '{"a": 1}']
+
+
+class TestCopyBuffer:
+    """Test the CSV rendered for COPY ... FROM STDIN."""
+
+    def test_copy_buffer_content(self):
+        """Times are sent as naive UTC in column order expected by the COPY statement."""
+        lines = bulk.to_copy_buffer(_prepared_frame()).read().splitlines()
+        assert lines == [
+            "2024-01-01 12:00:00.000000,3,1.5e-09,",
+            "2024-01-01 12:00:01.000000,3,-2.25,",
+        ]
+
+    def test_copy_buffer_numeric_values(self):
+        """Readings of numeric metrics are sent in value_num, leaving the JSON value empty."""
+        df = _prepared_frame()
+        df["value_num"] = df["value"]
+        df["value"] = None
+        lines = bulk.to_copy_buffer(df).read().splitlines()
+        assert lines == [
+            "2024-01-01 12:00:00.000000,3,,1.5e-09",
+            "2024-01-01 12:00:01.000000,3,,-2.25",
+        ]
+
+    def test_copy_buffer_converts_to_utc(self):
+        """Non-UTC timestamps are converted before the timezone is dropped."""
+        df = _prepared_frame()
+        df["time"] = df["time"].dt.tz_convert("America/New_York")
+        first = bulk.to_copy_buffer(df).readline()
+        assert first.startswith("2024-01-01 12:00:00.000000,")
+
+
+class TestWriteProbeData:
+    """Test selection between COPY and INSERT paths."""
+
+    def test_sqlite_does_not_support_copy(self, mock_session: Session):
+        """Only psycopg2 postgres connections use the COPY path."""
+        assert bulk.supports_copy(mock_session) is False
+
+    def test_write_probe_data_dispatch(self):
+        """The COPY path is used when supported, otherwise executemany INSERT."""
+        session = MagicMock()
+        df = _prepared_frame()
+        with (
+            patch("opensampl.load.bulk.copy_probe_data", return_value=2) as copy_mock,
+            patch("opensampl.load.bulk.insert_probe_data", return_value=1) as insert_mock,
+            patch("opensampl.load.bulk.supports_copy", side_effect=[True, False]),
+        ):
+            assert bulk.write_probe_data(session, df) == 2
+            assert bulk.write_probe_data(session, df) == 1
+        copy_mock.assert_called_once_with(session, df)
+        insert_mock.assert_called_once_with(session, df)
+
+
+def _db_error(pgcode: str, message: str) -> DBAPIError:
+    orig = Exception(message)
+    orig.pgcode = pgcode  # ty: ignore[unresolved-attribute]
+    return DBAPIError("INSERT", {}, orig)
+
+
+class TestCompressedChunks:
+    """Test writing late data that lands in compressed chunks."""
+
+    def test_is_compressed_chunk_error(self):
+        """Only feature-not-supported errors about compressed chunks are recognised."""
+        assert compression.is_compressed_chunk_error(
+            _db_error("0A000", "insert into a compressed chunk that has primary or unique index is not supported")
+        )
+        assert not compression.is_compressed_chunk_error(_db_error("0A000", "cannot copy to view"))
+        assert not compression.is_compressed_chunk_error(_db_error("23505", "duplicate key in compressed chunk"))
+
+    def test_decompresses_and_retries(self):
+        """Rows rejected for compressed chunks are written after decompressing the chunks they fall in."""
+        session = MagicMock()
+        df = _prepared_frame()
+        error = _db_error("0A000", "insert into a compressed chunk is not supported")
+        with (
+            patch("opensampl.load.bulk.supports_copy", return_value=False),
+            patch("opensampl.load.bulk.insert_probe_data", side_effect=[error, 2]) as insert_mock,
+            patch("opensampl.load.bulk.decompress_chunks", return_value=1) as decompress_mock,
+        ):
+            assert bulk.write_probe_data(session, df) == 2
+        assert insert_mock.call_count == 2
+        decompress_mock.assert_called_once_with(session, datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 0, 1))
+
+    def test_decompress_window_is_naive_utc(self):
+        """Times in other zones are compared to the chunk ranges as naive UTC, whatever the session time zone."""
+        df = _prepared_frame()
+        df["time"] = df["time"].dt.tz_convert("Europe/Berlin")
+        error = _db_error("0A000", "insert into a compressed chunk is not supported")
+        with (
+            patch("opensampl.load.bulk.supports_copy", return_value=False),
+            patch("opensampl.load.bulk.insert_probe_data", side_effect=[error, 2]),
+            patch("opensampl.load.bulk.decompress_chunks", return_value=1) as decompress_mock,
+        ):
+            bulk.write_probe_data(MagicMock(), df)
+        _, start, end = decompress_mock.call_args.args
+        assert (start, end) == (datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 0, 1))
+        assert start.tzinfo is None
+
+    def test_other_errors_are_raised(self):
+        """Errors unrelated to compression are raised without decompressing anything."""
+        session = MagicMock()
+        error = _db_error("23503", "violates foreign key constraint")
+        with (
+            patch("opensampl.load.bulk.supports_copy", return_value=False),
+            patch("opensampl.load.bulk.insert_probe_data", side_effect=error),
+            patch("opensampl.load.bulk.decompress_chunks") as decompress_mock,
+            pytest.raises(DBAPIError),
+        ):
+            bulk.write_probe_data(session, _prepared_frame())
+        decompress_mock.assert_not_called()
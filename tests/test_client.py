@@ -0,0 +1,114 @@
+"""Tests for the pooled backend HTTP client."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from opensampl.config.base import BaseConfig
+from opensampl.load import client as client_module
+from opensampl.load.client import BackendClient, get_client
+
+
+@pytest.fixture
+def flaky_backend():
+    """Serve a backend that answers 503 to the first two POSTs it receives, then 200."""
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            calls.append(self.path)
+            status = 503 if len(calls) <= 2 else 200  # noqa: PLR2004
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", calls
+    server.shutdown()
+    server.server_close()
+
+
+class TestBackendClient:
+    """Test retries, concurrency limits and latency metrics."""
+
+    def test_retries_unavailable_backend(self, flaky_backend):
+        """POST uploads are retried on 503 until they succeed."""
+        url, calls = flaky_backend
+        client = BackendClient(url, retries=3, backoff=0.01)
+        response = client.request("POST", "load_time_data", json={"a": 1})
+        assert response.status_code == 200  # noqa: PLR2004
+        assert len(calls) == 3  # noqa: PLR2004
+        stats = client.latency_stats()["load_time_data"]
+        assert stats["count"] == 1
+
+    def test_retries_exhausted_returns_last_response(self, flaky_backend):
+        """The final 503 is handed back for the caller to raise."""
+        url, _ = flaky_backend
+        client = BackendClient(url, retries=1, backoff=0.01)
+        assert client.request("POST", "load_time_data").status_code == 503  # noqa: PLR2004
+
+    @pytest.mark.parametrize("jitter", [True, False])
+    def test_jitter_only_where_supported(self, jitter):
+        """Backoff jitter is only passed to urllib3 versions whose Retry accepts it."""
+        with (
+            patch.object(client_module, "RETRY_JITTER", jitter),
+            patch.object(client_module, "Retry", wraps=client_module.Retry) as retry,
+        ):
+            BackendClient("http://backend", backoff=0.25)
+
+        assert ("backoff_jitter" in retry.call_args.kwargs) is jitter
+
+    def test_in_flight_limit(self):
+        """No more than max_in_flight requests run concurrently."""
+        client = BackendClient("http://backend", max_in_flight=2)
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_request(**_):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        with (
+            patch.object(client.session, "request", side_effect=slow_request),
+            ThreadPoolExecutor(max_workers=8) as executor,
+        ):
+            list(executor.map(lambda _: client.request("POST", "load_time_data"), range(8)))
+        assert peak == 2  # noqa: PLR2004
+        assert client.latency_stats()["load_time_data"]["count"] == 8  # noqa: PLR2004
+
+
+class TestGetClient:
+    """Test the process-wide client."""
+
+    def test_client_shared_until_settings_change(self):
+        """One client is reused while the backend settings are unchanged."""
+        client_module._client = None  # noqa: SLF001
+        config = BaseConfig(_env_file="/nonexistent/env/file", BACKEND_URL="http://backend:8000")
+        first = get_client(config)
+        assert get_client(config) is first
+        assert first.session.verify is True
+
+        insecure = BaseConfig(
+            _env_file="/nonexistent/env/file", BACKEND_URL="http://backend:8000", INSECURE_REQUESTS=True
+        )
+        second = get_client(insecure)
+        assert second is not first
+        assert second.session.verify is False
+        client_module._client = None  # noqa: SLF001
@@ -0,0 +1,31 @@
+"""Tests for the provisioned grafana dashboards."""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+DASHBOARDS = Path(__file__).parents[1] / "opensampl" / "server" / "grafana" / "grafana-dashboards"
+
+
+def _raw_sql(node: object) -> Iterator[str]:
+    if isinstance(node, dict):
+        if "rawSql" in node:
+            yield node["rawSql"]
+        for value in node.values():
+            yield from _raw_sql(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _raw_sql(value)
+
+
+@pytest.mark.parametrize("dashboard", sorted(DASHBOARDS.glob("*.json")), ids=lambda path: path.name)
+def test_time_series_use_rollups(dashboard: Path):
+    """Panels read bucketed time data through series_rollup rather than bucketing raw readings themselves."""
+    queries = list(_raw_sql(json.loads(dashboard.read_text())))
+    assert queries
+    for query in queries:
+        assert "time_bucket" not in query
+        assert "AT TIME ZONE" not in query
+    assert any("castdb.series_rollup(" in query for query in queries)
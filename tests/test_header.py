@@ -0,0 +1,61 @@
+"""Tests for the shared commented header reader."""
+
+import gzip
+from unittest.mock import patch
+
+from opensampl.vendors.header import CommentedHeader
+from opensampl.vendors.microchip.twst import MicrochipTWSTProbe
+
+TWST_FILE = (
+    "# local:\n#   ip: 10.0.0.1\n# remotes:\n#   1: {}\n"
+    "timestamp,reading,value\n"
+    "2024-01-01T00:00:00Z,chan:1:meas:offset,3e-09\n"
+    "2024-01-01T00:00:01Z,chan:1:meas:offset,4e-09\n"
+)
+
+
+class TestCommentedHeader:
+    """Test reading the '#' header and the data after it."""
+
+    def test_fields_and_data(self, tmp_path):
+        """The header is parsed as YAML and the data is read from just after it."""
+        path = tmp_path / "twst.csv"
+        path.write_text(TWST_FILE)
+
+        header = CommentedHeader.read(path)
+        assert header.fields == {"local": {"ip": "10.0.0.1"}, "remotes": {1: {}}}
+        assert header.data_offset == TWST_FILE.index("timestamp")
+        df = header.read_csv()
+        assert df.columns.tolist() == ["timestamp", "reading", "value"]
+        assert df["value"].tolist() == [3e-09, 4e-09]
+
+    def test_gzip(self, tmp_path):
+        """Gzipped files are decompressed, with the offset counted in the decompressed data."""
+        path = tmp_path / "twst.csv.gz"
+        with gzip.open(path, "wt") as f:
+            f.write(TWST_FILE)
+
+        header = CommentedHeader.read(path)
+        assert header.fields["local"] == {"ip": "10.0.0.1"}
+        assert len(header.read_csv()) == 2
+
+    def test_no_header(self, tmp_path):
+        """A file without a header has no fields and its data starts at the beginning."""
+        path = tmp_path / "plain.csv"
+        path.write_text("a,b\n1,2\n")
+
+        header = CommentedHeader.read(path)
+        assert header.fields == {}
+        assert header.data_offset == 0
+        assert header.read_csv().to_dict("records") == [{"a": 1, "b": 2}]
+
+    def test_read_once_per_probe(self, tmp_path):
+        """A probe reads its file's header once, when it is created, and reuses it for its readings."""
+        path = tmp_path / "twst.csv"
+        path.write_text(TWST_FILE)
+
+        with patch.object(CommentedHeader, "read", wraps=CommentedHeader.read) as read:
+            probe = MicrochipTWSTProbe(path)
+            list(probe.parse_time_data())
+
+        read.assert_called_once_with(path)
@@ -0,0 +1,67 @@
+"""Tests for the backend's bounded ingest worker pool."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from opensampl.server.backend.ingest import IngestPool, IngestQueueFullError  # noqa: E402
+
+
+class TestIngestPool:
+    """Test that ingest jobs are bounded and tracked."""
+
+    def test_jobs_run_off_the_event_loop(self):
+        """The event loop keeps serving while jobs block, and no more than `workers` jobs run at once."""
+        pool = IngestPool(workers=2, queue_limit=10)
+        release = threading.Event()
+        loop_ticks = 0
+
+        async def main():
+            nonlocal loop_ticks
+            jobs = [asyncio.create_task(pool.run("test", release.wait, 5)) for _ in range(4)]
+            while pool.status()["in_flight"] < 2:  # noqa: PLR2004
+                await asyncio.sleep(0.01)
+            for _ in range(5):
+                loop_ticks += 1
+                await asyncio.sleep(0)
+            status = pool.status()
+            release.set()
+            await asyncio.gather(*jobs)
+            return status
+
+        status = asyncio.run(main())
+        assert loop_ticks == 5  # noqa: PLR2004
+        assert status["in_flight"] == 2  # noqa: PLR2004
+        assert status["queued"] == 2  # noqa: PLR2004
+        assert pool.status()["completed"] == 4  # noqa: PLR2004
+
+    def test_queue_limit(self):
+        """Jobs beyond the queue limit are refused rather than queued."""
+        pool = IngestPool(workers=1, queue_limit=1)
+
+        async def main():
+            first = asyncio.create_task(pool.run("test", time.sleep, 0.1))
+            await asyncio.sleep(0.02)
+            second = asyncio.create_task(pool.run("test", time.sleep, 0))
+            await asyncio.sleep(0)
+            with pytest.raises(IngestQueueFullError):
+                await pool.run("test", time.sleep, 0)
+            await asyncio.gather(first, second)
+
+        asyncio.run(main())
+        assert pool.status()["completed"] == 2  # noqa: PLR2004
+
+    def test_failed_jobs_counted(self):
+        """Exceptions propagate to the caller and are counted."""
+        pool = IngestPool(workers=1, queue_limit=1)
+
+        def boom():
+            raise ValueError("bad upload")
+
+        with pytest.raises(ValueError, match="bad upload"):
+            asyncio.run(pool.run("test", boom))
+        assert pool.status()["failed"] == 1
@@ -3,10 +3,15 @@
 from typing import Any
 from unittest.mock import Mock, patch
 
+import pandas as pd
 import pytest
 from sqlalchemy.orm import Session
 
-from opensampl.load_data import load_probe_metadata, write_to_table
+from opensampl.load.cache import SeriesIdentity
+from opensampl.load.data import DataFactory
+from opensampl.load_data import _probe_data_frame, load_probe_metadata, write_to_table
+from opensampl.metrics import METRICS, MetricType
+from opensampl.references import REF_TYPES
 from opensampl.vendors.constants import ProbeKey
 from tests.utils.mockdb import MockDB
 
@@ -75,9 +80,10 @@ class TestWriteToTable:
         """Test backend routing behavior with proper HTTP mocking."""
         # Setup mock config for backend routing
         with (
-            patch("opensampl.load.routing.requests.request") as mock_request,
+            patch("opensampl.load.routing.get_client") as mock_get_client,
             patch("opensampl.load.routing.BaseConfig") as mock_config_class,
         ):
+            mock_request = mock_get_client.return_value.request
             mock_config = Mock()
             mock_config.ROUTE_TO_BACKEND = True
             mock_config.BACKEND_URL = "http://localhost:8000"
@@ -98,8 +104,8 @@ class TestWriteToTable:
             # Verify backend call was made correctly
             mock_request.assert_called_once()
             args, kwargs = mock_request.call_args
-            assert kwargs["method"] == "POST"  # method
-            assert kwargs["url"] == "http://localhost:8000/write_to_table"
+            assert args == ("POST", "write_to_table")
+            mock_get_client.assert_called_with(mock_config)
             assert kwargs["headers"]["access-key"] == "test-api-key"
             expected_payload = {"table": "locations", "data": sample_table_data, "if_exists": "update"}
             assert kwargs["json"] == expected_payload
@@ -353,6 +359,108 @@ class TestLoadProbeMetadata:
         assert ntp_row.collection_ip == "10.0.0.5"
 
 
+class TestProbeDataFrame:
+    """Test how series data is split between the value and value_num columns."""
+
+    @staticmethod
+    def _identity(metric_type: MetricType) -> SeriesIdentity:
+        return SeriesIdentity(
+            series_id=7,
+            probe_uuid="p",
+            metric_type_uuid="m",
+            reference_uuid="r",
+            probe_readable="probe",
+            metric_type=metric_type,
+            cache_key=(),
+        )
+
+    def test_numeric_metric_uses_value_num(self, sample_time_data: pd.DataFrame):
+        """Float and int metrics are stored as floats in value_num with no JSON value."""
+        df = _probe_data_frame(self._identity(METRICS.PHASE_OFFSET), sample_time_data).data
+        assert df["value"].isna().all()
+        assert df["value_num"].dtype == "float64"
+        assert list(df["value_num"]) == list(sample_time_data["value"].astype(float))
+        assert (df["series_id"] == 7).all()
+
+    def test_object_metric_keeps_json_value(self):
+        """Readings of object typed metrics stay in the JSON value column."""
+        data = pd.DataFrame({"time": pd.date_range("2024-01-01", periods=2, tz="UTC"), "value": [{"a": 1}, "x"]})
+        df = _probe_data_frame(self._identity(METRICS.UNKNOWN), data).data
+        assert list(df["value"]) == [{"a": 1}, "x"]
+        assert df["value_num"].isna().all()
+
+    def test_validated_against_resolved_metric(self):
+        """A series that fell back to the UNKNOWN metric keeps values its declared numeric metric would reject."""
+        data = pd.DataFrame({"time": pd.date_range("2024-01-01", periods=2, tz="UTC"), "value": ["locked", 1.5]})
+        validated = _probe_data_frame(self._identity(METRICS.UNKNOWN), data)
+        assert list(validated.data["value"]) == ["locked", 1.5]
+        assert validated.rejects.empty
+
+    def test_rejects_are_labelled(self):
+        """Rows failing validation are set aside with their series and the reason they were rejected."""
+        data = pd.DataFrame(
+            {"time": pd.date_range("2024-01-01", periods=3, tz="UTC"), "value": [1e-9, float("inf"), "bad"]}
+        )
+        validated = _probe_data_frame(self._identity(METRICS.PHASE_OFFSET), data)
+        assert list(validated.data["value_num"]) == [1e-9]
+        assert validated.rejects[["series_id", "probe", "metric", "reason"]].to_dict("records") == [
+            {"series_id": 7, "probe": "probe", "metric": "Phase Offset", "reason": "non_finite"},
+            {"series_id": 7, "probe": "probe", "metric": "Phase Offset", "reason": "invalid"},
+        ]
+
+
+class TestSeriesResolution:
+    """Test that DataFactory resolves each probe/metric/reference combination to one series."""
+
+    def test_series_created_once(
+        self,
+        mock_config: Mock,
+        mock_session: Session,
+        sample_probe_key: ProbeKey,
+        sample_adva_metadata: dict,
+        test_db: MockDB,
+        mock_table_factory_with_mockdb: Any,
+    ):  # noqa: ARG002
+        """Resolving the same series again returns its existing series_id; another metric gets a new one."""
+        from opensampl.vendors.constants import VENDORS
+
+        load_probe_metadata(
+            vendor=VENDORS.ADVA, probe_key=sample_probe_key, data=sample_adva_metadata, session=mock_session
+        )
+
+        def resolve(metric):  # noqa: ANN001, ANN202
+            factory = DataFactory(sample_probe_key, metric, REF_TYPES.GNSS, session=mock_session)
+            return factory.identity(cache_key=())
+
+        first = resolve(METRICS.PHASE_OFFSET)
+        assert first.metric_type == METRICS.PHASE_OFFSET
+        assert resolve(METRICS.PHASE_OFFSET).series_id == first.series_id
+        assert resolve(METRICS.DELAY).series_id != first.series_id
+        assert mock_session.query(test_db.table_mappings["Series"]).count() == 2
+
+    def test_series_created_by_another_loader(
+        self,
+        mock_config: Mock,
+        mock_session: Session,
+        sample_probe_key: ProbeKey,
+        sample_adva_metadata: dict,
+        test_db: MockDB,
+        mock_table_factory_with_mockdb: Any,
+    ):  # noqa: ARG002
+        """A series another loader created since it was looked up is selected rather than inserted again."""
+        from opensampl.vendors.constants import VENDORS
+
+        load_probe_metadata(
+            vendor=VENDORS.ADVA, probe_key=sample_probe_key, data=sample_adva_metadata, session=mock_session
+        )
+        factory = DataFactory(sample_probe_key, METRICS.PHASE_OFFSET, REF_TYPES.GNSS, session=mock_session)
+        series_id = factory.series.series_id
+
+        factory.get_series()
+        assert factory.series.series_id == series_id
+        assert mock_session.query(test_db.table_mappings["Series"]).count() == 1
+
+
 class TestMockDb:
     """Tests for the mock database itself"""
 
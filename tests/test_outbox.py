@@ -0,0 +1,228 @@
+"""Tests for the local outbox of routed uploads."""
+
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+import requests
+
+from opensampl.config.base import BaseConfig
+from opensampl.load import routing
+from opensampl.load.outbox import Outbox
+from opensampl.load.series import SeriesBatch, series_frame
+from opensampl.load_data import load_probe_metadata, load_time_data_batch
+from opensampl.metrics import METRICS
+from opensampl.references import REF_TYPES
+from opensampl.vendors.constants import VENDORS, ProbeKey
+
+
+def _batch(start: int, rows: int = 3, probe_id: str = "1") -> SeriesBatch:
+    return SeriesBatch(
+        probe_key=ProbeKey(probe_id=probe_id, ip_address="10.0.0.1"),
+        metric=METRICS.PHASE_OFFSET,
+        reference_type=REF_TYPES.GNSS,
+        data=pd.DataFrame(
+            {
+                "time": pd.date_range("2024-01-01", periods=rows, freq="s", tz="UTC") + pd.Timedelta(seconds=start),
+                "value": [float(start + i) for i in range(rows)],
+            }
+        ),
+    )
+
+
+def _batch_payload(*series: SeriesBatch, strict: bool = True) -> dict:
+    """What load_time_data_batch returns when routed."""
+    return {
+        "data": {
+            "series_str": json.dumps([batch.identity_payload() for batch in series]),
+            "strict": json.dumps(strict),
+        },
+        "frame": series_frame(list(series)),
+        "name": "time_data_batch",
+    }
+
+
+def _http_error(status_code: int) -> requests.exceptions.HTTPError:
+    return requests.exceptions.HTTPError(f"{status_code} error", response=Mock(status_code=status_code))
+
+
+class TestOutbox:
+    """Test storage, merging, ordering and failure handling."""
+
+    def test_adjacent_time_data_merged_by_series(self, tmp_path):
+        """Runs of time data become one upload, with each series' rows combined; metadata stays in order."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        outbox.put("load_time_data_batch", _batch_payload(_batch(0), _batch(0, probe_id="2")))
+        outbox.put("load_time_data_batch", _batch_payload(_batch(3)))
+        outbox.put("load_probe_metadata", {"vendor": {}, "probe_key": {}, "data": {"name": "x"}})
+        outbox.put("load_time_data_batch", _batch_payload(_batch(6)))
+
+        send = Mock()
+        result = outbox.flush(send)
+
+        assert (result.sent, result.uploads, result.remaining) == (4, 3, 0)
+        assert [c.args[0] for c in send.call_args_list] == [
+            "load_time_data_batch",
+            "load_probe_metadata",
+            "load_time_data_batch",
+        ]
+        first = send.call_args_list[0].args[1]
+        assert len(json.loads(first["data"]["series_str"])) == 2
+        assert first["frame"].groupby("series").size().to_dict() == {0: 6, 1: 3}
+
+    def test_merge_respects_row_budget(self, tmp_path):
+        """Merging stops once the next upload would exceed max_batch_rows."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3", max_batch_rows=5)
+        for start in (0, 3, 6):
+            outbox.put("load_time_data_batch", _batch_payload(_batch(start)))
+
+        send = Mock()
+        assert outbox.flush(send).uploads == 3
+
+    def test_unavailable_backend_leaves_uploads_pending(self, tmp_path):
+        """Connection errors and 503s stop the flush without losing or failing anything."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        outbox.put("load_time_data_batch", _batch_payload(_batch(0)))
+
+        for error in (requests.exceptions.ConnectionError("down"), _http_error(503)):
+            result = outbox.flush(Mock(side_effect=error))
+            assert result.unavailable
+            assert result.remaining == 1
+
+        assert outbox.flush(Mock()).sent == 1
+        assert outbox.pending() == 0
+
+    def test_rejected_upload_isolated(self, tmp_path):
+        """A rejected merged upload is resent entry by entry, and only the bad entry is marked failed."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        outbox.put("load_time_data_batch", _batch_payload(_batch(0)))
+        outbox.put("load_time_data_batch", _batch_payload(_batch(3, probe_id="bad")))
+
+        def send(endpoint: str, payload: dict, send_file: bool):  # noqa: ARG001
+            if "bad" in payload["data"]["series_str"]:
+                raise _http_error(500)
+
+        result = outbox.flush(send)
+        assert (result.sent, result.failed, result.remaining) == (1, 1, 0)
+        assert outbox.errors()[0]["attempts"] == 1
+
+        assert outbox.retry_failed() == 1
+        assert outbox.flush(Mock()).sent == 1
+
+    def test_reads_do_not_wait_for_writers(self, tmp_path):
+        """Checking for pending uploads does not queue behind a flusher or loader holding the write lock."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        outbox.put("load_time_data_batch", _batch_payload(_batch(0)))
+
+        with closing(sqlite3.connect(outbox.path, isolation_level=None)) as writer:
+            writer.execute("BEGIN IMMEDIATE")
+            counted = []
+            reader = threading.Thread(target=lambda: counted.append(outbox.pending()), daemon=True)
+            reader.start()
+            reader.join(timeout=5)
+            writer.execute("ROLLBACK")
+
+        assert counted == [1]
+
+    def test_single_series_upload_stored_as_batch(self, tmp_path):
+        """load_time_data uploads are converted so they can be merged with batch uploads."""
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        batch = _batch(0)
+        outbox.put(
+            "load_time_data",
+            {
+                "data": {
+                    "probe_key_str": json.dumps(batch.probe_key.model_dump()),
+                    "metric_type_str": json.dumps(batch.metric.model_dump()),
+                    "reference_type_str": json.dumps(batch.reference_type.model_dump()),
+                    "compound_key_str": json.dumps(None),
+                },
+                "frame": batch.data,
+                "name": "time_data",
+            },
+        )
+        outbox.put("load_time_data_batch", _batch_payload(_batch(3)))
+
+        send = Mock()
+        outbox.flush(send)
+        send.assert_called_once()
+        payload = send.call_args.args[1]
+        assert json.loads(payload["data"]["series_str"]) == [batch.identity_payload()]
+        assert len(payload["frame"]) == 6
+
+
+class TestRoutedOutbox:
+    """Test how routed calls use the outbox."""
+
+    @pytest.fixture(autouse=True)
+    def reset_routing_state(self):
+        """Forget cached configuration between tests."""
+        routing.reset_config()
+        yield
+        routing.reset_config()
+
+    @staticmethod
+    def _config(tmp_path, mode: str) -> BaseConfig:
+        return BaseConfig(
+            _env_file="/nonexistent/env/file",
+            ROUTE_TO_BACKEND=True,
+            BACKEND_URL="http://backend:8000",
+            WIRE_FORMAT="csv",
+            OUTBOX_MODE=mode,
+            OUTBOX_PATH=tmp_path / "outbox.sqlite3",
+        )
+
+    def test_fallback_holds_uploads_while_backend_down(self, tmp_path):
+        """Uploads are stored instead of raising, and later uploads queue behind them."""
+        config = self._config(tmp_path, "fallback")
+        client = Mock()
+        client.request.side_effect = requests.exceptions.ConnectionError("down")
+        with (
+            patch("opensampl.load.routing.get_config", return_value=config),
+            patch("opensampl.load.routing.get_client", return_value=client),
+            patch.object(Outbox, "start_flusher") as start_flusher,
+        ):
+            assert load_time_data_batch(series=[_batch(0)]) is None
+            client.request.reset_mock(side_effect=True)
+            load_probe_metadata(vendor=VENDORS.ADVA, probe_key=_batch(0).probe_key, data={"name": "x"})
+
+            client.request.assert_not_called()
+            assert start_flusher.call_count == 2
+            outbox = routing.get_outbox(config)
+            assert [row["endpoint"] for row in outbox.status()] == ["load_probe_metadata", "load_time_data_batch"]
+
+            assert routing.flush_outbox(config).sent == 2
+            assert [c.args[1] for c in client.request.call_args_list] == [
+                "load_time_data_batch",
+                "load_probe_metadata",
+            ]
+
+    def test_rejected_upload_still_raises(self, tmp_path):
+        """Only unavailability is deferred; a backend rejecting the upload is reported to the caller."""
+        config = self._config(tmp_path, "fallback")
+        client = Mock()
+        client.request.return_value.raise_for_status.side_effect = _http_error(409)
+        with (
+            patch("opensampl.load.routing.get_config", return_value=config),
+            patch("opensampl.load.routing.get_client", return_value=client),
+            pytest.raises(requests.exceptions.HTTPError),
+        ):
+            load_time_data_batch(series=[_batch(0)])
+        assert routing.get_outbox(config).pending() == 0
+
+    def test_off_by_default(self, tmp_path):
+        """Without OUTBOX_MODE, failures raise as before and nothing is written locally."""
+        config = self._config(tmp_path, "off")
+        client = Mock()
+        client.request.side_effect = requests.exceptions.ConnectionError("down")
+        with (
+            patch("opensampl.load.routing.get_config", return_value=config),
+            patch("opensampl.load.routing.get_client", return_value=client),
+            pytest.raises(requests.exceptions.ConnectionError),
+        ):
+            load_time_data_batch(series=[_batch(0)])
+        assert not (tmp_path / "outbox.sqlite3").exists()
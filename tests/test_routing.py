@@ -0,0 +1,100 @@
+"""Tests for the process-wide configuration and engine handling in opensampl.load.routing."""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from opensampl.config.base import BaseConfig
+from opensampl.load import routing
+
+
+@pytest.fixture(autouse=True)
+def reset_routing_state():
+    """Ensure each test starts without a cached config or engine."""
+    routing.reset_config()
+    routing._engine = None  # noqa: SLF001
+    routing._engine_key = None  # noqa: SLF001
+    yield
+    routing.reset_config()
+    if routing._engine is not None:  # noqa: SLF001
+        routing._engine.dispose()  # noqa: SLF001
+    routing._engine = None  # noqa: SLF001
+    routing._engine_key = None  # noqa: SLF001
+
+
+class TestGetConfig:
+    """Test the cached configuration snapshot."""
+
+    def test_config_is_cached(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """Repeated calls share one config object while the env file is unchanged."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / ".env").write_text("LOG_LEVEL=DEBUG\n")
+        with patch.dict("os.environ", clear=True):
+            first = routing.get_config()
+            assert routing.get_config() is first
+            assert first.LOG_LEVEL == "DEBUG"
+
+    def test_config_reloads_when_env_file_changes(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """Touching the env file invalidates the snapshot."""
+        monkeypatch.chdir(tmp_path)
+        env_file = tmp_path / ".env"
+        env_file.write_text("LOG_LEVEL=DEBUG\n")
+        with patch.dict("os.environ", clear=True):
+            first = routing.get_config()
+            env_file.write_text("LOG_LEVEL=ERROR\n")
+            later = time.time() + 5
+            os.utime(env_file, (later, later))
+
+            second = routing.get_config()
+            assert second is not first
+            assert second.LOG_LEVEL == "ERROR"
+
+
+class TestGetEngine:
+    """Test the process-wide engine and its pool settings."""
+
+    def test_engine_shared_across_threads(self):
+        """Concurrent first use creates a single engine."""
+        config = BaseConfig(_env_file="/nonexistent/env/file", DATABASE_URL="sqlite://")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            engines = list(executor.map(lambda _: routing.get_engine(config), range(32)))
+        assert len({id(e) for e in engines}) == 1
+
+    def test_pool_options_from_config(self):
+        """Pool settings from the config are passed to create_engine for server databases."""
+        config = BaseConfig(
+            _env_file="/nonexistent/env/file",
+            DATABASE_URL="postgresql://user:pw@localhost:5432/db",
+            DB_POOL_SIZE=12,
+            DB_MAX_OVERFLOW=3,
+            DB_POOL_PRE_PING=False,
+            DB_POOL_RECYCLE=60,
+        )
+        engine = routing.get_engine(config)
+        assert engine.pool.size() == 12
+        assert engine.pool._max_overflow == 3  # noqa: SLF001
+        assert engine.pool._pre_ping is False  # noqa: SLF001
+        assert engine.pool._recycle == 60  # noqa: SLF001
+
+        status = routing.pool_status()
+        assert status["size"] == 12
+        assert status["checked_out"] == 0
+
+    def test_engine_rebuilt_when_settings_change(self):
+        """A different database url or pool size replaces the engine."""
+        first = routing.get_engine(BaseConfig(_env_file="/nonexistent/env/file", DATABASE_URL="sqlite://"))
+        second = routing.get_engine(
+            BaseConfig(_env_file="/nonexistent/env/file", DATABASE_URL="postgresql://user:pw@localhost/db")
+        )
+        assert first is not second
+        assert routing.get_engine(
+            BaseConfig(_env_file="/nonexistent/env/file", DATABASE_URL="postgresql://user:pw@localhost/db")
+        ) is second
+
+    def test_pool_status_without_engine(self):
+        """No statistics are reported before any engine exists."""
+        assert routing.pool_status() == {}
@@ -0,0 +1,95 @@
+"""Tests for streaming discovery of probe files."""
+
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+from opensampl.load.scan import PathFilter, scan_files
+from opensampl.vendors.adva import AdvaProbe
+from opensampl.vendors.base_probe import LoadConfig
+
+
+def _touch(root: Path, *names: str) -> None:
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+def _relative(root: Path, paths) -> list[str]:
+    return [path.relative_to(root).as_posix() for path in paths]
+
+
+class TestScanFiles:
+    """Test walking and filtering directory trees."""
+
+    def test_top_level_only(self, tmp_path):
+        """Subdirectories are only walked when recursive."""
+        _touch(tmp_path, "a.txt", "sub/b.txt")
+        assert _relative(tmp_path, scan_files(tmp_path)) == ["a.txt"]
+        assert sorted(_relative(tmp_path, scan_files(tmp_path, recursive=True))) == ["a.txt", "sub/b.txt"]
+
+    def test_include_exclude(self, tmp_path):
+        """Globs match the name or relative path, and re: patterns are searched for in the relative path."""
+        _touch(tmp_path, "a.txt.gz", "b.csv", "2024/c.txt.gz", "2025/d.txt.gz")
+        path_filter = PathFilter(include=["*.gz"], exclude=["re:^2025/"])
+        found = _relative(tmp_path, scan_files(tmp_path, recursive=True, path_filter=path_filter))
+        assert sorted(found) == ["2024/c.txt.gz", "a.txt.gz"]
+
+    def test_skip_archive(self, tmp_path):
+        """Skipped directories, such as the archive, are not walked."""
+        _touch(tmp_path, "a.txt", "archive/2024/a.txt")
+        found = _relative(tmp_path, scan_files(tmp_path, recursive=True, skip=[tmp_path / "archive"]))
+        assert found == ["a.txt"]
+
+    def test_sorted_by_key(self, tmp_path):
+        """With a sort key, files are ordered by it, with unkeyed files last."""
+        _touch(tmp_path, "c-1.txt", "a-3.txt", "b-2.txt", "other.txt")
+
+        def key(path: Path) -> int | None:
+            return int(path.stem.split("-")[1]) if "-" in path.stem else None
+
+        assert _relative(tmp_path, scan_files(tmp_path, sort_key=key)) == ["c-1.txt", "b-2.txt", "a-3.txt", "other.txt"]
+
+    def test_adva_orders_by_file_timestamp(self, tmp_path):
+        """ADVA files are loaded oldest first, from the timestamp in their name."""
+        names = [
+            "10.0.0.1CLOCK_PROBE-1-1-2024-03-01-00-00-00.txt.gz",
+            "10.0.0.2CLOCK_PROBE-1-1-2024-01-01-00-00-00.txt.gz",
+            "10.0.0.1CLOCK_PROBE-1-1-2024-02-01-00-00-00.txt.gz",
+        ]
+        _touch(tmp_path, *names, "notes.txt")
+        config = LoadConfig(filepath=tmp_path, archive_dir=tmp_path / "archive")
+        found = _relative(tmp_path, AdvaProbe._scan_directory(config))
+        assert found == [names[1], names[2], names[0]]
+
+
+class TestStreamingSubmission:
+    """Test that directory loads take files as workers free up."""
+
+    def test_bounded_queue(self, tmp_path):
+        """Only a few files beyond the number of workers are taken from the scan at a time."""
+        consumed = []
+        release = threading.Event()
+
+        def files():
+            for index in range(100):
+                consumed.append(index)
+                yield tmp_path / f"{index}.txt"
+
+        def process(*args, **kwargs):  # noqa: ARG001
+            assert release.wait(timeout=5)
+
+        config = LoadConfig(filepath=tmp_path, archive_dir=tmp_path / "archive", max_workers=2)
+        with patch.object(AdvaProbe, "process_single_file", side_effect=process):
+            worker = threading.Thread(
+                target=AdvaProbe._process_files_in_threads, args=(files(), config, {}, None), daemon=True
+            )
+            worker.start()
+            worker.join(timeout=0.5)
+            in_flight = len(consumed)
+            release.set()
+            worker.join(timeout=5)
+
+        assert in_flight <= 2 * config.max_workers + 1
+        assert len(consumed) == 100
@@ -0,0 +1,150 @@
+"""Tests for SeriesBatch and multi-series loading."""
+
+import io
+import json
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from opensampl.load.series import SeriesBatch
+from opensampl.load_data import load_time_data_batch
+from opensampl.metrics import METRICS
+from opensampl.references import REF_TYPES
+from opensampl.vendors.base_probe import run_series_pipeline
+from opensampl.vendors.constants import ProbeKey
+from opensampl.vendors.microchip.twst import MicrochipTWSTProbe
+
+
+def _batch(rows: int, metric=METRICS.PHASE_OFFSET) -> SeriesBatch:
+    return SeriesBatch(
+        probe_key=ProbeKey(probe_id="1", ip_address="10.0.0.1"),
+        metric=metric,
+        reference_type=REF_TYPES.GNSS,
+        data=pd.DataFrame(
+            {"time": pd.date_range("2024-01-01", periods=rows, freq="s", tz="UTC"), "value": range(rows)}
+        ),
+    )
+
+
+class TestSeriesBatch:
+    """Test construction and serialization of series batches."""
+
+    def test_from_wide_frame(self):
+        """Each metric column becomes its own series, skipping null readings."""
+        wide = pd.DataFrame(
+            {
+                "time": pd.date_range("2024-01-01", periods=3, freq="s", tz="UTC"),
+                "offset": [1.0, None, 3.0],
+                "delay": [0.1, 0.2, 0.3],
+            }
+        )
+        batches = SeriesBatch.from_wide_frame(
+            wide,
+            {"offset": METRICS.PHASE_OFFSET, "delay": METRICS.DELAY},
+            probe_key=ProbeKey(probe_id="1", ip_address="10.0.0.1"),
+        )
+        assert [b.metric for b in batches] == [METRICS.PHASE_OFFSET, METRICS.DELAY]
+        assert list(batches[0].data["value"]) == [1.0, 3.0]
+        assert len(batches[1]) == 3
+
+    def test_identity_payload_round_trip(self):
+        """A compound reference type survives serialization for the backend."""
+        batch = _batch(2).model_copy(
+            update={"reference_type": REF_TYPES.PROBE, "compound_reference": {"ip_address": "10.0.0.2"}}
+        )
+        payload = json.loads(json.dumps(batch.identity_payload()))
+        rebuilt = SeriesBatch.from_identity_payload(payload, batch.data)
+        assert rebuilt.reference_type == REF_TYPES.PROBE
+        assert rebuilt.identity_payload() == batch.identity_payload()
+
+    def test_split(self):
+        """Splitting keeps the identity and caps the readings per piece."""
+        pieces = _batch(5).split(2)
+        assert [len(p) for p in pieces] == [2, 2, 1]
+        assert all(p.metric == METRICS.PHASE_OFFSET for p in pieces)
+
+
+class TestLoadTimeDataBatch:
+    """Test the batch loading entry point."""
+
+    def test_backend_payload(self, mock_config_backend):  # noqa: ARG002
+        """All series are sent as one file with an index column pointing at their identities."""
+        with patch("opensampl.load.routing.get_client") as mock_get_client:
+            load_time_data_batch(series=[_batch(2), _batch(3, METRICS.DELAY)])
+
+        args, kwargs = mock_get_client.return_value.request.call_args
+        assert args == ("POST", "load_time_data_batch")
+        series_payload = json.loads(kwargs["data"]["series_str"])
+        assert len(series_payload) == 2
+        sent = pd.read_csv(io.BytesIO(kwargs["files"]["file"][1]))
+        assert list(sent["series"]) == [0, 0, 1, 1, 1]
+
+
+class TestSendBatch:
+    """Test chunking of series into batch loads."""
+
+    def test_chunks_group_series(self):
+        """Series are packed together so each load holds at most chunk_size rows."""
+        with patch("opensampl.vendors.base_probe.load_time_data_batch") as mock_load:
+            probe = MicrochipTWSTProbe.__new__(MicrochipTWSTProbe)
+            probe.chunk_size = 4
+            probe.send_batch([_batch(3), _batch(1), _batch(5)])
+
+        sizes = [[len(b) for b in call.kwargs["series"]] for call in mock_load.call_args_list]
+        assert sizes == [[3, 1], [4], [1]]
+
+    def test_unchunked_single_load(self):
+        """Without a chunk size every series goes in a single load."""
+        with patch("opensampl.vendors.base_probe.load_time_data_batch") as mock_load:
+            MicrochipTWSTProbe.send_batch([_batch(3), _batch(1)])
+        mock_load.assert_called_once()
+
+
+class TestSeriesPipeline:
+    """Test loading series while they are still being parsed."""
+
+    def test_loads_while_parsing(self):
+        """Loads start before the parser has finished, and at most max_pending are outstanding."""
+        release = threading.Event()
+        loaded = []
+
+        def parse():
+            for _ in range(4):
+                yield _batch(2)
+            # The first load was handed off before parsing got here
+            assert release.wait(timeout=5)
+
+        def load(group):
+            loaded.append(sum(len(b) for b in group))
+            release.set()
+
+        assert run_series_pipeline(parse(), chunk_size=2, max_pending=1, load=load) == 4
+        assert loaded == [2, 2, 2, 2]
+
+    def test_failed_load_stops_parsing(self):
+        """A load error is raised without parsing the rest of the input."""
+        parsed = []
+
+        def parse():
+            for index in range(100):
+                parsed.append(index)
+                yield _batch(1)
+
+        def load(group):  # noqa: ARG001
+            raise RuntimeError("load failed")
+
+        with pytest.raises(RuntimeError, match="load failed"):
+            run_series_pipeline(parse(), chunk_size=1, max_pending=1, load=load)
+        assert len(parsed) < 100
+
+    def test_process_time_data_loads_parsed_series(self):
+        """process_time_data hands the vendor's parsed series to a single load when unchunked."""
+        with patch("opensampl.vendors.base_probe.load_time_data_batch") as mock_load:
+            probe = MicrochipTWSTProbe.__new__(MicrochipTWSTProbe)
+            probe.chunk_size = None
+            with patch.object(MicrochipTWSTProbe, "parse_time_data", return_value=iter([_batch(2), _batch(3)])):
+                probe.process_time_data()
+        mock_load.assert_called_once()
+        assert [len(b) for b in mock_load.call_args.kwargs["series"]] == [2, 3]
@@ -0,0 +1,137 @@
+"""Tests for the process-level series resolution cache."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from opensampl.load.cache import SeriesCache, SeriesIdentity
+from opensampl.load.data import DataFactory
+from opensampl.metrics import METRICS
+from opensampl.references import REF_TYPES
+from opensampl.vendors.constants import ProbeKey
+from tests.utils.mockdb import MockDB
+
+
+def _identity(cache: SeriesCache, probe_key: ProbeKey, metric=METRICS.PHASE_OFFSET) -> SeriesIdentity:
+    key = cache.make_key(probe_key, metric, REF_TYPES.GNSS, None, True)
+    return SeriesIdentity(
+        series_id=1,
+        probe_uuid=f"probe-{probe_key!r}",
+        metric_type_uuid="metric",
+        reference_uuid="reference",
+        probe_readable=str(probe_key),
+        metric_type=metric,
+        cache_key=key,
+    )
+
+
+class TestSeriesCache:
+    """Test LRU, TTL, invalidation and counters of SeriesCache."""
+
+    def test_hit_and_miss_counters(self, sample_probe_key: ProbeKey):
+        """Lookups before and after a put are counted."""
+        cache = SeriesCache()
+        identity = _identity(cache, sample_probe_key)
+        assert cache.get(identity.cache_key) is None
+        cache.put(identity)
+        assert cache.get(identity.cache_key) == identity
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+        assert stats["hit_rate"] == pytest.approx(0.5)
+
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted when full."""
+        cache = SeriesCache(maxsize=2)
+        first, second, third = (_identity(cache, ProbeKey(probe_id=str(i), ip_address="10.0.0.1")) for i in range(3))
+        cache.put(first)
+        cache.put(second)
+        cache.get(first.cache_key)
+        cache.put(third)
+
+        assert cache.get(second.cache_key) is None
+        assert cache.get(first.cache_key) == first
+        assert cache.get(third.cache_key) == third
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, sample_probe_key: ProbeKey):
+        """Entries older than the ttl are treated as misses."""
+        cache = SeriesCache(ttl=10)
+        identity = _identity(cache, sample_probe_key)
+        with patch("opensampl.load.cache.time.monotonic", return_value=100.0):
+            cache.put(identity)
+        with patch("opensampl.load.cache.time.monotonic", return_value=105.0):
+            assert cache.get(identity.cache_key) == identity
+        with patch("opensampl.load.cache.time.monotonic", return_value=111.0):
+            assert cache.get(identity.cache_key) is None
+
+    def test_invalidate_probe(self, sample_probe_key: ProbeKey):
+        """Invalidating a probe only drops that probe's series."""
+        cache = SeriesCache()
+        other = ProbeKey(probe_id="other", ip_address="10.0.0.2")
+        cache.put(_identity(cache, sample_probe_key))
+        cache.put(_identity(cache, sample_probe_key, metric=METRICS.EB_NO))
+        cache.put(_identity(cache, other))
+
+        assert cache.invalidate(sample_probe_key) == 2
+        assert cache.stats()["size"] == 1
+
+    def test_invalidate_table(self, sample_probe_key: ProbeKey):
+        """Writes to identity tables clear the cache; other tables do not."""
+        cache = SeriesCache()
+        cache.put(_identity(cache, sample_probe_key))
+        cache.invalidate_table("locations")
+        assert cache.stats()["size"] == 1
+        cache.invalidate_table("metric_type")
+        assert cache.stats()["size"] == 0
+
+    def test_preload_types(self, mock_session: Session, test_db: MockDB):
+        """Metric and reference types are loaded by name."""
+        cache = SeriesCache()
+        with (
+            patch("opensampl.load.cache.DBMetricType", test_db.table_mappings["MetricType"]),
+            patch("opensampl.load.cache.DBReferenceType", test_db.table_mappings["ReferenceType"]),
+        ):
+            cache.preload(mock_session)
+        assert cache.preloaded
+        assert cache.type_uuid("metric_type", METRICS.PHASE_OFFSET.name) is not None
+        assert cache.type_uuid("reference_type", REF_TYPES.GNSS.name) is not None
+
+    def test_preloaded_types_expire(self, mock_session: Session, test_db: MockDB):
+        """Preloaded types share the ttl of series identities, and are loaded again once it has passed."""
+        cache = SeriesCache(ttl=10)
+        with (
+            patch("opensampl.load.cache.DBMetricType", test_db.table_mappings["MetricType"]),
+            patch("opensampl.load.cache.DBReferenceType", test_db.table_mappings["ReferenceType"]),
+        ):
+            with patch("opensampl.load.cache.time.monotonic", return_value=100.0):
+                cache.preload(mock_session)
+            with patch("opensampl.load.cache.time.monotonic", return_value=111.0):
+                assert cache.type_uuid("metric_type", METRICS.PHASE_OFFSET.name) is None
+                assert not cache.preloaded
+                cache.preload(mock_session)
+                assert cache.type_uuid("metric_type", METRICS.PHASE_OFFSET.name) is not None
+
+
+class TestDataFactoryResolve:
+    """Test DataFactory.resolve uses the series cache."""
+
+    def test_cached_resolution_skips_database(self, sample_probe_key: ProbeKey):
+        """A cached identity is returned without touching the session."""
+        cache = SeriesCache()
+        identity = _identity(cache, sample_probe_key)
+        cache.put(identity)
+        session = Mock(spec=Session)
+
+        with patch("opensampl.load.data.series_cache", cache):
+            resolved = DataFactory.resolve(
+                probe_key=sample_probe_key,
+                metric_type=METRICS.PHASE_OFFSET,
+                reference_type=REF_TYPES.GNSS,
+                session=session,
+            )
+
+        assert resolved == identity
+        session.execute.assert_not_called()
+        session.query.assert_not_called()
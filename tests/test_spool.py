@@ -0,0 +1,138 @@
+"""Tests for the backend's durable ingest spool."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+from sqlalchemy.exc import OperationalError
+
+pytest.importorskip("prometheus_client")
+
+from opensampl.load.series import SeriesBatch  # noqa: E402
+from opensampl.metrics import METRICS  # noqa: E402
+from opensampl.references import REF_TYPES  # noqa: E402
+from opensampl.server.backend.spool import IngestSpool, is_database_unavailable  # noqa: E402
+from opensampl.vendors.constants import ProbeKey  # noqa: E402
+
+LOAD_BATCH = "opensampl.server.backend.spool.load_data.load_time_data_batch"
+
+
+def _batch(start: int, rows: int = 3, probe_id: str = "1") -> SeriesBatch:
+    return SeriesBatch(
+        probe_key=ProbeKey(probe_id=probe_id, ip_address="10.0.0.1"),
+        metric=METRICS.PHASE_OFFSET,
+        reference_type=REF_TYPES.GNSS,
+        data=pd.DataFrame(
+            {
+                "time": pd.date_range("2024-01-01", periods=rows, freq="s", tz="UTC") + pd.Timedelta(seconds=start),
+                "value": [float(start + i) for i in range(rows)],
+            }
+        ),
+    )
+
+
+def _wait_for(spool: IngestSpool, job_ids: list[str], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(spool.status(j).status in ("done", "failed") for j in job_ids):
+            return
+        time.sleep(0.01)
+    raise AssertionError("spooled jobs did not finish")
+
+
+class TestIngestSpool:
+    """Test acceptance, coalescing, failure isolation, and recovery."""
+
+    def test_uploads_for_same_series_coalesced(self, tmp_path):
+        """Small uploads for one series become a single write of their combined rows."""
+        with patch(LOAD_BATCH) as mock_load:
+            spool = IngestSpool(tmp_path, MagicMock(), writers=1, max_wait=0.2)
+            jobs = [spool.submit([_batch(start)]) for start in (0, 3, 6)]
+            _wait_for(spool, [j.job_id for j in jobs])
+            spool.stop()
+
+        mock_load.assert_called_once()
+        series = mock_load.call_args.kwargs["series"]
+        assert len(series) == 1
+        assert len(series[0].data) == 9
+        assert all(spool.status(j.job_id).status == "done" for j in jobs)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_bad_upload_isolated(self, tmp_path):
+        """When a coalesced write fails, the others are retried alone and only the bad upload fails."""
+
+        def load(series, strict, session):  # noqa: ARG001
+            if any(batch.probe_key.probe_id == "bad" for batch in series):
+                raise ValueError("unknown probe")
+
+        with patch(LOAD_BATCH, side_effect=load):
+            spool = IngestSpool(tmp_path, MagicMock(), writers=1, max_wait=0.2)
+            good = spool.submit([_batch(0)])
+            bad = spool.submit([_batch(0, probe_id="bad")])
+            _wait_for(spool, [good.job_id, bad.job_id])
+            spool.stop()
+
+        assert spool.status(good.job_id).status == "done"
+        assert spool.status(bad.job_id).status == "failed"
+        assert sorted(p.name for p in (tmp_path / "failed").iterdir()) == sorted(
+            [bad.data_file, f"{bad.job_id}.json"]
+        )
+
+    def test_database_outage_requeues(self, tmp_path):
+        """Uploads stay queued while the database is unreachable."""
+        outage = OperationalError("SELECT 1", {}, Exception("connection refused"))
+        with patch(LOAD_BATCH, side_effect=[outage, None]) as mock_load:
+            spool = IngestSpool(tmp_path, MagicMock(), writers=1, max_wait=0, retry_delay=0.01)
+            job = spool.submit([_batch(0)])
+            _wait_for(spool, [job.job_id])
+            spool.stop()
+
+        assert mock_load.call_count == 2
+        assert spool.status(job.job_id).status == "done"
+
+    def test_statement_errors_not_requeued(self, tmp_path):
+        """Errors from a connected database, such as a statement timeout, fail the upload instead of looping on it."""
+        timeout = Exception("canceling statement due to statement timeout")
+        timeout.pgcode = "57014"  # ty: ignore[unresolved-attribute]
+        with patch(LOAD_BATCH, side_effect=OperationalError("INSERT", {}, timeout)) as mock_load:
+            spool = IngestSpool(tmp_path, MagicMock(), writers=1, max_wait=0, retry_delay=0.01)
+            job = spool.submit([_batch(0)])
+            _wait_for(spool, [job.job_id])
+            spool.stop()
+
+        assert mock_load.call_count == 1
+        assert spool.status(job.job_id).status == "failed"
+
+    @pytest.mark.parametrize(
+        ("pgcode", "unavailable"), [(None, True), ("08006", True), ("57P01", True), ("57014", False), ("53200", False)]
+    )
+    def test_database_unavailable(self, pgcode, unavailable):
+        """Only connection failures, or a server shutting down or starting up, mean the database is unavailable."""
+        orig = Exception("error")
+        orig.pgcode = pgcode  # ty: ignore[unresolved-attribute]
+        assert is_database_unavailable(OperationalError("SELECT 1", {}, orig)) is unavailable
+
+    def test_recovered_after_restart(self, tmp_path):
+        """Accepted uploads left in the spool are written when the backend starts again."""
+        stopped = IngestSpool(tmp_path, MagicMock(), writers=0)
+        job = stopped.submit([_batch(0), _batch(10)])
+        (tmp_path / ".orphan.arrow.tmp").write_bytes(b"partial")
+
+        with patch(LOAD_BATCH) as mock_load:
+            spool = IngestSpool(tmp_path, MagicMock(), writers=1, max_wait=0)
+            _wait_for(spool, [job.job_id])
+            spool.stop()
+
+        assert len(mock_load.call_args.kwargs["series"]) == 1
+        assert len(mock_load.call_args.kwargs["series"][0].data) == 6
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_times_rejected_before_spooling(self, tmp_path):
+        """Uploads with unparseable times are refused rather than accepted."""
+        spool = IngestSpool(tmp_path, MagicMock(), writers=0)
+        batch = _batch(0)
+        batch.data["time"] = ["not a time"] * 3
+        with pytest.raises(ValueError, match="not a time"):
+            spool.submit([batch])
+        assert list(tmp_path.iterdir()) == []
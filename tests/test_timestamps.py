@@ -0,0 +1,80 @@
+"""Tests for time column normalization."""
+
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from opensampl.load.series import SeriesBatch
+from opensampl.load.timestamps import ISO8601, detect_time_format, normalize_time_column
+from opensampl.vendors.constants import ProbeKey
+from opensampl.vendors.microchip.twst import MicrochipTWSTProbe
+
+EXPECTED = pd.Series(pd.to_datetime(["2024-01-01 00:00:00", "2024-01-01 00:00:01"], utc=True))
+
+
+class TestDetectTimeFormat:
+    """Test detecting the format of a time column from a sample."""
+
+    @pytest.mark.parametrize(
+        ("times", "expected"),
+        [
+            (["2024-01-01T00:00:00Z", "2024-01-01T00:00:01.5Z"], (ISO8601, None)),
+            (["2024-01-01 00:00:00+00:00", "2024-01-01 00:00:01-05:00"], (ISO8601, None)),
+            (["2024-01-01T00:00:00", "2024-01-01T00:00:01+02:00"], (None, None)),
+            (["01/01/2024 00:00:00", "01/01/2024 00:00:01"], (None, None)),
+            ([1_704_067_200, 1_704_067_201], (None, "s")),
+            ([1_704_067_200_000, 1_704_067_201_000], (None, "ms")),
+            (["1704067200.5", "1704067201"], (None, "s")),
+        ],
+    )
+    def test_detect(self, times, expected):
+        """Uniform ISO-8601 strings and epochs are detected; anything else is left to mixed parsing."""
+        assert detect_time_format(pd.Series(times)) == expected
+
+
+class TestNormalizeTimeColumn:
+    """Test converting time columns to UTC datetimes."""
+
+    @pytest.mark.parametrize(
+        ("times", "kwargs"),
+        [
+            (["2024-01-01T00:00:00Z", "2024-01-01T00:00:01Z"], {}),
+            (["2024-01-01T02:00:00+02:00", "2023-12-31T19:00:01-05:00"], {}),
+            ([1_704_067_200, 1_704_067_201], {}),
+            ([1_704_067_200_000, 1_704_067_201_000], {"unit": "ms"}),
+            (["2024-01-01,00:00:00", "2024-01-01,00:00:01"], {"time_format": "%Y-%m-%d,%H:%M:%S"}),
+            (["Jan 1 2024 00:00:00", "Jan 1 2024 00:00:01"], {}),
+        ],
+    )
+    def test_formats(self, times, kwargs):
+        """Each supported form of time is converted to the same UTC datetimes."""
+        pd.testing.assert_series_equal(normalize_time_column(pd.Series(times), **kwargs), EXPECTED)
+
+    def test_failed_rows_fall_back(self):
+        """Rows that do not match the declared format are parsed one by one, and only those rows."""
+        times = pd.Series(["2024-01-01,00:00:00", "2024-01-01T00:00:01Z"])
+        with patch("opensampl.load.timestamps.pd.to_datetime", wraps=pd.to_datetime) as to_datetime:
+            parsed = normalize_time_column(times, time_format="%Y-%m-%d,%H:%M:%S")
+
+        pd.testing.assert_series_equal(parsed, EXPECTED)
+        fallback = to_datetime.call_args_list[-1]
+        assert fallback.kwargs["format"] == "mixed"
+        assert fallback.args[0].tolist() == ["2024-01-01T00:00:01Z"]
+
+    def test_unparseable(self):
+        """Times that cannot be parsed at all are rejected."""
+        with pytest.raises(ValueError):
+            normalize_time_column(pd.Series(["2024-01-01T00:00:00Z", "not a time"]))
+
+    def test_vendor_hint(self):
+        """Probes convert the times of their series with their declared format before loading them."""
+        batch = SeriesBatch(
+            probe_key=ProbeKey(probe_id="modem", ip_address="10.0.0.1"),
+            data=pd.DataFrame({"time": ["2024-01-01T00:00:00Z", "2024-01-01T00:00:01Z"], "value": [1.0, 2.0]}),
+        )
+        with patch("opensampl.load.timestamps.detect_time_format") as detect:
+            (normalized,) = MicrochipTWSTProbe.normalize_times([batch])
+
+        detect.assert_not_called()
+        pd.testing.assert_series_equal(normalized.data["time"], EXPECTED, check_names=False)
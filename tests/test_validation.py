@@ -0,0 +1,83 @@
+"""Tests for validating time data values against their metric."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from opensampl.load.validation import ValidationStats, validate_values, write_rejects
+from opensampl.metrics import METRICS, MetricType
+
+
+def _frame(values: list) -> pd.DataFrame:
+    return pd.DataFrame({"time": pd.date_range("2024-01-01", periods=len(values), freq="s", tz="UTC"), "value": values})
+
+
+class TestValidateValues:
+    """Test coercing and rejecting values by metric type."""
+
+    def test_numeric(self):
+        """Numeric values are coerced to float64, losing missing, non-numeric and infinite values."""
+        validated = validate_values(_frame([1.5, "2e-9", None, "x", np.inf, -np.inf]), METRICS.PHASE_OFFSET)
+        assert validated.data["value"].dtype == "float64"
+        assert validated.data["value"].tolist() == [1.5, 2e-9]
+        assert validated.rejects["reason"].tolist() == ["missing", "invalid", "non_finite", "non_finite"]
+
+    def test_int_range(self):
+        """Int metrics reject fractional values, and metrics with a known range reject values outside it."""
+        validated = validate_values(_frame([1, 2.5, 17, -1, "3"]), METRICS.STRATUM)
+        assert validated.data["value"].tolist() == [1.0, 3.0]
+        assert validated.rejects["reason"].tolist() == ["out_of_range"] * 3
+
+    def test_duplicate_times(self):
+        """Only the first valid reading at each time is kept."""
+        data = _frame([None, 1.0, 2.0, 3.0])
+        data.loc[1:, "time"] = data.loc[0, "time"]
+        validated = validate_values(data, METRICS.PHASE_OFFSET)
+        assert validated.data["value"].tolist() == [1.0]
+        assert validated.rejects["reason"].tolist() == ["missing", "duplicate_time", "duplicate_time"]
+
+    def test_missing_times(self):
+        """Rows without a time are rejected rather than failing the batch, and take no part in duplicate checks."""
+        data = _frame([1.0, 2.0, "x", 3.0])
+        data.loc[1:2, "time"] = pd.NaT
+        validated = validate_values(data, METRICS.PHASE_OFFSET)
+        assert validated.data["value"].tolist() == [1.0, 3.0]
+        assert validated.rejects["reason"].tolist() == ["missing_time", "missing_time"]
+        assert validated.stats.missing_time == 2  # noqa: PLR2004
+
+    @pytest.mark.parametrize(
+        ("value_type", "values", "kept", "reasons"),
+        [
+            (str, ["a", 1, None, np.inf], ["a", "1"], ["missing", "non_finite"]),
+            (bool, ["true", "False", 1, "maybe"], [True, False, True], ["invalid"]),
+            (dict, [{"a": 1}, [1], "x"], [{"a": 1}], ["invalid", "invalid"]),
+            (object, [{"a": 1}, "x", float("nan"), np.inf], [{"a": 1}, "x"], ["missing", "non_finite"]),
+        ],
+    )
+    def test_object_types(self, value_type, values, kept, reasons):
+        """Non-numeric metrics keep values of their type, and never NaN or infinite numbers, which JSON cannot hold."""
+        metric = MetricType(name="Test", description="test", unit="none", value_type=value_type)
+        validated = validate_values(_frame(values), metric)
+        assert validated.data["value"].tolist() == kept
+        assert validated.rejects["reason"].tolist() == reasons
+
+    def test_stats(self):
+        """Counts by reason add up across series and summarize what was rejected."""
+        first = validate_values(_frame([1.0, None]), METRICS.PHASE_OFFSET).stats
+        second = validate_values(_frame([np.inf, 2.0, 3.0]), METRICS.PHASE_OFFSET).stats
+        total = first + second
+        assert (total.rows, total.kept, total.rejected) == (5, 3, 2)
+        assert str(total) == "kept 3/5 rows, rejected 1 missing, 1 non_finite"
+        assert str(ValidationStats(rows=2)) == "kept 2/2 rows"
+
+
+class TestWriteRejects:
+    """Test the reject sidecar files."""
+
+    def test_write_rejects(self, tmp_path):
+        """Rejected rows are written to a new csv file, and nothing is written without rejects."""
+        rejects = validate_values(_frame(["x", 1.0]), METRICS.PHASE_OFFSET).rejects
+        path = write_rejects(rejects, tmp_path / "rejects")
+        assert pd.read_csv(path)[["value", "reason"]].to_dict("records") == [{"value": "x", "reason": "invalid"}]
+        assert write_rejects(rejects.iloc[:0], tmp_path / "empty") is None
+        assert not (tmp_path / "empty").exists()
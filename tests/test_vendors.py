@@ -8,11 +8,19 @@ configuration, and data processing.
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pandas as pd
+import psycopg2.errors
 import pytest
+import requests
+from sqlalchemy.exc import IntegrityError
 
-from opensampl.vendors.base_probe import BaseProbe, LoadConfig
+from opensampl.vendors.base_probe import BaseProbe, LoadConfig, skip_if_already_loaded
 from opensampl.vendors.constants import ProbeKey, VendorType, VENDORS
 from opensampl.vendors.adva import AdvaProbe
+from opensampl.vendors.microchip.tp4100 import MicrochipTP4100Probe
+from opensampl.vendors.microchip.twst import MicrochipTWSTProbe
+from opensampl.collect.microchip.tp4100.collect_4100 import tai_to_utc
+from opensampl.metrics import METRICS
 
 
 class TestProbeKey:
@@ -96,6 +104,8 @@ class TestLoadConfig:
         assert config.max_workers == 4
         assert config.chunk_size is None
         assert config.show_progress is False
+        assert config.executor == "thread"
+        assert config.parse_workers is None
 
     def test_load_config_with_all_options(self):
         """Test LoadConfig with all options set."""
@@ -137,13 +147,24 @@ class TestBaseProbe:
             def process_metadata(self):
                 return {"test": "metadata"}
 
-            def process_time_data(self):
-                import pandas as pd
-                return pd.DataFrame()
+            def parse_time_data(self):
+                return iter([])
 
         probe = TestProbe("test_file.txt")
         assert probe.input_file == Path("test_file.txt")
 
+    def test_base_probe_requires_parse_time_data(self):
+        """A vendor that does not implement parse_time_data fails when created, not part way through a load."""
+        class TestProbe(BaseProbe):
+            name = "test_probe"
+            metadata_table = "test_metadata"
+
+            def process_metadata(self):
+                return {"test": "metadata"}
+
+        with pytest.raises(TypeError, match="parse_time_data"):
+            TestProbe("test_file.txt")
+
     @patch('opensampl.vendors.base_probe.click')
     def test_base_probe_make_command(self, mock_click):
         """Test the make_command method."""
@@ -157,9 +178,8 @@ class TestBaseProbe:
             def process_metadata(self):
                 return {"test": "metadata"}
 
-            def process_time_data(self):
-                import pandas as pd
-                return pd.DataFrame()
+            def parse_time_data(self):
+                return iter([])
 
         # Mock the click context
         mock_ctx = Mock()
@@ -193,9 +213,8 @@ class TestBaseProbe:
             def process_metadata(self):
                 return {"test": "metadata"}
 
-            def process_time_data(self):
-                import pandas as pd
-                return pd.DataFrame()
+            def parse_time_data(self):
+                return iter([])
 
         mock_ctx = Mock()
         mock_ctx.obj = {"conf": Mock()}
@@ -234,9 +253,8 @@ class TestBaseProbe:
             def process_metadata(self):
                 return {"test": "metadata"}
 
-            def process_time_data(self):
-                import pandas as pd
-                return pd.DataFrame()
+            def parse_time_data(self):
+                return iter([])
 
         mock_ctx = Mock()
         mock_ctx.obj = {"conf": Mock()}
@@ -266,6 +284,42 @@ class TestBaseProbe:
         assert config.show_progress is False
 
 
+def _unique_violation(constraint: str) -> IntegrityError:
+    orig = Mock(spec=psycopg2.errors.UniqueViolation)
+    orig.diag.constraint_name = constraint
+    return IntegrityError("INSERT", {}, orig)
+
+
+def _conflict(constraint: str) -> requests.exceptions.HTTPError:
+    response = Mock(status_code=409)
+    response.json.return_value = {"message": "Unique violation error", "constraint": constraint}
+    return requests.exceptions.HTTPError("409 error", response=response)
+
+
+class TestSkipIfAlreadyLoaded:
+    """Test which load failures are taken to mean a file was already loaded."""
+
+    @pytest.mark.parametrize("error", [_unique_violation("series_data_pkey"), _conflict("probe_data_pkey")])
+    def test_time_data_conflict_skipped(self, error):
+        """A conflict on the key of the time data is logged and the file treated as loaded."""
+        with skip_if_already_loaded(Path("probe.txt"), "time data"):
+            raise error
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            _unique_violation("uq_series_identity"),
+            _conflict("uq_series_identity"),
+            IntegrityError("INSERT", {}, Exception("not null")),
+            requests.exceptions.HTTPError("409", response=Mock(status_code=409, json=Mock(side_effect=ValueError))),
+        ],
+    )
+    def test_other_conflicts_raised(self, error):
+        """Other unique violations, such as racing to create a series, fail the file so it is not archived."""
+        with pytest.raises(type(error)), skip_if_already_loaded(Path("probe.txt"), "time data"):
+            raise error
+
+
 class TestAdvaProbe:
     """Test AdvaProbe functionality."""
 
@@ -309,6 +363,129 @@ class TestAdvaProbe:
         assert probe_key.ip_address == "192.168.1.100"
 
 
+    def test_adva_single_pass(self, tmp_path):
+        """The header and readings come from one read of the file, which process_metadata reuses."""
+        import gzip
+
+        path = tmp_path / "192.168.1.100CLOCK_PROBE-1-1-2023-01-01-12-00-00.txt.gz"
+        with gzip.open(path, "wt") as f:
+            f.write("# Title: probe\n# Start: 2023/01/01 12:00:00\n# Custom: a: b\n0, 1.5e-09\n1,  -2.5e-09\n")
+
+        probe = AdvaProbe(path)
+        with patch.object(AdvaProbe, "_open_file", side_effect=probe._open_file) as mock_open:
+            (batch,) = probe.parse_time_data()
+            metadata = probe.process_metadata()
+        mock_open.assert_called_once()
+
+        assert list(batch.data.columns) == ["time", "value"]
+        assert batch.data["value"].tolist() == [1.5e-09, -2.5e-09]
+        assert (batch.data["time"].diff().dropna() == pd.Timedelta(seconds=1)).all()
+        assert metadata["title"] == "probe"
+        assert metadata["additional_metadata"] == {"Custom": "a: b"}
+
+
+class TestMicrochipTWSTProbe:
+    """Test MicrochipTWSTProbe parsing."""
+
+    def test_parse_time_data(self, tmp_path):
+        """Readings are split into one series per channel and measurement, skipping every other reading."""
+        path = tmp_path / "twst.csv"
+        path.write_text(
+            "# local:\n#   ip: 10.0.0.1\n# remotes:\n#   1: {}\n"
+            "timestamp,reading,value\n"
+            "2024-01-01T00:00:00Z,chan:10:meas:offset,3e-09\n"
+            "2024-01-01T00:00:00Z,chan:2:tracking:ebno,12.5\n"
+            "2024-01-01T00:00:00Z,tracking:ebno,9.0\n"
+            "2024-01-01T00:00:00Z,chan:2:tracking:state,1\n"
+            "2024-01-01T00:00:01Z,chan:2:tracking:ebno,12.75\n"
+            "2024-01-01T00:00:01Z,chan:10:meas:offset,4e-09\n"
+        )
+
+        probe = MicrochipTWSTProbe(path)
+        assert probe.probe_key == ProbeKey(probe_id="modem", ip_address="10.0.0.1")
+        batches = list(probe.parse_time_data())
+
+        assert [(b.compound_reference["probe_id"], b.metric) for b in batches] == [
+            ("chan:2", METRICS.EB_NO),
+            ("chan:10", METRICS.PHASE_OFFSET),
+        ]
+        assert batches[0].data["value"].tolist() == [12.5, 12.75]
+        assert batches[1].data["value"].tolist() == [3e-09, 4e-09]
+        assert batches[1].data["time"].tolist() == ["2024-01-01T00:00:00Z", "2024-01-01T00:00:01Z"]
+
+
+class TestMicrochipTP4100Probe:
+    """Test MicrochipTP4100Probe parsing and chart data conversion."""
+
+    def test_parse_download_file(self, tmp_path):
+        """download_file exports have their split date and time joined and nanoseconds converted to seconds."""
+        path = tmp_path / "tp4100.csv"
+        path.write_text(
+            "# host: 10.0.0.5\n# metric: Time-Error (ns)\n# method: download_file\n# reference: GNSS\n"
+            "Time, Time-Error (ns)\n"
+            "2024-01-01,00:00:00, 12\n"
+            "2024-01-01,00:00:01, -3\n"
+        )
+
+        (batch,) = MicrochipTP4100Probe(path).parse_time_data()
+
+        assert batch.metric == METRICS.PHASE_OFFSET
+        assert batch.data["time"].tolist() == [
+            pd.Timestamp("2024-01-01 00:00:00", tz="UTC"),
+            pd.Timestamp("2024-01-01 00:00:01", tz="UTC"),
+        ]
+        assert batch.data["value"].tolist() == pytest.approx([12e-9, -3e-9])
+
+    def test_tai_to_utc(self):
+        """Chart data TAI seconds are shifted by the offset of each reading."""
+        chart = pd.DataFrame({"X": ["1704067237", "1704067239"], "OFFSET": ["37", "38"]})
+        assert tai_to_utc(chart["X"], chart["OFFSET"]).tolist() == [
+            pd.Timestamp("2024-01-01 00:00:00", tz="UTC"),
+            pd.Timestamp("2024-01-01 00:00:01", tz="UTC"),
+        ]
+
+
+class TestProcessExecutor:
+    """Test parsing directories in worker processes."""
+
+    @staticmethod
+    def _write_adva_file(directory: Path, probe_id: str, rows: int) -> Path:
+        path = directory / f"10.0.0.1CLOCK_PROBE-{probe_id}-2024-01-01-00-00-00.txt"
+        header = "# Title: test\n# Start: 2024/01/01 00:00:00\n"
+        path.write_text(header + "".join(f"{i}, {i}e-9\n" for i in range(rows)))
+        return path
+
+    def test_process_executor_loads_every_file(self, tmp_path):
+        """Files parsed in worker processes are loaded and archived by the parent."""
+        for probe_id in ("1-1", "1-2", "1-3"):
+            self._write_adva_file(tmp_path, probe_id, rows=5)
+        config = LoadConfig(
+            filepath=tmp_path,
+            archive_dir=tmp_path / "archive",
+            metadata=True,
+            time_data=True,
+            executor="process",
+            parse_workers=2,
+            max_workers=2,
+        )
+
+        with (
+            patch("opensampl.vendors.base_probe.load_probe_metadata") as mock_metadata,
+            patch("opensampl.vendors.base_probe.load_time_data_batch") as mock_load,
+        ):
+            AdvaProbe._process_directory(config, {})
+
+        assert mock_metadata.call_count == 3
+        assert {call.kwargs["probe_key"].probe_id for call in mock_metadata.call_args_list} == {"1-1", "1-2", "1-3"}
+        assert mock_load.call_count == 3
+        for call in mock_load.call_args_list:
+            (batch,) = call.kwargs["series"]
+            assert len(batch) == 5
+            assert batch.data["value"].iloc[1] == pytest.approx(1e-9)
+        assert not list(tmp_path.glob("*.txt"))
+        assert len(list((tmp_path / "archive").rglob("*.txt"))) == 3
+
+
 class TestVendors:
     """Test VENDORS functionality."""
 
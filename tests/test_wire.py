@@ -0,0 +1,122 @@
+"""Tests for the backend upload wire formats."""
+
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from opensampl.config.base import BaseConfig
+from opensampl.load import routing, wire
+from opensampl.load_data import normalize_time_column
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    """Time data as a vendor parser would produce it."""
+    return pd.DataFrame(
+        {"time": pd.date_range("2024-01-01", periods=4, freq="s", tz="UTC"), "value": [1.5e-9, -2.0, 0.0, 3.25]}
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_routing_state():
+    """Forget negotiated formats between tests."""
+    routing.reset_config()
+    yield
+    routing.reset_config()
+
+
+class TestEncodeDecode:
+    """Test round trips through each wire format."""
+
+    @pytest.mark.skipif(not wire.arrow_available(), reason="pyarrow is not installed")
+    @pytest.mark.parametrize(
+        ("wire_format", "compression"),
+        [("arrow", "zstd"), ("arrow", "none"), ("parquet", "zstd"), ("parquet", "gzip")],
+    )
+    def test_binary_round_trip_keeps_dtypes(self, frame: pd.DataFrame, wire_format: str, compression: str):
+        """Binary formats hand back typed timestamps that need no parsing."""
+        filename, content, content_type = wire.encode_frame(frame, "time_data", wire_format, compression)
+        decoded = wire.decode_frame(content, content_type, filename)
+        pd.testing.assert_frame_equal(decoded, frame)
+
+    @pytest.mark.skipif(not wire.arrow_available(), reason="pyarrow is not installed")
+    @pytest.mark.parametrize("wire_format", ["arrow", "parquet"])
+    @pytest.mark.parametrize(
+        "values",
+        [[{"a": 1}, {"b": 2}, None, {"a": [1, 2]}], [{"a": 1}, "text", 2.5, [1, "x"]]],
+        ids=["dicts", "mixed"],
+    )
+    def test_binary_round_trip_keeps_object_values(self, frame: pd.DataFrame, wire_format: str, values: list):
+        """Values of non-numeric metrics come back exactly as sent, however their types and keys vary."""
+        frame = frame.assign(value=pd.Series(values, dtype=object))
+        filename, content, content_type = wire.encode_frame(frame, "time_data", wire_format)
+        decoded = wire.decode_frame(content, content_type, filename)
+        assert decoded["value"].tolist() == values
+        pd.testing.assert_series_equal(decoded["time"], frame["time"])
+
+    def test_gzip_csv_round_trip(self, frame: pd.DataFrame):
+        """Compressed csv is recognized from its content type."""
+        filename, content, content_type = wire.encode_frame(frame, "time_data", "csv", "gzip")
+        assert filename == "time_data.csv.gz"
+        decoded = wire.decode_frame(content, content_type, filename)
+        assert list(decoded["value"]) == list(frame["value"])
+
+    def test_unknown_content_type_read_as_csv(self, frame: pd.DataFrame):
+        """Uploads from older clients are plain csv with a generic content type."""
+        content = frame.to_csv(index=False).encode("utf-8")
+        decoded = wire.decode_frame(content, "application/octet-stream", "upload")
+        assert len(decoded) == len(frame)
+
+    def test_falls_back_to_csv_without_pyarrow(self, frame: pd.DataFrame):
+        """Binary formats degrade to csv when pyarrow is missing."""
+        with patch("opensampl.load.wire.arrow_available", return_value=False):
+            filename, _, content_type = wire.encode_frame(frame, "time_data", "arrow", "zstd")
+            assert (filename, content_type) == ("time_data.csv", "text/csv")
+            with pytest.raises(wire.UnsupportedWireFormatError):
+                wire.decode_frame(b"", wire.CONTENT_TYPES["parquet"])
+
+    def test_normalize_time_column(self, frame: pd.DataFrame):
+        """Typed times are converted to UTC without reparsing; strings are parsed."""
+        eastern = frame["time"].dt.tz_convert("America/New_York")
+        pd.testing.assert_series_equal(normalize_time_column(eastern), frame["time"])
+        parsed = normalize_time_column(frame["time"].astype(str))
+        pd.testing.assert_series_equal(parsed, frame["time"], check_dtype=False)
+
+
+class TestNegotiation:
+    """Test how the routed upload format is chosen."""
+
+    @staticmethod
+    def _config(**overrides) -> BaseConfig:
+        return BaseConfig(
+            _env_file="/nonexistent/env/file",
+            ROUTE_TO_BACKEND=True,
+            BACKEND_URL="http://backend:8000",
+            **overrides,
+        )
+
+    def test_old_backend_gets_csv(self):
+        """A backend without the wire_formats endpoint is sent csv."""
+        response = Mock(status_code=404)
+        response.raise_for_status.side_effect = routing.requests.exceptions.HTTPError("404")
+        with patch("opensampl.load.routing.get_client") as mock_get_client:
+            mock_get_client.return_value.request.return_value = response
+            assert routing.negotiate_wire_format(self._config(), {}) == "csv"
+            assert routing.negotiate_wire_format(self._config(), {}) == "csv"
+        mock_get_client.return_value.request.assert_called_once()
+
+    @pytest.mark.skipif(not wire.arrow_available(), reason="pyarrow is not installed")
+    def test_binary_format_when_supported(self):
+        """The configured format is used when the backend lists it."""
+        response = Mock(status_code=200)
+        response.json.return_value = {"formats": ["arrow", "parquet", "csv"]}
+        with patch("opensampl.load.routing.get_client") as mock_get_client:
+            mock_get_client.return_value.request.return_value = response
+            assert routing.negotiate_wire_format(self._config(WIRE_FORMAT="parquet"), {}) == "parquet"
+
+    def test_csv_configured_skips_negotiation(self):
+        """Choosing csv never queries the backend."""
+        with patch("opensampl.load.routing.get_client") as mock_get_client:
+            assert routing.negotiate_wire_format(self._config(WIRE_FORMAT="csv"), {}) == "csv"
+        mock_get_client.assert_not_called()
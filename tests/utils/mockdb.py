@@ -4,7 +4,7 @@ import os
 from typing import Any, Callable
 
 from loguru import logger
-from sqlalchemy import JSON, Column, ForeignKey, Integer, MetaData, create_engine, text
+from sqlalchemy import JSON, Column, ForeignKey, Index, Integer, MetaData, create_engine, text
 from sqlalchemy.event import listens_for
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -109,6 +109,9 @@ class MockDB:
                         arg_copy.pop("schema", None)
                         if arg_copy:  # Only add if not empty
                             filtered_args.append(arg_copy)
+                    elif isinstance(arg, Index):
+                        # Indexes are bound to the postgres table once declared, so rebuild them by column name
+                        filtered_args.append(Index(arg.name, *(column.name for column in arg.columns)))
                     else:
                         filtered_args.append(arg)
                 table_args = tuple(filtered_args)